@@ -0,0 +1,83 @@
+"""Measure append throughput and latency under each durability mode
+
+Run from the repository root, ideally with --dir on the disk holding the vault:
+
+    python benchmarks/bench_durability.py --notes 500 --batch 10
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from noter import NoteEntry, NoterSession  # noqa: E402
+
+
+def run(
+    notes: int,
+    batch: int,
+    durability: str,
+    interval_ms: int,
+    directory: Optional[str],
+) -> Tuple[float, List[float]]:
+    """Append ``notes`` notes in batches, returning total time and latencies
+
+    A note's latency runs from the start of its batch until the batch call
+    returns, which includes any sync the batch waits for.
+    """
+    with tempfile.TemporaryDirectory(dir=directory) as vault:
+        config: Dict[str, Optional[str]] = {
+            "obsidian_vault_path": vault,
+            "date_format": "%Y-%m-%d",
+            "time_format": "%H:%M",
+            "durability": durability,
+            "durability_interval_ms": str(interval_ms),
+        }
+        latencies: List[float] = []
+        started = time.perf_counter()
+        with NoterSession(config=config) as session:
+            for first in range(0, notes, batch):
+                entries = [
+                    NoteEntry(f"Benchmark note {i} #bench", note_date="2025-05-21")
+                    for i in range(first, min(first + batch, notes))
+                ]
+                batch_started = time.perf_counter()
+                session.append_many(entries)
+                latencies.extend([time.perf_counter() - batch_started] * len(entries))
+        return time.perf_counter() - started, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=1, help="Notes per append call")
+    parser.add_argument(
+        "--interval", type=int, default=50, help="Group sync interval in ms"
+    )
+    parser.add_argument("--dir", help="Directory to create the test vaults in")
+    args = parser.parse_args()
+    logging.getLogger("noter").setLevel(logging.WARNING)
+
+    modes = [
+        ("none", "none", 0),
+        ("fdatasync-per-write", "fdatasync-per-write", 0),
+        ("group", "group", 0),
+        (f"group {args.interval}ms", "group", args.interval),
+    ]
+    for label, durability, interval in modes:
+        total, latencies = run(args.notes, args.batch, durability, interval, args.dir)
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(
+            f"{label:>20}: {args.notes / total:8.0f} notes/s  "
+            f"p99 {p99 * 1000:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
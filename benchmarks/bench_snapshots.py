@@ -0,0 +1,58 @@
+"""Measure the cost of pre-write snapshots on appends
+
+Run from the repository root:
+
+    python benchmarks/bench_snapshots.py --notes 2000
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from noter import NoteManager, TemplateManager  # noqa: E402
+
+
+def run(notes: int, snapshots: bool) -> List[float]:
+    """Append ``notes`` notes to one day, returning each append's latency"""
+    with tempfile.TemporaryDirectory() as vault:
+        config: Dict[str, Optional[str]] = {
+            "obsidian_vault_path": vault,
+            "date_format": "%Y-%m-%d",
+            "time_format": "%H:%M",
+            "snapshots": "true" if snapshots else None,
+        }
+        note_manager = NoteManager(config, TemplateManager(config))
+        latencies = []
+        for i in range(notes):
+            started = time.perf_counter()
+            note_manager.append_to_note(f"Benchmark note {i} #bench", "2025-05-21")
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=1000)
+    args = parser.parse_args()
+    logging.getLogger("noter").setLevel(logging.WARNING)
+
+    for label, snapshots in (("in place", False), ("snapshots", True)):
+        latencies = sorted(run(args.notes, snapshots))
+        total = sum(latencies)
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(
+            f"{label:>10}: {args.notes / total:8.0f} notes/s  "
+            f"median {statistics.median(latencies) * 1000:.2f} ms  "
+            f"p99 {p99 * 1000:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,53 @@
 import argparse
 import logging
 import os
+import re
 import sys
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from noter.activity import StatCache
+from noter.archive import NoteArchive
+from noter.attachments import DEFAULT_FOLDER, spill
+from noter.blocks import (
+    BlockIndex,
+    BlockLocation,
+    day_blocks,
+    line_block_id,
+    new_block_id,
+    normalise_id,
+    rebuild_blocks,
+    scan_blocks,
+)
+from noter.dedup import DedupIndex, make_key
+from noter.document import DailyDocument, Section
+from noter.frontmatter import FieldValue, parse_condition, update_file
+from noter.fsutil import atomic_write, sync_dir, sync_file
+from noter.links import (
+    Backlink,
+    LinkIndex,
+    day_links,
+    extract_links,
+    rebuild_links,
+)
+from noter.mirror import BackgroundMirror, Mirror
+from noter.snapshots import Snapshot, SnapshotStore, content_digest
+from noter.templates import WEEKDAYS, is_known_tag, load_template
+from noter.vault_index import VaultIndex, parse_note_date
 
 # Setup basic logging
 logging.basicConfig(
@@ -26,25 +70,187 @@ def get_script_dir() -> str:
         return os.path.dirname(os.path.abspath(__file__))
 
 
+def config_flag(config: Dict[str, Optional[str]], key: str) -> bool:
+    """Read a boolean setting that may be stored as a JSON bool or a string"""
+    value: Any = config.get(key)
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+def config_int(config: Dict[str, Optional[str]], key: str, default: int = 0) -> int:
+    """Read an integer setting, falling back to ``default`` when unset or invalid"""
+    value: Any = config.get(key)
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring invalid value for {key}: {value!r}")
+        return default
+
+
+# Headers of the sections notes can be added to, overridable in the config
+# with "<name>_section" settings
+SECTION_HEADERS = {
+    "notes": "## ✍️ Notes & Observations",
+    "tasks": "## ✅ Tasks",
+    "summary": "## ☀️ Summary",
+}
+
+# Number of parsed daily notes a NoteManager keeps between appends
+DOCUMENT_CACHE_SIZE = 32
+
+# Values of the ``durability`` setting: no syncing, a sync after every note
+# write, or one sync per batch (or per ``durability_interval_ms``)
+DURABILITY_MODES = ("none", "fdatasync-per-write", "group")
+
+
+class NoteEntry(NamedTuple):
+    """A note waiting to be written"""
+
+    text: str
+    tags: Optional[List[str]] = None
+    note_date: Optional[str] = None
+    entry_id: Optional[str] = None
+    section: Optional[str] = None
+    # "HH:MM" to stamp the note with instead of the current time
+    at: Optional[str] = None
+
+
+class AppendResult(NamedTuple):
+    """Outcome of writing one note"""
+
+    note_date: str
+    path: Optional[str]
+    added: bool
+    duplicate: bool
+    error: Optional[str]
+    # Block ID given to the entry when ``block_ids`` is enabled
+    block_id: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the note is in the daily note, either added now or before"""
+        return self.error is None
+
+
+class PendingNote(NamedTuple):
+    """A formatted bullet on its way into a section of a daily note"""
+
+    header: str
+    bullet: str
+    # Placed among the section's bullets by timestamp rather than appended
+    timed: bool = False
+
+
+# Timestamp prefix of a bullet written by noter
+_STAMP_PATTERN = re.compile(r"- \[([^\]]+)\]")
+
+# Everything an amended entry keeps before its new text
+_BULLET_PREFIX = re.compile(r"\s*- (\[[^\]]*\] )?")
+
+# Marker pairs delimiting the activity lists noter materialises into a daily
+# note when ``static_queries`` is enabled
+ACTIVITY_BLOCKS = {
+    "reviews": "<!-- noter:reviews -->\n-\n<!-- /noter:reviews -->",
+    "touched": "<!-- noter:touched -->\n-\n<!-- /noter:touched -->",
+}
+
+
+def replace_marked_block(content: str, name: str, body: str) -> Optional[str]:
+    """Replace the text between a pair of noter markers, or None if absent"""
+    start_marker = f"<!-- noter:{name} -->\n"
+    end_marker = f"<!-- /noter:{name} -->"
+    start = content.find(start_marker)
+    if start == -1:
+        return None
+    start += len(start_marker)
+    end = content.find(end_marker, start)
+    if end == -1:
+        return None
+    return f"{content[:start]}{body}\n{content[end:]}"
+
+
 # Configuration management
 class ConfigManager:
     """Manages the noter configuration"""
 
-    def __init__(self, config_path: Optional[str] = None) -> None:
+    def __init__(
+        self, config_path: Optional[str] = None, vault: Optional[str] = None
+    ) -> None:
         self.config_path = config_path or os.path.join(get_script_dir(), "config.json")
+        # Name of the vault to use when the config declares several
+        self.vault = vault
         self.default_config: Dict[str, Optional[str]] = {
             "obsidian_vault_path": "C:/Users/YourUsername/Obsidian Vault/Daily Notes",
             "date_format": "%Y-%m-%d",
             "time_format": "%H:%M",
             "template_path": None,
         }
+        # Stat fingerprint of the config file the last load was based on
+        self.fingerprint: Optional[List[int]] = None
+
+    @property
+    def snapshot_path(self) -> str:
+        """Get the file caching the last validated configuration"""
+        directory, name = os.path.split(os.path.abspath(self.config_path))
+        if self.vault:
+            name = f"{name}.{self.vault}"
+        return os.path.join(directory, f".{name}.snapshot")
+
+    def _stat_fingerprint(self) -> Optional[List[int]]:
+        """Get the (mtime, size, inode) fingerprint of the config file"""
+        try:
+            st = os.stat(self.config_path)
+        except FileNotFoundError:
+            return None
+        return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+    def _read_snapshot(
+        self, fingerprint: List[int]
+    ) -> Optional[Dict[str, Optional[str]]]:
+        """Return the snapshotted config if the config file has not changed"""
+        import json
+
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            if snapshot["fingerprint"] != fingerprint:
+                return None
+            config: Dict[str, Optional[str]] = snapshot["config"]
+            return config
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
 
-    def load_config(self) -> Optional[Dict[str, Optional[str]]]:
-        """Load configuration from file or create a default one"""
+    def _write_snapshot(
+        self, fingerprint: List[int], config: Dict[str, Optional[str]]
+    ) -> None:
+        """Remember a validated config; failing to is not an error"""
         import json
 
         try:
-            if not os.path.exists(self.config_path):
+            atomic_write(
+                self.snapshot_path,
+                json.dumps({"fingerprint": fingerprint, "config": config}),
+            )
+        except OSError as e:
+            logger.debug(f"Could not write config snapshot: {e}")
+
+    def load_config(
+        self, revalidate: bool = False
+    ) -> Optional[Dict[str, Optional[str]]]:
+        """Load configuration from file or create a default one
+
+        A config that validated before is taken from its snapshot while the
+        config file keeps the same fingerprint, which skips checking the vault
+        path (slow on network drives). ``revalidate`` forces the full check.
+        """
+        import json
+
+        try:
+            fingerprint = self._stat_fingerprint()
+            if fingerprint is None:
                 with open(self.config_path, "w", encoding="utf-8") as f:
                     json.dump(self.default_config, f, indent=4)
                 logger.info(
@@ -55,8 +261,16 @@ class ConfigManager:
                 )
                 return None
 
+            self.fingerprint = fingerprint
+            if not revalidate:
+                snapshot = self._read_snapshot(fingerprint)
+                if snapshot is not None:
+                    return snapshot
+
             with open(self.config_path, "r", encoding="utf-8") as f:
-                config: Dict[str, Optional[str]] = json.load(f)
+                config = self._select_vault(json.load(f))
+            if config is None:
+                return None
 
             # Validate the vault path exists
             vault_path = config["obsidian_vault_path"]
@@ -69,13 +283,73 @@ class ConfigManager:
                 )
                 logger.error(f"Please update the path in {self.config_path}")
                 return None
+            durability = config.get("durability")
+            if durability and durability.lower() not in DURABILITY_MODES:
+                logger.error(
+                    f"Error: Unknown durability mode {durability!r}; "
+                    f"use one of {', '.join(DURABILITY_MODES)}"
+                )
+                return None
 
+            self._write_snapshot(fingerprint, config)
             return config
 
         except Exception as e:
             logger.error(f"Error loading configuration: {e}")
             return None
 
+    def _select_vault(self, data: Dict[str, Any]) -> Optional[Dict[str, Optional[str]]]:
+        """Flatten a multi-vault config into the settings of one vault
+
+        A config with a ``vaults`` object maps names to per-vault settings
+        (``obsidian_vault_path``, ``date_format``, ``template_path``...) that
+        override the top-level ones. The vault given to the constructor is
+        used, else ``default_vault``, else the first one declared.
+        """
+        vaults: Optional[Dict[str, Dict[str, Optional[str]]]] = data.get("vaults")
+        if not vaults:
+            if self.vault:
+                logger.error(f"Error: No vaults are declared in {self.config_path}")
+                return None
+            return data
+        name = self.vault or data.get("default_vault") or next(iter(vaults))
+        if name not in vaults:
+            logger.error(
+                f"Error: Unknown vault '{name}', expected one of: {', '.join(vaults)}"
+            )
+            return None
+        config = {
+            key: value
+            for key, value in data.items()
+            if key not in ("vaults", "default_vault")
+        }
+        config.update(vaults[name])
+        config["vault_name"] = name
+        return config
+
+    def vault_names(self) -> List[str]:
+        """List the vaults declared in the config file, if it declares any"""
+        import json
+
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return list(data.get("vaults") or {})
+
+    def poll(self) -> Optional[Dict[str, Optional[str]]]:
+        """Reload the config if its file changed since the last load
+
+        Costs a single ``os.stat`` when nothing changed. Returns the new
+        config, or None when it is unchanged or the edit does not validate,
+        in which case callers keep using the config they have.
+        """
+        fingerprint = self._stat_fingerprint()
+        if fingerprint is None or fingerprint == self.fingerprint:
+            return None
+        config = self.load_config()
+        if config is not None:
+            logger.info(f"Reloaded configuration from {self.config_path}")
+        return config
+
 
 # Template management
 class TemplateManager:
@@ -85,15 +359,42 @@ class TemplateManager:
         self.config = config
         self.custom_template_path = config.get("template_path")
 
+    def _note_datetime(self, note_date: str) -> datetime:
+        """Parse a note date with the configured format, defaulting to now"""
+        parsed = parse_note_date(
+            note_date, self.config.get("date_format") or "%Y-%m-%d"
+        )
+        return parsed or datetime.now()
+
+    def template_path_for(self, day: datetime) -> Optional[str]:
+        """Pick the custom template for a date
+
+        ``template_path_<weekday>`` (e.g. ``template_path_monday``) wins over
+        ``template_path_weekend`` on Saturdays and Sundays, which wins over
+        ``template_path``.
+        """
+        weekday = day.weekday()
+        return (
+            self.config.get(f"template_path_{WEEKDAYS[weekday]}")
+            or (self.config.get("template_path_weekend") if weekday >= 5 else None)
+            or self.custom_template_path
+        )
+
     def create_basic_template(self, note_date: str, note_content: str) -> str:
-        """Create a basic template for a new daily note"""
+        """Create a basic template for a new daily note
+
+        Date variables (weekday, month, day, year) describe ``note_date``, so
+        notes can be created ahead of time or back-dated.
+        """
         template = None
+        today = self._note_datetime(note_date)
+        template_path = self.template_path_for(today)
         # Try custom template if available
-        if self.custom_template_path and os.path.exists(self.custom_template_path):
-            logger.info(
-                f"Attempting to use custom template from: {self.custom_template_path}"
+        if template_path and os.path.exists(template_path):
+            logger.info(f"Attempting to use custom template from: {template_path}")
+            template = self._load_custom_template(
+                template_path, today, note_date, note_content
             )
-            template = self._load_custom_template(note_date, note_content)
             if template is None:
                 logger.warning("Falling back to default template")
             else:
@@ -101,15 +402,36 @@ class TemplateManager:
 
         # If custom template failed or doesn't exist, use default
         if template is None:
-            today = datetime.now()
             weekday = today.strftime("%A")
+            # Nested formats name the file after their last part; review
+            # queries compare ISO dates
+            name = note_date.split("/")[-1]
+            iso_date = today.date().isoformat()
+            notes_block = f"{note_content}\n- " if note_content else "- "
+            if config_flag(self.config, "static_queries"):
+                reviews_block = ACTIVITY_BLOCKS["reviews"]
+                touched_block = ACTIVITY_BLOCKS["touched"]
+            else:
+                reviews_block = """```dataview
+list
+from ""
+where reviewed <= date(today) - dur(30 days)
+sort reviewed asc
+limit 5
+```"""
+                touched_block = """```dataview
+table file.name, file.mtime
+from ""
+where file.mtime >= date(today)
+sort file.mtime desc
+```"""
             template = f"""---
-title: "Daily Note - {note_date}"
+title: "Daily Note - {name}"
 status: active
 topic: daily-log
-reviewed: {note_date}
+reviewed: {iso_date}
 priority: 3
-created: {note_date}
+created: {iso_date}
 tags: [dailynotes, log]
 aliases: []
 ---
@@ -127,59 +449,38 @@ aliases: []
 
 ## 🔁 Reviews or Highlights Revisited
 
-```dataview
-list
-from ""
-where reviewed <= date(today) - dur(30 days)
-sort reviewed asc
-limit 5
-```
+{reviews_block}
 
 ## 📓 Notes Created or Touched Today
 
-```dataview
-table file.name, file.mtime
-from ""
-where file.mtime >= date(today)
-sort file.mtime desc
-```
+{touched_block}
 
 ## ✍️ Notes & Observations
 
-{note_content}
-- """
+{notes_block}"""
         return template
 
-    def _load_custom_template(self, note_date: str, note_content: str) -> Optional[str]:
-        """Load and populate a custom template from file"""
-        if self.custom_template_path is None:
-            logger.warning("Custom template path is not configured")
-            return None
-
+    def _load_custom_template(
+        self,
+        template_path: str,
+        today: datetime,
+        note_date: str,
+        note_content: str,
+    ) -> Optional[str]:
+        """Render a custom template file and the fragments it includes"""
         try:
-            with open(self.custom_template_path, "r", encoding="utf-8") as f:
-                template = f.read()
-
-            # First check for balanced braces and proper template structure
-            try:
-                self._validate_template_variables(template)
-            except ValueError as e:
-                # Let the specific error be caught by the outer try-except
-                raise
-
-            # Replace template variables
-            today = datetime.now()
-            variables = {
-                "{{note_date}}": note_date,
-                "{{weekday}}": today.strftime("%A"),
-                "{{month}}": today.strftime("%B"),
-                "{{day}}": today.strftime("%d"),
-                "{{year}}": str(today.year),
-                "{{note_content}}": note_content,
-            }
-
-            for var, value in variables.items():
-                template = template.replace(var, value)
+            compiled = load_template(template_path, self._validate_template_variables)
+            template = compiled.render(
+                {
+                    "note_date": note_date,
+                    "weekday": today.strftime("%A"),
+                    "month": today.strftime("%B"),
+                    "day": today.strftime("%d"),
+                    "year": str(today.year),
+                    "note_content": note_content,
+                    "weekend": "yes" if today.weekday() >= 5 else "",
+                }
+            )
 
             # Check if there are any unresolved template variables after replacement
             if self._has_unresolved_variables(template):
@@ -206,16 +507,6 @@ sort file.mtime desc
         """Validate that template variables are properly formatted"""
         import re
 
-        # Define the valid variable names
-        valid_variable_names = [
-            "note_date",
-            "weekday",
-            "month",
-            "day",
-            "year",
-            "note_content",
-        ]
-
         # Check for mismatched braces - look for {{ without matching }}
         open_braces = template.count("{{")
         close_braces = template.count("}}")
@@ -248,12 +539,8 @@ sort file.mtime desc
                 logger.warning(f"Nested template variables found: {nested_vars}")
                 raise ValueError("Template contains nested variable braces")
 
-            # Check for unknown variables
-            unknown_vars = [
-                var.strip()
-                for var in template_vars
-                if var.strip() not in valid_variable_names
-            ]
+            # Check for unknown variables and malformed block or include tags
+            unknown_vars = [var for var in template_vars if not is_known_tag(var)]
             if unknown_vars:
                 logger.warning("Template contains unresolved variables")
                 raise ValueError("Template contains unknown variables")
@@ -300,98 +587,1216 @@ class NoteManager:
     ) -> None:
         self.config = config
         self.template_manager = template_manager
+        self._dedup_index: Optional[DedupIndex] = None
+        self._active_parts: Dict[str, int] = {}
+        self._vault_index: Optional[VaultIndex] = None
+        self._stat_cache: Optional[StatCache] = None
+        self._archive: Optional[NoteArchive] = None
+        self._link_index: Optional[LinkIndex] = None
+        self._block_index: Optional[BlockIndex] = None
+        self._snapshot_store: Optional[SnapshotStore] = None
+        # Notes written but not yet synced under ``group`` durability
+        self._unsynced: Set[str] = set()
+        # Idempotency keys of those notes, recorded only once they are synced
+        self._unsynced_keys: Set[Tuple[str, str]] = set()
+        self._batching = False
+        self._synced_at = time.monotonic()
+        # Held while appending and syncing, so a timed sync waits for the batch
+        self._sync_lock = threading.RLock()
+        self._sync_timer: Optional[threading.Timer] = None
+        self._mirror: Optional[BackgroundMirror] = None
+        # path -> (stat fingerprint, parsed note, content digest if snapshotting)
+        self._documents: Dict[
+            str, Tuple[Tuple[int, int], DailyDocument, Optional[str]]
+        ] = {}
 
     def get_note_path(self, note_date: str) -> str:
-        """Get the full path to a daily note file"""
+        """Get the full path to a daily note file
+
+        Date formats containing ``/`` (e.g. ``%Y/%m/%Y-%m-%d``) map to nested
+        directories below the vault.
+        """
+        return self.vault_index.path_for(note_date)
+
+    @property
+    def vault_index(self) -> VaultIndex:
+        """Lazily create the date to path index of the vault"""
+        if self._vault_index is None:
+            vault_path = self.config["obsidian_vault_path"]
+            if not vault_path:
+                raise ValueError("Obsidian vault path is not configured")
+            self._vault_index = VaultIndex(
+                vault_path, self.config.get("date_format") or "%Y-%m-%d"
+            )
+        return self._vault_index
+
+    def list_days(
+        self, start: Optional[date] = None, end: Optional[date] = None
+    ) -> List[Tuple[date, str]]:
+        """List the days that have a daily note as (date, path) pairs"""
+        return self.vault_index.days(start, end)
+
+    def get_state_dir(self) -> str:
+        """Get the hidden directory where noter keeps its sidecar files"""
         vault_path = self.config["obsidian_vault_path"]
-        if not vault_path:  # This handles both None and empty string
+        if not vault_path:
             raise ValueError("Obsidian vault path is not configured")
-        return os.path.join(vault_path, f"{note_date}.md")
+        return os.path.join(vault_path, ".noter")
 
-    def append_to_note(
-        self, note: str, note_date: str, tags: Optional[List[str]] = None
-    ) -> bool:
-        """Add a note to the Notes & Observations section of the daily note file"""
+    def get_continuation_path(self, note_date: str, part: int) -> str:
+        """Get the path of one part of a day; part 1 is the main daily note"""
+        if part <= 1:
+            return self.get_note_path(note_date)
+        vault_path = self.config["obsidian_vault_path"]
+        if not vault_path:
+            raise ValueError("Obsidian vault path is not configured")
+        return os.path.join(vault_path, *f"{note_date}.{part}.md".split("/"))
+
+    def get_day_paths(self, note_date: str) -> List[str]:
+        """Get the existing files holding a day's notes, main note first"""
+        paths = []
+        part = 1
+        while True:
+            path = self.get_continuation_path(note_date, part)
+            if not os.path.exists(path):
+                break
+            paths.append(path)
+            part += 1
+        return paths
+
+    def read_day(self, note_date: str) -> Optional[str]:
+        """Read a whole day, joining the main note and its continuation files
+
+        Anything that searches or exports days should read them through here
+        so continuation shards are treated as part of the same day, and days
+        moved into the archive are read back from their bundle.
+        """
+        contents = []
+        for path in self.get_day_paths(note_date):
+            with open(path, "r", encoding="utf-8") as f:
+                contents.append(f.read())
+        if not contents:
+            contents = [text for _, text in self._read_archived(note_date)]
+        if not contents:
+            return None
+        return "\n".join(contents)
+
+    @property
+    def archive(self) -> NoteArchive:
+        """Lazily open the archive of old daily notes"""
+        if self._archive is None:
+            self._archive = NoteArchive(os.path.join(self.get_state_dir(), "archive"))
+        return self._archive
+
+    def _rel_path(self, path: str) -> str:
+        """Get a vault-relative path with ``/`` separators"""
+        vault_path = self.config["obsidian_vault_path"] or ""
+        return os.path.relpath(path, vault_path).replace(os.sep, "/")
+
+    def _read_archived(self, note_date: str) -> List[Tuple[str, str]]:
+        """Read the archived parts of a day as (path, content) pairs"""
+        parts = []
+        part = 1
+        while True:
+            path = self.get_continuation_path(note_date, part)
+            text = self.archive.read(self._rel_path(path))
+            if text is None:
+                break
+            parts.append((path, text))
+            part += 1
+        return parts
+
+    def archive_days(self, before: date) -> List[str]:
+        """Move every daily note dated before ``before`` into the archive
+
+        Days are packed into one bundle per year and their files, continuation
+        parts included, are removed from the vault. Returns the archived dates.
+        """
+        date_format = self.config.get("date_format") or "%Y-%m-%d"
+        by_year: Dict[str, List[Tuple[str, bytes]]] = {}
+        archived: List[str] = []
+        paths: List[str] = []
+        for day, _ in self.list_days(None, before - timedelta(days=1)):
+            note_date = day.strftime(date_format)
+            for path in self.get_day_paths(note_date):
+                with open(path, "rb") as f:
+                    content = f.read()
+                by_year.setdefault(str(day.year), []).append(
+                    (self._rel_path(path), content)
+                )
+                paths.append(path)
+            archived.append(note_date)
+
+        # Each index is on disk before any of the notes it now holds is removed
+        for year, files in sorted(by_year.items()):
+            self.archive.add(year, files)
+        for path in paths:
+            os.remove(path)
+        self.clear_cache()
+        self._active_parts.clear()
+        return archived
+
+    def restore_day(self, note_date: str) -> bool:
+        """Move an archived day back into the vault, returning whether it was"""
+        if os.path.exists(self.get_note_path(note_date)):
+            return False
+        parts = self._read_archived(note_date)
+        if not parts:
+            return False
+        for path, text in parts:
+            self.make_dirs(path)
+            with open(path, "x", encoding="utf-8", newline="") as f:
+                f.write(text)
+            # The restored file must outlive its removal from the archive index
+            sync_file(path)
+            sync_dir(os.path.dirname(path))
+        self.archive.remove([self._rel_path(path) for path, _ in parts])
+        logger.info(f"Restored {note_date} from the archive")
+        return True
+
+    def _active_part(self, note_date: str) -> int:
+        """Get the part new notes for a day are written to"""
+        part = self._active_parts.get(note_date, 1)
+        while os.path.exists(self.get_continuation_path(note_date, part + 1)):
+            part += 1
+        self._active_parts[note_date] = part
+        return part
+
+    @property
+    def stat_cache(self) -> StatCache:
+        """Lazily load the persistent stat cache of the vault"""
+        if self._stat_cache is None:
+            vault_path = self.config["obsidian_vault_path"]
+            if not vault_path:
+                raise ValueError("Obsidian vault path is not configured")
+            self._stat_cache = StatCache(
+                vault_path, os.path.join(self.get_state_dir(), "statcache.json")
+            )
+        return self._stat_cache
+
+    def find_notes(self, queries: List[str]) -> List[Tuple[str, Dict[str, FieldValue]]]:
+        """Find the vault notes whose frontmatter matches every query
+
+        Queries look like ``status=active`` or ``priority<=2``. Fields come
+        from the stat cache, so only notes changed since the last lookup are
+        opened.
+        """
+        conditions = [parse_condition(query) for query in queries]
+        cache = self.stat_cache
+        cache.refresh()
+        cache.save()
+        return cache.find(conditions)
+
+    def update_frontmatter(self, note_date: str, updates: Dict[str, str]) -> bool:
+        """Set frontmatter fields of a day's main note
+
+        Returns True when the new block fitted in the old one and was written
+        in place, False when the note had to be rewritten. Either way the
+        write is synced as the ``durability`` setting asks.
+        """
+        path = self.get_note_path(note_date)
+        if config_flag(self.config, "snapshots"):
+            with open(path, "r", encoding="utf-8") as f:
+                digest = content_digest(f.read().encode("utf-8"))
+            # The block may be written in place, so the snapshot is a copy
+            self.snapshot_store.save(path, self._rel_path(path), digest, False)
+        in_place = update_file(
+            path,
+            updates,
+            lambda target, content: self._write_note(target, content, True),
+        )
+        if in_place:
+            self._sync_in_place(path)
+        self._documents.pop(path, None)
+        return in_place
+
+    def refresh_activity(self, note_date: str, review_days: int = 30) -> bool:
+        """Rewrite the static touched and review lists in a day's main note
+
+        The lists replace the dataview queries of the default template when
+        ``static_queries`` is enabled, so Obsidian never has to scan the vault
+        to render them. Only files whose stat fingerprint changed since the
+        previous refresh are re-read.
+        """
         try:
             note_path = self.get_note_path(note_date)
-            timestamp = datetime.now().strftime(
-                self.config.get("time_format") or "%H:%M"
+            if not os.path.exists(note_path):
+                logger.error(f"No daily note found for {note_date}")
+                return False
+            day_start = parse_note_date(
+                note_date, self.config.get("date_format") or "%Y-%m-%d"
             )
+            if day_start is None:
+                logger.error(f"Could not parse note date: {note_date}")
+                return False
+
+            cache = self.stat_cache
+            cache.refresh()
+            vault_path = cache.vault_path
+            own_files = {
+                os.path.relpath(path, vault_path)
+                for path in self.get_day_paths(note_date)
+            }
+            touched = [
+                f"- [[{os.path.splitext(rel_path)[0].replace(os.sep, '/')}]]"
+                f" ({datetime.fromtimestamp(mtime / 1e9).strftime('%H:%M')})"
+                for rel_path, mtime in cache.touched_between(
+                    day_start, day_start + timedelta(days=1)
+                )
+                if rel_path not in own_files
+            ]
+            reviews = [
+                f"- [[{os.path.splitext(rel_path)[0].replace(os.sep, '/')}]]"
+                f" (reviewed {reviewed})"
+                for rel_path, reviewed in cache.due_for_review(
+                    day_start.date() - timedelta(days=review_days)
+                )
+                if rel_path not in own_files
+            ]
 
-            # Format the note with tags if provided
-            tag_str = ""
-            if tags and len(tags) > 0:
-                tag_str = f" #{' #'.join(tags)}"
+            with open(note_path, "r", encoding="utf-8") as f:
+                content = f.read()
+            updated = content
+            for name, items in (("touched", touched), ("reviews", reviews)):
+                replaced = replace_marked_block(updated, name, "\n".join(items) or "-")
+                if replaced is None:
+                    logger.error(f"Daily note has no noter:{name} markers")
+                    return False
+                updated = replaced
+
+            if updated != content:
+                self._replace_file(note_path, updated, self._digest(content))
+            cache.save()
+            return True
 
-            formatted_note = f"- [{timestamp}] {note}{tag_str}\n"
+        except Exception as e:
+            logger.error(f"Error refreshing activity lists: {e}")
+            return False
 
-            if not os.path.exists(note_path):
-                with open(note_path, "w", encoding="utf-8") as file:
-                    file.write(
-                        self.template_manager.create_basic_template(
-                            note_date, formatted_note.rstrip()
-                        )
+    @property
+    def dedup_index(self) -> DedupIndex:
+        """Lazily create the per-day idempotency index"""
+        if self._dedup_index is None:
+            self._dedup_index = DedupIndex(os.path.join(self.get_state_dir(), "dedup"))
+        return self._dedup_index
+
+    def _idempotency_key(
+        self, note_date: str, timestamp: str, text: str, entry_id: Optional[str]
+    ) -> Optional[str]:
+        """Get the key used to detect retried appends, if deduplication applies"""
+        if entry_id:
+            return make_key("id", entry_id)
+        if config_flag(self.config, "dedup_notes"):
+            return make_key("content", note_date, timestamp, text)
+        return None
+
+    def append_to_note(
+        self,
+        note: str,
+        note_date: str,
+        tags: Optional[List[str]] = None,
+        entry_id: Optional[str] = None,
+        section: Optional[str] = None,
+        at: Optional[str] = None,
+    ) -> bool:
+        """Add a note to the Notes & Observations section of the daily note file
+
+        ``section`` selects another section by name (``tasks``, ``summary``)
+        or by its literal ``## `` header. ``at`` (``HH:MM``) stamps the note
+        with that time and places it among the section's notes in time order.
+
+        When ``entry_id`` is given (or ``dedup_notes`` is enabled in the config)
+        a note whose key was already recorded for the day is skipped, so retried
+        appends succeed without writing a duplicate bullet.
+        """
+        entry = NoteEntry(note, tags, note_date, entry_id, section, at)
+        return self.append_entry(note_date, entry).error is None
+
+    def append_entry(self, note_date: str, entry: NoteEntry) -> AppendResult:
+        """Add one note and sync it, logging failures and skipped duplicates
+
+        The result's ``path`` is the file the note went to, which is a
+        continuation file once the day has rolled over.
+        """
+        result = self.append_entries(note_date, [entry])[0]
+        self.sync()
+        if result.error is not None:
+            logger.error(f"Error appending note: {result.error}")
+        elif result.duplicate:
+            logger.info(f"Skipping duplicate note for {note_date}")
+        elif result.block_id:
+            logger.info(f"Entry ID: ^{result.block_id}")
+        return result
+
+    def append_entries(
+        self, note_date: str, entries: List[NoteEntry]
+    ) -> List[AppendResult]:
+        """Add several notes to one day with a single read and write per file
+
+        Entries bound for different sections of the day still share that one
+        rewrite. Returns one result per entry, in order, instead of logging
+        failures.
+        """
+        self._sync_lock.acquire()
+        self._batching = True
+        grouped = (self.config.get("durability") or "none").lower() == "group"
+        try:
+            time_format = self.config.get("time_format") or "%H:%M"
+            now = datetime.now().strftime(time_format)
+            # (entry index, note, idempotency key, pages linked from the entry)
+            pending: List[Tuple[int, PendingNote, Optional[str], List[str]]] = []
+            results: List[Optional[AppendResult]] = []
+            seen = set()
+            block_ids: Dict[int, str] = {}
+            spill_bytes = config_int(self.config, "attachment_bytes")
+            attachments: Set[str] = set()
+            for i, entry in enumerate(entries):
+                header = self.section_header(entry.section)
+                timestamp = now
+                if entry.at:
+                    timestamp = datetime.strptime(entry.at, "%H:%M").strftime(
+                        time_format
+                    )
+                # Format the note with tags if provided
+                tag_str = ""
+                if entry.tags and len(entry.tags) > 0:
+                    tag_str = f" #{' #'.join(entry.tags)}"
+                text = f"{entry.text}{tag_str}"
+                # From the text as given, not an attachment's embed
+                pages = extract_links(text)
+                if header != self.section_header(None):
+                    text = f"{header}\x00{text}"
+                key = self._idempotency_key(note_date, timestamp, text, entry.entry_id)
+                if key is not None and (
+                    key in seen
+                    or (note_date, key) in self._unsynced_keys
+                    or self.dedup_index.contains(note_date, key)
+                ):
+                    results.append(AppendResult(note_date, None, False, True, None))
+                    continue
+                if key is not None:
+                    seen.add(key)
+                entry_text = entry.text
+                if spill_bytes and len(entry_text.encode("utf-8")) > spill_bytes:
+                    entry_text = self._write_attachment(entry_text, attachments)
+                bullet = f"- [{timestamp}] {entry_text}{tag_str}\n"
+                if config_flag(self.config, "block_ids"):
+                    block_id = new_block_id()
+                    while block_id in self.block_index or block_id in block_ids:
+                        block_id = new_block_id()
+                    block_ids[i] = block_id
+                    bullet = f"{bullet[:-1]} ^{block_id}\n"
+                note = PendingNote(header, bullet, bool(entry.at))
+                pending.append((i, note, key, pages))
+                results.append(None)
+
+            if pending:
+                paths = self._insert_notes(
+                    note_date, [note for _, note, _, _ in pending]
+                )
+                links: List[Backlink] = []
+                for (i, (_, bullet, _), key, pages), path in zip(pending, paths):
+                    if key is not None and grouped:
+                        # A key on disk before its note would drop the retry
+                        self._unsynced_keys.add((note_date, key))
+                    elif key is not None:
+                        self.dedup_index.add(note_date, key)
+                    line = bullet[2:].rstrip("\n")
+                    links.extend((page, note_date, line) for page in pages)
+                    results[i] = AppendResult(
+                        note_date, path, True, False, None, block_ids.get(i)
                     )
-                logger.info(f"Created new daily note file for {note_date}")
-                return True
-
-            with open(note_path, "r", encoding="utf-8") as file:
-                lines = file.readlines()
-
-            # Find the Notes & Observations section
-            notes_start = -1
-            section_end = len(lines)
-            for i, line in enumerate(lines):
-                if "## ✍️ Notes & Observations" in line:
-                    notes_start = i
-                elif notes_start != -1 and line.startswith("## "):
-                    section_end = i
+                self.link_index.add(links)
+                if block_ids:
+                    self._record_blocks(note_date, set(paths), set(block_ids.values()))
+                self._queue_mirror(
+                    set(paths) | attachments | {self.get_note_path(note_date)}
+                )
+            return [result for result in results if result is not None]
+
+        except Exception as e:
+            return [
+                AppendResult(note_date, None, False, False, str(e)) for _ in entries
+            ]
+        finally:
+            self._batching = False
+            interval = config_int(self.config, "durability_interval_ms") / 1000
+            if time.monotonic() - self._synced_at >= interval:
+                self.sync()
+            elif self._unsynced or self._unsynced_keys:
+                self._schedule_sync(interval)
+            self._sync_lock.release()
+
+    def _write_attachment(self, text: str, written: Set[str]) -> str:
+        """Store oversized entry text in its own note and return the entry to use
+
+        Attachments are named after their content, so text that was already
+        stored is linked to again instead of being written twice.
+        """
+        folder = self.config.get("attachment_folder") or DEFAULT_FOLDER
+        rel_path, content, entry_text = spill(text, folder)
+        path = self._vault_file(rel_path)
+        if not os.path.exists(path):
+            self.make_dirs(path)
+            self._write_note(path, content, atomic=True)
+            written.add(path)
+        return entry_text
+
+    @property
+    def link_index(self) -> LinkIndex:
+        """Lazily open the backlink index of captured entries"""
+        if self._link_index is None:
+            self._link_index = LinkIndex(
+                os.path.join(self.get_state_dir(), "links.jsonl")
+            )
+        return self._link_index
+
+    def rebuild_link_index(self, workers: Optional[int] = None) -> int:
+        """Rebuild the backlink index from the entries of every daily note
+
+        Returns the number of links found. Days are scanned across a process
+        pool unless ``workers`` is 1.
+        """
+        date_format = self.config.get("date_format") or "%Y-%m-%d"
+        headers = [self.section_header(name) for name in SECTION_HEADERS]
+        jobs = []
+        for day, _ in self.list_days():
+            note_date = day.strftime(date_format)
+            jobs.append((note_date, self.get_day_paths(note_date), headers))
+        return rebuild_links(jobs, self.link_index, workers)
+
+    def refresh_links(self, rel_paths: List[str]) -> None:
+        """Re-read the backlinks of the days whose files changed outside noter
+
+        ``rel_paths`` are vault-relative paths as reported by the watcher;
+        anything that is not a daily note or continuation file is ignored.
+        """
+        date_format = self.config.get("date_format") or "%Y-%m-%d"
+        days: List[str] = []
+        for rel_path in rel_paths:
+            rel_path = rel_path.replace(os.sep, "/")
+            if not rel_path.endswith(".md"):
+                continue
+            stem = rel_path[: -len(".md")]
+            part = re.fullmatch(r"(.+)\.\d+", stem)
+            for candidate in (stem, part[1] if part else None):
+                if candidate and parse_note_date(candidate, date_format):
+                    days.append(candidate)
                     break
+        headers = [self.section_header(name) for name in SECTION_HEADERS]
+        for note_date in dict.fromkeys(days):
+            job = (note_date, self.get_day_paths(note_date), headers)
+            self.link_index.replace_day(note_date, day_links(job))
+
+    @property
+    def block_index(self) -> BlockIndex:
+        """Lazily open the index of entry block IDs"""
+        if self._block_index is None:
+            self._block_index = BlockIndex(
+                os.path.join(self.get_state_dir(), "blocks.jsonl")
+            )
+        return self._block_index
+
+    def make_dirs(self, path: str) -> None:
+        """Create the folders of a vault file, but never the vault root itself
+
+        The config snapshot skips checking the vault path, so a vault that was
+        moved or unmounted is only noticed here, before anything is written.
+        """
+        vault_path = self.config["obsidian_vault_path"] or ""
+        if not os.path.isdir(vault_path):
+            raise FileNotFoundError(
+                f"Obsidian vault directory not found at: {vault_path}"
+            )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def _vault_file(self, rel_path: str) -> str:
+        """Turn a vault-relative path back into a file path"""
+        vault_path = self.config["obsidian_vault_path"] or ""
+        return os.path.join(vault_path, *rel_path.split("/"))
+
+    def _record_blocks(self, note_date: str, paths: Set[str], wanted: Set[str]) -> None:
+        """Index where newly written block IDs landed"""
+        blocks: List[Tuple[str, BlockLocation]] = []
+        for path in paths:
+            with open(path, "rb") as f:
+                data = f.read()
+            location = BlockLocation(note_date, self._rel_path(path), 0, 0)
+            blocks.extend(
+                (block_id, location._replace(offset=offset, length=length))
+                for block_id, offset, length in scan_blocks(data)
+                if block_id in wanted
+            )
+        self.block_index.add(blocks)
 
-            if notes_start == -1:
-                logger.error("Could not find Notes & Observations section")
-                return False
+    def _locate_block(self, block_id: str) -> Optional[Tuple[BlockLocation, bytes]]:
+        """Find the line of a block, returning its location and file content
+
+        The recorded offset is checked first; if the entry has moved since,
+        its file is rescanned.
+        """
+        location = self.block_index.get(block_id)
+        if location is None:
+            return None
+        path = self._vault_file(location.path)
+        if not os.path.exists(path):
+            self.restore_day(location.note_date)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        start, end = location.offset, location.offset + location.length
+        if line_block_id(data[start:end]) == block_id and (
+            start == 0 or data[start - 1 : start] == b"\n"
+        ):
+            return location, data
+        for found, offset, length in scan_blocks(data):
+            if found == block_id:
+                return location._replace(offset=offset, length=length), data
+        return None
+
+    def amend_block(self, block_id: str, text: str) -> Optional[BlockLocation]:
+        """Replace the text of an entry, keeping its timestamp and block ID
+
+        Returns the entry's new location, or None if the ID is not found.
+        """
+        block_id = normalise_id(block_id)
+        found = self._locate_block(block_id)
+        if found is None:
+            return None
+        location, data = found
+        end = location.offset + location.length
+        line = data[location.offset : end].decode("utf-8")
+        prefix = _BULLET_PREFIX.match(line)
+        ending = line[len(line.rstrip("\r\n")) :]
+        amended = f"{prefix[0] if prefix else '- '}{text} ^{block_id}{ending}"
+        encoded = amended.encode("utf-8")
+        content = data[: location.offset] + encoded + data[end:]
+        self._replace_file(self._vault_file(location.path), content.decode("utf-8"))
+        location = location._replace(length=len(encoded))
+        self.block_index.add([(block_id, location)])
+        self._relink(location.note_date, line, amended)
+        return location
+
+    def remove_block(self, block_id: str) -> Optional[BlockLocation]:
+        """Delete an entry's line, returning where it was or None if not found"""
+        block_id = normalise_id(block_id)
+        found = self._locate_block(block_id)
+        if found is None:
+            return None
+        location, data = found
+        end = location.offset + location.length
+        content = data[: location.offset] + data[end:]
+        self._replace_file(self._vault_file(location.path), content.decode("utf-8"))
+        self.block_index.remove(block_id)
+        self._relink(location.note_date, data[location.offset : end].decode("utf-8"))
+        return location
+
+    def _relink(self, note_date: str, old_line: str, new_line: str = "") -> None:
+        """Move the backlinks of an amended (or deleted) entry line to its new text
+
+        Entries are indexed by their text after ``- ``, like ``day_links``
+        reads them from the note.
+        """
+        old_entry = old_line.rstrip("\r\n")[2:] if old_line.startswith("- ") else ""
+        new_entry = new_line.rstrip("\r\n")[2:] if new_line.startswith("- ") else ""
+        if extract_links(old_entry):
+            self.link_index.remove(note_date, old_entry)
+        self.link_index.add(
+            [(page, note_date, new_entry) for page in extract_links(new_entry)]
+        )
+
+    def rebuild_block_index(self, workers: Optional[int] = None) -> int:
+        """Rebuild the block ID index from every daily note
+
+        Returns the number of block IDs found. Days are scanned across a
+        process pool unless ``workers`` is 1.
+        """
+        date_format = self.config.get("date_format") or "%Y-%m-%d"
+        vault_path = self.config["obsidian_vault_path"] or ""
+        jobs = []
+        for day, _ in self.list_days():
+            note_date = day.strftime(date_format)
+            rel_paths = [self._rel_path(path) for path in self.get_day_paths(note_date)]
+            jobs.append((note_date, vault_path, rel_paths))
+        return rebuild_blocks(jobs, self.block_index, workers)
+
+    def section_header(self, section: Optional[str]) -> str:
+        """Resolve a section name to its header line
+
+        Names map to the ``<name>_section`` config setting or the default
+        template's header; values starting with ``#`` are used verbatim.
+        """
+        name = (section or "notes").strip()
+        if name.startswith("#"):
+            return name
+        header = self.config.get(f"{name.lower()}_section") or SECTION_HEADERS.get(
+            name.lower()
+        )
+        if not header:
+            raise ValueError(f"Unknown section: {name}")
+        return header
+
+    def pregenerate(
+        self, start: date, end: date, workers: Optional[int] = None
+    ) -> List[Tuple[str, bool]]:
+        """Create empty daily notes for every day in [start, end]
+
+        Existing notes are left untouched. Returns (path, created) pairs in
+        date order; files are rendered and written on a thread pool.
+        """
+        date_format = self.config.get("date_format") or "%Y-%m-%d"
+        days = [
+            (start + timedelta(days=offset)).strftime(date_format)
+            for offset in range((end - start).days + 1)
+        ]
+
+        def create(note_date: str) -> Tuple[str, bool]:
+            path = self.get_note_path(note_date)
+            if os.path.exists(path):
+                return path, False
+            content = self.template_manager.create_basic_template(note_date, "")
+            self.make_dirs(path)
+            try:
+                with open(path, "x", encoding="utf-8") as file:
+                    file.write(content)
+            except FileExistsError:
+                return path, False
+            return path, True
+
+        with ThreadPoolExecutor(workers) as pool:
+            return list(pool.map(create, days))
+
+    def clear_cache(self) -> None:
+        """Forget the cached parses of daily notes"""
+        self._documents.clear()
+
+    def _load_document(self, path: str) -> DailyDocument:
+        """Parse a daily note, reusing the cached parse if the file is unchanged"""
+        st = os.stat(path)
+        cached = self._documents.get(path)
+        if cached is not None and cached[0] == (st.st_mtime_ns, st.st_size):
+            return cached[1]
+        with open(path, "r", encoding="utf-8") as file:
+            document = DailyDocument(file.readlines())
+        self._cache_document(path, document, self._digest("".join(document.lines)))
+        return document
+
+    def _cache_document(
+        self, path: str, document: DailyDocument, digest: Optional[str]
+    ) -> None:
+        """Remember a parsed note together with the stat of the file on disk"""
+        st = os.stat(path)
+        self._documents.pop(path, None)
+        self._documents[path] = ((st.st_mtime_ns, st.st_size), document, digest)
+        while len(self._documents) > DOCUMENT_CACHE_SIZE:
+            del self._documents[next(iter(self._documents))]
+
+    def _write_document(self, path: str, document: DailyDocument) -> None:
+        """Write a parsed note back to disk"""
+        digest = None
+        cached = self._documents.get(path)
+        if cached is not None and cached[2] is not None:
+            st = os.stat(path)
+            if cached[0] == (st.st_mtime_ns, st.st_size):
+                digest = cached[2]
+        content = "".join(document.lines)
+        self._replace_file(path, content, digest)
+        self._cache_document(path, document, self._digest(content))
+
+    @property
+    def snapshot_store(self) -> SnapshotStore:
+        """Lazily open the store of pre-write versions of notes"""
+        if self._snapshot_store is None:
+            self._snapshot_store = SnapshotStore(
+                os.path.join(self.get_state_dir(), "snapshots"),
+                config_int(self.config, "snapshot_retention_days", 14),
+            )
+        return self._snapshot_store
+
+    def _digest(self, content: str) -> Optional[str]:
+        """Hash note content when snapshots are enabled, for free dedup later"""
+        if not config_flag(self.config, "snapshots"):
+            return None
+        return content_digest(content.encode("utf-8"))
+
+    def _replace_file(
+        self,
+        path: str,
+        content: str,
+        digest: Optional[str] = None,
+        force_snapshot: bool = False,
+    ) -> None:
+        """Write new content over an existing note
+
+        With ``snapshots`` enabled the old version is first hardlinked into
+        the snapshot store and the note is then replaced atomically, so the
+        old version is kept without copying it. ``digest`` is the hash of the
+        content on disk when the caller already knows it.
+        """
+        if not (force_snapshot or config_flag(self.config, "snapshots")):
+            self._write_note(path, content)
+            return
+        if digest is None:
+            with open(path, "r", encoding="utf-8") as file:
+                digest = content_digest(file.read().encode("utf-8"))
+        self.snapshot_store.save(path, self._rel_path(path), digest, replacing=True)
+        self._write_note(path, content, atomic=True)
+
+    def _write_note(self, path: str, content: str, atomic: bool = False) -> None:
+        """Write a whole note as durably as the ``durability`` setting asks
+
+        Without durability the file is overwritten in place unless ``atomic``
+        is set. Otherwise it is replaced through a temporary file, synced
+        straight away or, under ``group``, when the current batch ends.
+        """
+        durability = (self.config.get("durability") or "none").lower()
+        if durability == "none" and not atomic:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(content)
+            return
+        grouped = durability == "group" and self._batching
+        atomic_write(path, content, sync=durability != "none" and not grouped)
+        if grouped:
+            self._unsynced.add(path)
+
+    def _write_link(self, path: str, text: str) -> None:
+        """Append a line to a note, syncing it like ``_write_note`` would"""
+        with open(path, "a", encoding="utf-8") as file:
+            file.write(text)
+        self._sync_in_place(path)
+
+    def _sync_in_place(self, path: str) -> None:
+        """Sync a note changed in place as the ``durability`` setting asks"""
+        durability = (self.config.get("durability") or "none").lower()
+        if durability == "group" and self._batching:
+            self._unsynced.add(path)
+        elif durability != "none":
+            sync_file(path)
+
+    def _queue_mirror(self, paths: Set[str]) -> None:
+        """Hand written notes to the background mirror, if ``mirror_path`` is set"""
+        dest = self.config.get("mirror_path")
+        if not dest:
+            return
+        if self._mirror is None:
+            vault_path = self.config["obsidian_vault_path"] or ""
+            self._mirror = BackgroundMirror(Mirror(vault_path, dest))
+            self._mirror.start()
+        self._mirror.submit(sorted(self._rel_path(path) for path in paths))
+
+    def flush_mirror(self) -> None:
+        """Wait for notes queued for the mirror to be copied"""
+        if self._mirror is not None:
+            self._mirror.stop()
+            self._mirror.join()
+            self._mirror = None
+
+    def sync(self) -> None:
+        """Flush the notes written since the last sync under ``group`` durability
+
+        Each file is synced, then each directory holding one, so the renames
+        that put them in place are durable too. The idempotency keys of the
+        synced notes are recorded last, so a key never outlives its note.
+        """
+        with self._sync_lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+            paths, self._unsynced = self._unsynced, set()
+            keys, self._unsynced_keys = self._unsynced_keys, set()
+            for path in sorted(paths):
+                sync_file(path)
+            for directory in sorted({os.path.dirname(path) for path in paths}):
+                sync_dir(directory)
+            for note_date, key in sorted(keys):
+                self.dedup_index.add(note_date, key)
+            self._synced_at = time.monotonic()
+
+    def _schedule_sync(self, interval: float) -> None:
+        """Sync on a timer once ``interval`` seconds have passed since the last sync
+
+        This makes ``durability_interval_ms`` an upper bound on how long an
+        added note can stay unsynced, even if no further note is added.
+        """
+        if self._sync_timer is None:
+            delay = max(0.0, self._synced_at + interval - time.monotonic())
+            self._sync_timer = threading.Timer(delay, self._timed_sync)
+            self._sync_timer.daemon = True
+            self._sync_timer.start()
+
+    def _timed_sync(self) -> None:
+        """Run a scheduled sync on the timer thread"""
+        try:
+            self.sync()
+        except OSError as e:
+            logger.warning(f"Could not sync notes: {e}")
+
+    def history(self, note_date: str) -> List[Snapshot]:
+        """List the snapshots of a day's files, newest first"""
+        main = self._rel_path(self.get_note_path(note_date))
+        stem = re.escape(main[: -len(".md")])
+        pattern = re.compile(rf"{stem}(?:\.\d+)?\.md")
+        return [
+            snapshot
+            for snapshot in reversed(self.snapshot_store.snapshots())
+            if pattern.fullmatch(snapshot.path)
+        ]
 
-            # Find the last content bullet point
-            last_bullet = notes_start
-            for i in range(notes_start + 1, section_end):
-                line = lines[i].rstrip()
-                if line.startswith("- ") and not line.strip() == "-":
-                    last_bullet = i
-
-            # Add the note at the appropriate position
-            if last_bullet > notes_start:
-                # Add after the last bullet
-                insert_at = last_bullet + 1
-                lines.insert(insert_at, formatted_note)
-
-                # Remove any trailing empty bullets
-                i = len(lines) - 1
-                while i > insert_at:
-                    if lines[i].strip() == "-":
-                        del lines[i]
-                    elif lines[i].strip():
-                        break
-                    i -= 1
+    def undo(self, note_date: str, version: int = 1) -> Optional[Snapshot]:
+        """Restore a file of a day to one of its snapshots
+
+        ``version`` counts back from the newest snapshot of the day. The
+        version being replaced is snapshotted first, so an undo can itself be
+        undone. The block IDs and links of the restored file are re-indexed.
+        Returns the restored snapshot, or None if there is none.
+        """
+        snapshots = self.history(note_date)
+        if not 1 <= version <= len(snapshots):
+            return None
+        snapshot = snapshots[version - 1]
+        vault_path = self.config["obsidian_vault_path"] or ""
+        path = os.path.join(vault_path, *snapshot.path.split("/"))
+        content = self.snapshot_store.read(snapshot.digest)
+        if os.path.exists(path):
+            self._replace_file(path, content, force_snapshot=True)
+        else:
+            self.make_dirs(path)
+            atomic_write(path, content)
+        self._documents.pop(path, None)
+        self._active_parts.pop(note_date, None)
+        self.block_index.add(day_blocks((note_date, vault_path, [snapshot.path])))
+        self.refresh_links([snapshot.path])
+        return snapshot
+
+    def rewrite_note(
+        self, path: str, content: str, digest: Optional[str] = None
+    ) -> None:
+        """Replace a whole note on behalf of a bulk command (migrate, doctor)
+
+        The old version is always snapshotted, so ``noter undo`` can take the
+        change back, and the write honours the ``durability`` setting.
+        ``digest`` is the hash of the bytes on disk when the caller has them.
+        """
+        self._replace_file(path, content, digest, force_snapshot=True)
+        self._documents.pop(path, None)
+
+    def _insert_notes(self, note_date: str, notes: List[PendingNote]) -> List[str]:
+        """Write (section header, bullet) pairs into a day, returning their paths
+
+        Notes go into the active part of the day; once it reaches the
+        ``max_note_bytes`` or ``max_note_entries`` limit the remaining notes
+        roll over into a new continuation file. Only bullets in the Notes &
+        Observations section count towards ``max_note_entries``.
+        """
+        max_bytes = config_int(self.config, "max_note_bytes")
+        max_entries = config_int(self.config, "max_note_entries")
+        # Back-dated notes go into the archived day rather than a fresh note
+        if not os.path.exists(self.get_note_path(note_date)):
+            self.restore_day(note_date)
+        paths: List[str] = []
+        while len(paths) < len(notes):
+            remaining = notes[len(paths) :]
+            part = self._active_part(note_date)
+            note_path = self.get_continuation_path(note_date, part)
+            if not os.path.exists(note_path):
+                written = self._take(remaining, max_entries or None)
+                self._create_part(note_date, part, written)
+            # Check the size limit before reading so an oversized day costs a stat
+            elif max_bytes and os.path.getsize(note_path) >= max_bytes:
+                written = self._take(remaining, max_entries or None)
+                note_path = self._create_part(note_date, part + 1, written)
             else:
-                # First note in section
-                # Ensure one blank line after header
-                if notes_start + 1 >= len(lines) or lines[notes_start + 1].strip():
-                    lines.insert(notes_start + 1, "\n")
-                # Add the note
-                lines.insert(notes_start + 2, formatted_note)
-                # Add empty bullet only for the first note
-                lines.insert(notes_start + 3, "- \n")
-
-            # Write back to file
-            with open(note_path, "w", encoding="utf-8") as file:
-                file.writelines(lines)
+                document = self._load_document(note_path)
+                room = None
+                if max_entries:
+                    room = max(max_entries - self._count_entries(document), 0)
+                written = self._take(remaining, room)
+                if not written:
+                    written = self._take(remaining, max_entries)
+                    note_path = self._create_part(note_date, part + 1, written)
+                else:
+                    try:
+                        self._insert_into_document(document, written)
+                        self._write_document(note_path, document)
+                    except Exception:
+                        # The cached parse may hold lines that never reached disk
+                        self._documents.pop(note_path, None)
+                        raise
+            paths.extend([note_path] * len(written))
+        return paths
+
+    def _take(self, notes: List[PendingNote], room: Optional[int]) -> List[PendingNote]:
+        """Take the leading notes that fit in ``room`` Notes entries, if limited"""
+        if room is None:
+            return notes
+        notes_header = self.section_header(None)
+        taken = 0
+        for i, note in enumerate(notes):
+            if note.header == notes_header:
+                if taken == room:
+                    return notes[:i]
+                taken += 1
+        return notes
+
+    def _count_entries(self, document: DailyDocument) -> int:
+        """Count the non-empty bullets in the Notes & Observations section"""
+        header = self.section_header(None)
+        section = document.find_section(header)
+        if section is None:
+            raise ValueError(f"Could not find {header.lstrip('# ')} section")
+        return sum(
+            1
+            for line in document.body(section)
+            if line.startswith("- ") and not line.strip() == "-"
+        )
 
-            return True
+    def _insert_into_document(
+        self, document: DailyDocument, notes: List[PendingNote]
+    ) -> None:
+        """Insert bullets after the last bullet of their target sections
+
+        Timed bullets go before the first bullet stamped later than them
+        instead.
+        """
+        by_section: Dict[str, List[PendingNote]] = {}
+        for note in notes:
+            by_section.setdefault(note.header, []).append(note)
+        for header, pending in by_section.items():
+            section = document.find_section(header)
+            if section is None:
+                raise ValueError(f"Could not find {header.lstrip('# ')} section")
+            bullets = [note.bullet for note in pending if not note.timed]
+            if bullets:
+                self._insert_into_section(document, section, bullets)
+            for note in pending:
+                if note.timed:
+                    section = document.find_section(header)
+                    assert section is not None
+                    self._insert_at_time(document, section, note.bullet)
+
+    def _bullet_time(self, line: str) -> Optional[datetime]:
+        """Parse the timestamp prefix of a bullet, None if it has none"""
+        match = _STAMP_PATTERN.match(line)
+        if match is None:
+            return None
+        try:
+            return datetime.strptime(
+                match[1], self.config.get("time_format") or "%H:%M"
+            )
+        except ValueError:
+            return None
 
-        except Exception as e:
-            logger.error(f"Error appending note: {e}")
+    def _insert_at_time(
+        self, document: DailyDocument, section: Section, bullet: str
+    ) -> None:
+        """Insert a bullet before the first one of the section stamped later
+
+        The section's timestamps come from the document's cached timeline, so
+        each insert is a binary search rather than a scan of the section.
+        """
+        stamps, positions = document.timeline(section, self._bullet_time)
+        stamp = self._bullet_time(bullet)
+        at = len(stamps) if stamp is None else bisect_right(stamps, stamp)
+        if at == len(stamps):
+            self._insert_into_section(document, section, [bullet])
+        else:
+            document.insert(positions[at], [bullet])
+
+    def _insert_into_section(
+        self, document: DailyDocument, section: Section, notes: List[str]
+    ) -> None:
+        """Insert bullets after the last note of a section"""
+        section_start = section.start
+        lines = document.lines
+
+        # Find the last content bullet point and any empty placeholder bullet
+        last_bullet = section_start
+        placeholder = -1
+        for i in range(section_start + 1, section.end):
+            line = lines[i].rstrip()
+            if line.startswith("- ") and not line.strip() == "-":
+                last_bullet = i
+            elif line.strip() == "-" and placeholder == -1:
+                placeholder = i
+
+        # Add the note at the appropriate position
+        if last_bullet > section_start:
+            # Add after the last bullet
+            insert_at = last_bullet + 1
+            document.insert(insert_at, notes)
+            insert_at += len(notes) - 1
+
+            # Remove any trailing empty bullets of the section
+            i = section.end + len(notes) - 1
+            while i > insert_at:
+                if lines[i].strip() == "-":
+                    document.delete(i)
+                elif lines[i].strip():
+                    break
+                i -= 1
+        elif placeholder != -1:
+            # First note in a section with a placeholder bullet; keep the
+            # placeholder after the note
+            if not lines[placeholder].endswith("\n"):
+                lines[placeholder] += "\n"
+            document.insert(placeholder, notes)
+        else:
+            # First note in section
+            # Ensure one blank line after header
+            if section_start + 1 >= len(lines) or lines[section_start + 1].strip():
+                document.insert(section_start + 1, ["\n"])
+            # Add the notes, followed by an empty bullet only for the first note
+            document.insert(section_start + 2, notes + ["- \n"])
+
+    def _create_part(self, note_date: str, part: int, notes: List[PendingNote]) -> str:
+        """Create one part of a day from the template holding ``notes``
+
+        Parts after the first are continuation files linked from the main note.
+        """
+        path = self.get_continuation_path(note_date, part)
+        notes_header = self.section_header(None)
+        content = self.template_manager.create_basic_template(
+            note_date,
+            "".join(
+                note.bullet
+                for note in notes
+                if note.header == notes_header and not note.timed
+            ).rstrip(),
+        )
+        others = [note for note in notes if note.header != notes_header or note.timed]
+        if others:
+            document = DailyDocument.from_text(content)
+            self._insert_into_document(document, others)
+            content = "".join(document.lines)
+        self.make_dirs(path)
+        if part <= 1:
+            self._write_note(path, content)
+            logger.info(f"Created new daily note file for {note_date}")
+            return path
+
+        main_path = self.get_note_path(note_date)
+        main_link = os.path.splitext(os.path.basename(main_path))[0]
+        link = os.path.splitext(os.path.basename(path))[0]
+        lines = content.split("\n")
+        heading = next((i for i, line in enumerate(lines) if line.startswith("# ")), -1)
+        lines.insert(heading + 1, f"\n> Part {part} of [[{main_link}]]")
+        self._write_note(path, "\n".join(lines))
+
+        # Appending the link keeps the main note from being rewritten
+        self._write_link(main_path, f"\n\n> Continued in [[{link}]]\n")
+
+        self._active_parts[note_date] = part
+        logger.info(f"Started continuation file {path} for {note_date}")
+        return path
+
+
+# Embedding API
+class NoterSession:
+    """Long-lived entry point for using noter as a library
+
+    Loads the configuration once and keeps the template and note managers,
+    including their cache of parsed daily notes, warm between calls. Results
+    are returned as ``AppendResult`` values instead of being logged.
+    """
+
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        config: Optional[Dict[str, Optional[str]]] = None,
+        vault: Optional[str] = None,
+    ) -> None:
+        # Sessions created from a config file follow edits to it
+        self.config_manager: Optional[ConfigManager] = None
+        if config is None:
+            self.config_manager = ConfigManager(config_path, vault)
+            config = self.config_manager.load_config()
+            if config is None:
+                raise ValueError("Could not load the noter configuration")
+        self._use_config(config)
+
+    def _use_config(self, config: Dict[str, Optional[str]]) -> None:
+        """Rebuild the managers around a configuration"""
+        self.config = config
+        self.template_manager = TemplateManager(config)
+        self.note_manager = NoteManager(config, self.template_manager)
+
+    def reload_config(self) -> bool:
+        """Pick up edits to the config file, returning whether it changed
+
+        Called before every append, so a long-running session follows config
+        edits without restarting; notes already passed to ``append_many``
+        are written with the config they started with.
+        """
+        if self.config_manager is None:
             return False
+        config = self.config_manager.poll()
+        if config is None:
+            return False
+        self.note_manager.sync()
+        self.note_manager.flush_mirror()
+        self.note_manager.clear_cache()
+        self._use_config(config)
+        return True
+
+    def today(self) -> str:
+        """Get today's date in the configured date format"""
+        return datetime.now().strftime(self.config.get("date_format") or "%Y-%m-%d")
+
+    def append(
+        self,
+        text: str,
+        tags: Optional[List[str]] = None,
+        note_date: Optional[str] = None,
+        entry_id: Optional[str] = None,
+        section: Optional[str] = None,
+        at: Optional[str] = None,
+    ) -> AppendResult:
+        """Add one note, to today's daily note unless ``note_date`` is given
+
+        ``at`` (``HH:MM``) back-dates the note within its day.
+        """
+        entry = NoteEntry(text, tags, note_date, entry_id, section, at)
+        return self.append_many([entry])[0]
+
+    def append_many(self, notes: Iterable[Union[str, NoteEntry]]) -> List[AppendResult]:
+        """Add many notes, writing each affected daily note once
+
+        Plain strings are added to today's note; results keep the input order.
+        """
+        self.reload_config()
+        today = self.today()
+        groups: Dict[str, List[Tuple[int, NoteEntry]]] = {}
+        count = 0
+        for i, note in enumerate(notes):
+            entry = NoteEntry(note) if isinstance(note, str) else note
+            groups.setdefault(entry.note_date or today, []).append((i, entry))
+            count += 1
+
+        results: List[Optional[AppendResult]] = [None] * count
+        for note_date, group in groups.items():
+            written = self.note_manager.append_entries(
+                note_date, [entry for _, entry in group]
+            )
+            for (i, _), result in zip(group, written):
+                results[i] = result
+        return [result for result in results if result is not None]
+
+    def close(self) -> None:
+        """Sync pending writes and drop cached state
+
+        The session must not be used afterwards.
+        """
+        self.note_manager.sync()
+        self.note_manager.flush_mirror()
+        self.note_manager.clear_cache()
+
+    def __enter__(self) -> "NoterSession":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
 
 # CLI handler
@@ -400,6 +1805,7 @@ class NoterCLI:
 
     def __init__(self) -> None:
         self.parser = self._create_parser()
+        self.command_parser, self.commands = self._create_command_parser()
 
     def _create_parser(self) -> argparse.ArgumentParser:
         parser = argparse.ArgumentParser(
@@ -410,16 +1816,755 @@ class NoterCLI:
             "--tags", help="Comma-separated list of tags to add to the note"
         )
         parser.add_argument("--config", help="Path to custom config file")
+        parser.add_argument("--vault", help="Name of the vault to write to")
+        parser.add_argument(
+            "--section",
+            help="Section to add the note to: notes (default), tasks, summary "
+            "or a literal '## ' header",
+        )
+        parser.add_argument(
+            "--id",
+            dest="entry_id",
+            help="Idempotency key; a note with an already used key is skipped",
+        )
+        parser.add_argument(
+            "--at",
+            type=self._parse_time_arg,
+            help="Time (HH:MM) to stamp the note with; it is placed among the "
+            "day's notes in time order (within the file currently written to, "
+            "once a busy day has rolled over into continuation files)",
+        )
+        parser.add_argument(
+            "-i",
+            "--interactive",
+            action="store_true",
+            help="Keep prompting and add each entered line as a note",
+        )
         parser.add_argument("--version", action="version", version="Noter v1.1.2")
         return parser
 
+    def _create_command_parser(self) -> Tuple[argparse.ArgumentParser, List[str]]:
+        """Create the parser for maintenance commands such as ``noter refresh``"""
+        parser = argparse.ArgumentParser(
+            prog="noter", description="Noter - Manage your Obsidian daily notes"
+        )
+        common = argparse.ArgumentParser(add_help=False)
+        common.add_argument("--config", help="Path to custom config file")
+        common.add_argument("--vault", help="Name of the vault to use")
+        subparsers = parser.add_subparsers(dest="command", required=True)
+
+        refresh = subparsers.add_parser(
+            "refresh",
+            parents=[common],
+            help="Update the static touched and review lists in a daily note",
+        )
+        refresh.add_argument("--date", help="Date of the daily note (default: today)")
+        refresh.set_defaults(handler=self._run_refresh)
+
+        migrate = subparsers.add_parser(
+            "migrate",
+            parents=[common],
+            help="Restructure existing daily notes into the current template",
+        )
+        migrate.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print unified diffs instead of writing any file",
+        )
+        migrate.add_argument(
+            "--workers", type=int, help="Number of worker processes (default: CPUs)"
+        )
+        migrate.set_defaults(handler=self._run_migrate)
+
+        doctor = subparsers.add_parser(
+            "doctor",
+            parents=[common],
+            help="Check every daily note for structural problems",
+        )
+        doctor.add_argument(
+            "--fix",
+            action="store_true",
+            help="Repair the problems that can be fixed safely",
+        )
+        doctor.add_argument(
+            "--workers", type=int, help="Number of worker processes (default: CPUs)"
+        )
+        doctor.set_defaults(handler=self._run_doctor)
+
+        pregen = subparsers.add_parser(
+            "pregen",
+            parents=[common],
+            help="Create the daily notes for a range of dates ahead of time",
+        )
+        pregen.add_argument(
+            "--from", dest="start", help="First date to create (default: today)"
+        )
+        range_end = pregen.add_mutually_exclusive_group(required=True)
+        range_end.add_argument("--to", dest="end", help="Last date to create")
+        range_end.add_argument(
+            "--days", type=int, help="Number of days to create, starting at --from"
+        )
+        pregen.add_argument("--workers", type=int, help="Number of writer threads")
+        pregen.set_defaults(handler=self._run_pregen)
+
+        rollup = subparsers.add_parser(
+            "rollup",
+            parents=[common],
+            help="Write a weekly or monthly review note from the daily notes",
+        )
+        period = rollup.add_mutually_exclusive_group(required=True)
+        period.add_argument(
+            "--week",
+            nargs="?",
+            const="current",
+            help="ISO week as YYYY-Www (default: the current week)",
+        )
+        period.add_argument(
+            "--month",
+            nargs="?",
+            const="current",
+            help="Month as YYYY-MM (default: the current month)",
+        )
+        rollup.add_argument(
+            "--workers", type=int, help="Number of worker processes (default: CPUs)"
+        )
+        rollup.set_defaults(handler=self._run_rollup)
+
+        archive = subparsers.add_parser(
+            "archive",
+            parents=[common],
+            help="Pack old daily notes into compressed per-year bundles",
+        )
+        archive.add_argument(
+            "--before", required=True, help="Archive the daily notes before this date"
+        )
+        archive.set_defaults(handler=self._run_archive)
+
+        backlinks = subparsers.add_parser(
+            "backlinks",
+            parents=[common],
+            help="List the entries linking to a page",
+        )
+        backlinks.add_argument("page", nargs="?", help="Name of the linked page")
+        backlinks.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Rebuild the index from the daily notes first",
+        )
+        backlinks.add_argument(
+            "--workers", type=int, help="Number of worker processes (default: CPUs)"
+        )
+        backlinks.set_defaults(handler=self._run_backlinks)
+
+        amend = subparsers.add_parser(
+            "amend",
+            parents=[common],
+            help="Replace the text of the entry with a block ID",
+        )
+        amend.add_argument("block_id", help="Block ID of the entry, e.g. ^k3x9q2")
+        amend.add_argument("text", help="New text of the entry")
+        amend.set_defaults(handler=self._run_amend)
+
+        remove = subparsers.add_parser(
+            "rm",
+            parents=[common],
+            help="Delete the entry with a block ID",
+        )
+        remove.add_argument("block_id", help="Block ID of the entry, e.g. ^k3x9q2")
+        remove.set_defaults(handler=self._run_rm)
+
+        reindex = subparsers.add_parser(
+            "reindex",
+            parents=[common],
+            help="Rebuild the block ID index from the daily notes",
+        )
+        reindex.add_argument(
+            "--workers", type=int, help="Number of worker processes (default: CPUs)"
+        )
+        reindex.set_defaults(handler=self._run_reindex)
+
+        mirror = subparsers.add_parser(
+            "mirror",
+            parents=[common],
+            help="Copy the notes that changed since the last run to a backup folder",
+        )
+        mirror.add_argument(
+            "dest", nargs="?", help="Backup folder (default: the mirror_path setting)"
+        )
+        mirror.add_argument(
+            "--workers", type=int, help="Number of copying threads (default: auto)"
+        )
+        mirror.set_defaults(handler=self._run_mirror)
+
+        batch = subparsers.add_parser(
+            "batch",
+            parents=[common],
+            help="Add one note per input line, routing each to its vault",
+        )
+        batch.add_argument(
+            "--file", help="Read notes from this file instead of standard input"
+        )
+        batch.set_defaults(handler=self._run_batch)
+
+        watch = subparsers.add_parser(
+            "watch",
+            parents=[common],
+            help="Poll the vault for edits and keep noter's indexes up to date",
+        )
+        watch.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds between polls (default: 2)",
+        )
+        watch.add_argument(
+            "--ticks", type=int, help="Stop after this many polls (default: never)"
+        )
+        watch.set_defaults(handler=self._run_watch)
+
+        gen_vault = subparsers.add_parser(
+            "gen-vault",
+            parents=[common],
+            help="Generate a reproducible synthetic vault for load tests",
+        )
+        gen_vault.add_argument("dest", help="Folder to write the daily notes to")
+        gen_vault.add_argument(
+            "--days", type=int, default=365, help="Number of days (default: 365)"
+        )
+        gen_vault.add_argument(
+            "--start", help="First day (default: DAYS days before today)"
+        )
+        gen_vault.add_argument("--seed", type=int, default=0, help="Random seed")
+        gen_vault.add_argument(
+            "--entries",
+            type=float,
+            default=8.0,
+            help="Mean entries on an ordinary day (default: 8)",
+        )
+        gen_vault.add_argument(
+            "--heavy-ratio",
+            type=float,
+            default=0.02,
+            help="Fraction of days with ~150x the usual entries (default: 0.02)",
+        )
+        gen_vault.add_argument(
+            "--entry-bytes",
+            type=int,
+            default=80,
+            help="Mean length of an entry in bytes (default: 80)",
+        )
+        gen_vault.add_argument(
+            "--broken-ratio",
+            type=float,
+            default=0.05,
+            help="Fraction of days missing a section or frontmatter (default: 0.05)",
+        )
+        gen_vault.add_argument(
+            "--workers", type=int, help="Number of worker processes (default: CPUs)"
+        )
+        gen_vault.add_argument(
+            "--force",
+            action="store_true",
+            help="Write into a folder that is not empty, replacing existing notes",
+        )
+        gen_vault.set_defaults(handler=self._run_gen_vault)
+
+        history = subparsers.add_parser(
+            "history",
+            parents=[common],
+            help="List the snapshots taken of a daily note before noter rewrote it",
+        )
+        history.add_argument("date", nargs="?", help="Date of the daily note")
+        history.set_defaults(handler=self._run_history)
+
+        undo = subparsers.add_parser(
+            "undo",
+            parents=[common],
+            help="Restore a daily note to a snapshot (default: the latest)",
+        )
+        undo.add_argument("--date", help="Date of the daily note (default: today)")
+        undo.add_argument(
+            "--version",
+            type=int,
+            default=1,
+            help="Snapshot to restore, as numbered by noter history",
+        )
+        undo.set_defaults(handler=self._run_undo)
+
+        find = subparsers.add_parser(
+            "find",
+            parents=[common],
+            help="List notes by frontmatter, e.g. status=active priority<=2",
+        )
+        find.add_argument(
+            "queries", nargs="+", metavar="FIELD<op>VALUE", help="Conditions to match"
+        )
+        find.set_defaults(handler=self._run_find)
+
+        set_fields = subparsers.add_parser(
+            "set",
+            parents=[common],
+            help="Set frontmatter fields of a daily note, e.g. status=done",
+        )
+        set_fields.add_argument(
+            "fields", nargs="+", metavar="FIELD=VALUE", help="Fields to set"
+        )
+        set_fields.add_argument(
+            "--date", help="Date of the daily note (default: today)"
+        )
+        set_fields.set_defaults(handler=self._run_set)
+
+        return parser, list(subparsers.choices)
+
+    def _command_index(self, argv: List[str]) -> Optional[int]:
+        """Find the command word, which may follow ``--config`` and ``--vault``
+
+        Returns None when the arguments add a note instead.
+        """
+        i = 0
+        while i < len(argv):
+            if argv[i] in ("--config", "--vault"):
+                i += 2
+            elif argv[i].startswith(("--config=", "--vault=")):
+                i += 1
+            else:
+                break
+        if i < len(argv) and argv[i] in self.commands:
+            return i
+        return None
+
+    def _run_command(self, argv: List[str]) -> int:
+        """Run a maintenance command"""
+        args = self.command_parser.parse_args(argv)
+        config = ConfigManager(args.config, args.vault).load_config()
+        if not config:
+            return 1
+        result: int = args.handler(args, config)
+        return result
+
+    def _run_refresh(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter refresh``"""
+        note_manager = NoteManager(config, TemplateManager(config))
+        note_date = self._note_date_arg(args.date, config)
+        if note_date is None:
+            return 1
+        if not note_manager.refresh_activity(note_date):
+            return 1
+        logger.info(f"✓ Refreshed activity lists for {note_date}")
+        return 0
+
+    def _run_migrate(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter migrate``"""
+        from noter.migrate import migrate_vault
+
+        note_manager = NoteManager(config, TemplateManager(config))
+        results, elapsed = migrate_vault(note_manager, args.dry_run, args.workers)
+
+        changed = [result for result in results if result.changed]
+        failed = [result for result in results if result.error]
+        if args.dry_run:
+            for result in changed:
+                sys.stdout.write(result.diff)
+        for result in failed:
+            logger.error(f"✗ Could not migrate {result.path}: {result.error}")
+
+        rate = len(results) / elapsed if elapsed > 0 else float(len(results))
+        action = "Would migrate" if args.dry_run else "Migrated"
+        logger.info(
+            f"{action} {len(changed)} of {len(results)} files "
+            f"in {elapsed:.2f}s ({rate:.0f} files/s)"
+        )
+        return 1 if failed else 0
+
+    def _run_doctor(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter doctor``"""
+        from noter.doctor import doctor_vault
+
+        note_manager = NoteManager(config, TemplateManager(config))
+        reports, elapsed = doctor_vault(note_manager, args.fix, args.workers)
+
+        vault_path = config["obsidian_vault_path"] or ""
+        for report in reports:
+            rel_path = os.path.relpath(report.path, vault_path).replace(os.sep, "/")
+            if report.error:
+                logger.error(f"✗ Could not check {rel_path}: {report.error}")
+            for problem in report.problems:
+                note = " (fixed)" if problem not in report.remaining else ""
+                sys.stdout.write(f"{rel_path}: {problem.message}{note}\n")
+
+        remaining = sum(len(report.remaining) for report in reports)
+        failed = sum(1 for report in reports if report.error)
+        fixed = sum(1 for report in reports if report.fixed)
+        rate = len(reports) / elapsed if elapsed > 0 else float(len(reports))
+        summary = (
+            f"Checked {len(reports)} files in {elapsed:.2f}s ({rate:.0f} files/s): "
+            f"{remaining} problems"
+        )
+        if args.fix:
+            summary += f" left after fixing {fixed} files"
+        if remaining or failed:
+            logger.error(f"✗ {summary}")
+            return 1
+        logger.info(f"✓ {summary}")
+        return 0
+
+    @staticmethod
+    def _parse_time_arg(value: str) -> str:
+        """Normalise an ``HH:MM`` option value"""
+        try:
+            return datetime.strptime(value, "%H:%M").strftime("%H:%M")
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected HH:MM, got {value!r}")
+
+    def _parse_date_arg(self, value: str, config: Dict[str, Optional[str]]) -> date:
+        """Parse a date given on the command line in the configured or ISO format"""
+        parsed = parse_note_date(value, config.get("date_format") or "%Y-%m-%d")
+        if parsed is not None:
+            return parsed.date()
+        return date.fromisoformat(value)
+
+    def _note_date_arg(
+        self, value: Optional[str], config: Dict[str, Optional[str]]
+    ) -> Optional[str]:
+        """Turn a ``--date`` argument (default: today) into a note date
+
+        Logs the error and returns None when the date cannot be parsed.
+        """
+        try:
+            day = self._parse_date_arg(value, config) if value else date.today()
+        except ValueError:
+            logger.error(f"✗ Invalid date: {value}")
+            return None
+        return day.strftime(config.get("date_format") or "%Y-%m-%d")
+
+    def _run_pregen(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter pregen``"""
+        start = self._parse_date_arg(args.start, config) if args.start else None
+        start = start or date.today()
+        if args.days is not None:
+            end = start + timedelta(days=args.days - 1)
+        else:
+            end = self._parse_date_arg(args.end, config)
+        if end < start:
+            logger.error("The end of the range is before its start")
+            return 1
+
+        note_manager = NoteManager(config, TemplateManager(config))
+        results = note_manager.pregenerate(start, end, args.workers)
+        created = sum(1 for _, was_created in results if was_created)
+        logger.info(
+            f"✓ Created {created} daily notes, "
+            f"{len(results) - created} already existed"
+        )
+        return 0
+
+    def _run_rollup(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter rollup``"""
+        from noter.rollup import write_rollup
+
+        note_manager = NoteManager(config, TemplateManager(config))
+        try:
+            path, days, reread = write_rollup(
+                note_manager, args.week, args.month, args.workers
+            )
+        except ValueError as e:
+            logger.error(f"✗ Invalid period: {e}")
+            return 1
+        logger.info(f"✓ Wrote {path} from {days} daily notes ({reread} re-read)")
+        return 0
+
+    def _run_archive(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter archive``"""
+        try:
+            before = self._parse_date_arg(args.before, config)
+        except ValueError:
+            logger.error(f"✗ Invalid date: {args.before}")
+            return 1
+        note_manager = NoteManager(config, TemplateManager(config))
+        archived = note_manager.archive_days(before)
+        logger.info(f"✓ Archived {len(archived)} daily notes")
+        return 0
+
+    def _run_backlinks(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter backlinks``"""
+        if not args.page and not args.rebuild:
+            logger.error("✗ Give a page name or --rebuild")
+            return 1
+        note_manager = NoteManager(config, TemplateManager(config))
+        if args.rebuild:
+            count = note_manager.rebuild_link_index(args.workers)
+            logger.info(f"✓ Rebuilt the backlink index with {count} links")
+        if args.page:
+            for note_date, entry in note_manager.link_index.backlinks(args.page):
+                sys.stdout.write(f"{note_date}: {entry}\n")
+        return 0
+
+    def _run_amend(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter amend``"""
+        note_manager = NoteManager(config, TemplateManager(config))
+        location = note_manager.amend_block(args.block_id, args.text)
+        if location is None:
+            logger.error(
+                f"✗ No entry with ID {args.block_id}; "
+                "run noter reindex if notes were edited by hand"
+            )
+            return 1
+        logger.info(f"✓ Amended the entry in {location.path}")
+        return 0
+
+    def _run_rm(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter rm``"""
+        note_manager = NoteManager(config, TemplateManager(config))
+        location = note_manager.remove_block(args.block_id)
+        if location is None:
+            logger.error(
+                f"✗ No entry with ID {args.block_id}; "
+                "run noter reindex if notes were edited by hand"
+            )
+            return 1
+        logger.info(f"✓ Removed the entry from {location.path}")
+        return 0
+
+    def _run_reindex(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter reindex``"""
+        note_manager = NoteManager(config, TemplateManager(config))
+        count = note_manager.rebuild_block_index(args.workers)
+        logger.info(f"✓ Rebuilt the block index with {count} entries")
+        return 0
+
+    def _run_mirror(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter mirror``"""
+        dest = args.dest or config.get("mirror_path")
+        if not dest:
+            logger.error("✗ Give a destination folder or set mirror_path")
+            return 1
+        vault_path = os.path.abspath(config["obsidian_vault_path"] or "")
+        if os.path.commonpath([vault_path, os.path.abspath(dest)]) == vault_path:
+            logger.error("✗ The mirror cannot be inside the vault")
+            return 1
+        stats = Mirror(vault_path, dest).run(workers=args.workers)
+        logger.info(
+            f"✓ Mirrored to {dest}: {stats.copied} copied, {stats.appended} "
+            f"appended, {stats.removed} removed, {stats.unchanged} unchanged "
+            f"({stats.bytes_written / 1024:.1f} KB written)"
+        )
+        return 0
+
+    def _run_batch(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter batch``"""
+        from noter.batch import run_batch
+
+        if args.file:
+            with open(args.file, "r", encoding="utf-8") as f:
+                results = run_batch(f, args.config, args.vault)
+        else:
+            results = run_batch(sys.stdin, args.config, args.vault)
+
+        for line_no, vault, result in results:
+            if result.error is not None:
+                where = f" ({vault})" if vault else ""
+                logger.error(f"✗ Line {line_no}{where}: {result.error}")
+        added = sum(1 for _, _, result in results if result.added)
+        duplicates = sum(1 for _, _, result in results if result.duplicate)
+        vaults = {vault for _, vault, result in results if result.ok}
+        logger.info(
+            f"✓ Added {added} notes to {len(vaults)} vaults"
+            f" ({duplicates} duplicates skipped)"
+        )
+        return 0 if all(result.ok for _, _, result in results) else 1
+
+    def _run_watch(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter watch``"""
+        from noter.watch import VaultWatcher
+
+        note_manager = NoteManager(config, TemplateManager(config))
+        cache = note_manager.stat_cache
+        cache.refresh()
+        cache.save()
+
+        def update_cache(paths: List[str]) -> None:
+            cache.update(paths)
+            cache.save()
+
+        def report(paths: List[str]) -> None:
+            for path in paths:
+                logger.info(f"Changed: {path}")
+
+        watcher = VaultWatcher(cache.vault_path)
+        watcher.subscribe(update_cache)
+        watcher.subscribe(note_manager.refresh_links)
+        watcher.subscribe(report)
+        logger.info(f"Watching {cache.vault_path} (Ctrl+C to stop)")
+        try:
+            while args.ticks is None or watcher.ticks < args.ticks:
+                watcher.tick()
+                if args.ticks is None or watcher.ticks < args.ticks:
+                    time.sleep(args.interval)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    def _run_gen_vault(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter gen-vault``"""
+        from noter.genvault import GeneratorSettings, generate_vault
+
+        if args.start:
+            start = self._parse_date_arg(args.start, config)
+        else:
+            start = date.today() - timedelta(days=args.days)
+        settings = GeneratorSettings(
+            seed=args.seed,
+            entries=args.entries,
+            heavy_ratio=args.heavy_ratio,
+            entry_bytes=args.entry_bytes,
+            broken_ratio=args.broken_ratio,
+        )
+        try:
+            entries, size, elapsed = generate_vault(
+                config, args.dest, start, args.days, settings, args.workers, args.force
+            )
+        except ValueError as e:
+            logger.error(f"✗ {e}")
+            return 1
+        logger.info(
+            f"✓ Generated {args.days} daily notes with {entries} entries "
+            f"({size / 1_000_000:.1f} MB) in {elapsed:.2f}s"
+        )
+        return 0
+
+    def _run_history(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter history``"""
+        note_manager = NoteManager(config, TemplateManager(config))
+        note_date = self._note_date_arg(args.date, config)
+        if note_date is None:
+            return 1
+        for number, snapshot in enumerate(note_manager.history(note_date), 1):
+            taken = datetime.fromtimestamp(snapshot.taken).strftime("%Y-%m-%d %H:%M:%S")
+            sys.stdout.write(
+                f"{number:>3}  {taken}  {snapshot.path}  {snapshot.digest[:12]}\n"
+            )
+        return 0
+
+    def _run_undo(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter undo``"""
+        note_manager = NoteManager(config, TemplateManager(config))
+        note_date = self._note_date_arg(args.date, config)
+        if note_date is None:
+            return 1
+        snapshot = note_manager.undo(note_date, args.version)
+        if snapshot is None:
+            logger.error(f"✗ No snapshot {args.version} for {note_date}")
+            return 1
+        taken = datetime.fromtimestamp(snapshot.taken).strftime("%Y-%m-%d %H:%M:%S")
+        logger.info(f"✓ Restored {snapshot.path} as it was at {taken}")
+        return 0
+
+    def _run_find(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter find``"""
+        note_manager = NoteManager(config, TemplateManager(config))
+        try:
+            found = note_manager.find_notes(args.queries)
+        except ValueError as e:
+            logger.error(f"✗ {e}")
+            return 1
+        for rel_path, _ in found:
+            sys.stdout.write(f"{rel_path}\n")
+        return 0
+
+    def _run_set(
+        self, args: argparse.Namespace, config: Dict[str, Optional[str]]
+    ) -> int:
+        """Handle ``noter set``"""
+        updates = {}
+        for field in args.fields:
+            key, sep, value = field.partition("=")
+            if not sep or not key.strip():
+                logger.error(f"✗ Invalid field: {field}")
+                return 1
+            updates[key.strip()] = value.strip()
+
+        note_manager = NoteManager(config, TemplateManager(config))
+        note_date = self._note_date_arg(args.date, config)
+        if note_date is None:
+            return 1
+        try:
+            note_manager.update_frontmatter(note_date, updates)
+        except (OSError, ValueError) as e:
+            logger.error(f"✗ Could not update {note_date}: {e}")
+            return 1
+        logger.info(f"✓ Updated {', '.join(updates)} for {note_date}")
+        return 0
+
+    def _run_interactive(self, args: argparse.Namespace) -> int:
+        """Add each line typed at the prompt until end of input"""
+        from noter.capture import capture_loop
+
+        if args.note:
+            logger.error("✗ Pass either a note or -i, not both")
+            return 1
+        tags = None
+        if args.tags:
+            tags = [tag.strip() for tag in args.tags.split(",") if tag.strip()]
+        try:
+            session = NoterSession(args.config, vault=args.vault)
+        except ValueError:
+            return 1
+        with session:
+            added = capture_loop(session, tags, args.section)
+        logger.info(f"\n✓ Added {added} notes")
+        return 0
+
     def run(self) -> int:
         """Run the CLI interface"""
         try:
-            args = self.parser.parse_args()
+            argv = sys.argv[1:]
+            at = self._command_index(argv)
+            if at is not None:
+                return self._run_command([argv[at]] + argv[:at] + argv[at + 1 :])
+            if argv[:1] == ["--"] and argv[1:2] and argv[1] in self.commands:
+                # ``noter -- undo`` adds the note "undo" instead
+                argv = argv[1:]
+
+            args = self.parser.parse_args(argv)
+            if args.interactive:
+                return self._run_interactive(args)
 
             # Load configuration
-            config_manager = ConfigManager(args.config)
+            config_manager = ConfigManager(args.config, args.vault)
             config = config_manager.load_config()
             if not config:
                 return 1
@@ -445,18 +2590,29 @@ class NoterCLI:
             # Get the date format with a guaranteed str type
             date_format: str = config.get("date_format") or "%Y-%m-%d"
             note_date = datetime.now().strftime(date_format)
-            success = note_manager.append_to_note(note_content, note_date, tags)
+            result = note_manager.append_entry(
+                note_date,
+                NoteEntry(
+                    note_content,
+                    tags,
+                    note_date,
+                    entry_id=args.entry_id,
+                    section=args.section,
+                    at=args.at,
+                ),
+            )
 
+            success = result.error is None
             if success:
-                logger.info(
-                    f"✓ Note successfully added to {note_manager.get_note_path(note_date)}"
-                )
-                return 0
+                path = result.path or note_manager.get_note_path(note_date)
+                logger.info(f"✓ Note successfully added to {path}")
             else:
                 logger.error(
                     f"✗ Failed to add note to {note_manager.get_note_path(note_date)}"
                 )
-                return 1
+            # The mirror copies in the background; let it finish before exiting
+            note_manager.flush_mirror()
+            return 0 if success else 1
 
         except KeyboardInterrupt:
             logger.info("\nOperation cancelled by user. Exiting.")
@@ -0,0 +1,195 @@
+"""Stat cache of vault files used to materialise activity lists"""
+
+import json
+import logging
+import os
+import re
+from datetime import date, datetime
+from typing import Dict, List, Tuple
+
+from noter.frontmatter import Condition, FieldValue, matches, parse_fields
+
+logger = logging.getLogger("noter")
+
+# Only the head of a file is read when looking for frontmatter fields
+_FRONTMATTER_READ_SIZE = 4096
+_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _read_frontmatter(path: str) -> Dict[str, FieldValue]:
+    """Read the frontmatter fields from the head of a note"""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            head = f.read(_FRONTMATTER_READ_SIZE)
+    except OSError:
+        return {}
+    return parse_fields(head)
+
+
+class StatCache:
+    """Persistent mtime/size cache of the markdown files in a vault
+
+    A refresh only re-lists directories whose mtime changed (files were added,
+    removed or renamed) and only re-reads the frontmatter of files whose stat
+    fingerprint changed; every other file costs a single ``os.stat``. The
+    cached frontmatter fields double as an index for ``find``.
+    """
+
+    def __init__(self, vault_path: str, cache_path: str) -> None:
+        self.vault_path = vault_path
+        self.cache_path = cache_path
+        # relative dir -> (mtime_ns, [file names], [subdir names])
+        self.dirs: Dict[str, Tuple[int, List[str], List[str]]] = {}
+        # relative path -> (mtime_ns, size, frontmatter fields)
+        self.files: Dict[str, Tuple[int, int, Dict[str, FieldValue]]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        """Load the cache from disk, starting empty if it is missing or corrupt"""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.dirs = {k: (v[0], v[1], v[2]) for k, v in data["dirs"].items()}
+            # Entries from before fields were cached get a zero mtime, so the
+            # next refresh reads their frontmatter again
+            self.files = {
+                k: (v[0], v[1], v[2]) if isinstance(v[2], dict) else (0, 0, {})
+                for k, v in data["files"].items()
+            }
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable stat cache: {e}")
+            self.dirs, self.files = {}, {}
+
+    def save(self) -> None:
+        """Write the cache back to disk if it changed"""
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dirs": self.dirs, "files": self.files}, f)
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
+
+    def refresh(self) -> List[str]:
+        """Bring the cache up to date and return the relative paths that changed"""
+        changed: List[str] = []
+        self._refresh_dir("", changed)
+        if changed:
+            self._dirty = True
+        return changed
+
+    def update(self, rel_paths: List[str]) -> None:
+        """Refresh only the given files, e.g. the ones a watcher reported"""
+        for rel_path in rel_paths:
+            abs_path = os.path.join(self.vault_path, rel_path)
+            try:
+                st = os.stat(abs_path)
+            except FileNotFoundError:
+                if self.files.pop(rel_path, None) is not None:
+                    self._dirty = True
+                continue
+            known = self.files.get(rel_path)
+            if known is not None and known[:2] == (st.st_mtime_ns, st.st_size):
+                continue
+            fields = _read_frontmatter(abs_path)
+            self.files[rel_path] = (st.st_mtime_ns, st.st_size, fields)
+            self._dirty = True
+
+    def _refresh_dir(self, rel_dir: str, changed: List[str]) -> None:
+        """Refresh one directory and recurse into its subdirectories"""
+        abs_dir = os.path.join(self.vault_path, rel_dir)
+        try:
+            mtime = os.stat(abs_dir).st_mtime_ns
+        except FileNotFoundError:
+            self._forget_dir(rel_dir, changed)
+            return
+
+        cached = self.dirs.get(rel_dir)
+        if cached is not None and cached[0] == mtime:
+            names, subdirs = cached[1], cached[2]
+        else:
+            names, subdirs = [], []
+            with os.scandir(abs_dir) as it:
+                for entry in it:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir():
+                        subdirs.append(entry.name)
+                    elif entry.name.endswith(".md"):
+                        names.append(entry.name)
+            if cached is not None:
+                for name in set(cached[1]) - set(names):
+                    rel_path = os.path.join(rel_dir, name)
+                    if self.files.pop(rel_path, None) is not None:
+                        changed.append(rel_path)
+                for name in set(cached[2]) - set(subdirs):
+                    self._forget_dir(os.path.join(rel_dir, name), changed)
+            self.dirs[rel_dir] = (mtime, names, subdirs)
+            self._dirty = True
+
+        for name in names:
+            rel_path = os.path.join(rel_dir, name)
+            try:
+                st = os.stat(os.path.join(abs_dir, name))
+            except FileNotFoundError:
+                continue
+            known = self.files.get(rel_path)
+            if known is not None and known[:2] == (st.st_mtime_ns, st.st_size):
+                continue
+            fields = _read_frontmatter(os.path.join(abs_dir, name))
+            self.files[rel_path] = (st.st_mtime_ns, st.st_size, fields)
+            changed.append(rel_path)
+
+        for name in subdirs:
+            self._refresh_dir(os.path.join(rel_dir, name), changed)
+
+    def _forget_dir(self, rel_dir: str, changed: List[str]) -> None:
+        """Drop a vanished directory and everything below it from the cache"""
+        cached = self.dirs.pop(rel_dir, None)
+        if cached is None:
+            return
+        self._dirty = True
+        for name in cached[1]:
+            rel_path = os.path.join(rel_dir, name)
+            if self.files.pop(rel_path, None) is not None:
+                changed.append(rel_path)
+        for name in cached[2]:
+            self._forget_dir(os.path.join(rel_dir, name), changed)
+
+    def touched_between(self, start: datetime, end: datetime) -> List[Tuple[str, int]]:
+        """List (relative path, mtime_ns) modified in [start, end), newest first"""
+        start_ns = int(start.timestamp() * 1_000_000_000)
+        end_ns = int(end.timestamp() * 1_000_000_000)
+        touched = [
+            (rel_path, entry[0])
+            for rel_path, entry in self.files.items()
+            if start_ns <= entry[0] < end_ns
+        ]
+        return sorted(touched, key=lambda item: item[1], reverse=True)
+
+    def due_for_review(self, cutoff: date, limit: int = 5) -> List[Tuple[str, str]]:
+        """List (relative path, reviewed) reviewed on or before ``cutoff``"""
+        cutoff_str = cutoff.isoformat()
+        due = []
+        for rel_path, (_, _, fields) in self.files.items():
+            reviewed = fields.get("reviewed")
+            if not isinstance(reviewed, str):
+                continue
+            match = _DATE_PATTERN.match(reviewed)
+            if match and match.group(0) <= cutoff_str:
+                due.append((rel_path, match.group(0)))
+        return sorted(due, key=lambda item: (item[1], item[0]))[:limit]
+
+    def find(
+        self, conditions: List[Condition]
+    ) -> List[Tuple[str, Dict[str, FieldValue]]]:
+        """List (relative path, fields) of the files matching every condition"""
+        return sorted(
+            (rel_path, fields)
+            for rel_path, (_, _, fields) in self.files.items()
+            if matches(fields, conditions)
+        )
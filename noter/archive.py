@@ -0,0 +1,110 @@
+"""Per-year compressed bundles of old daily notes with an offset index"""
+
+import json
+import logging
+import os
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from noter.fsutil import atomic_write
+
+logger = logging.getLogger("noter")
+
+
+class NoteArchive:
+    """Archived daily notes packed into one bundle file per year
+
+    ``<year>.bundle`` is a concatenation of independently zlib-compressed
+    files and ``<year>.json`` maps each file's vault-relative path to its
+    ``[offset, length]`` in the bundle, so a single day is read with one seek
+    and one decompression. Bundles are only ever appended to; removing a
+    member just drops it from the index.
+    """
+
+    def __init__(self, archive_dir: str) -> None:
+        self.archive_dir = archive_dir
+        # year -> relative path -> [offset, length]
+        self._indexes: Optional[Dict[str, Dict[str, List[int]]]] = None
+        # relative path -> year, across all bundles
+        self._members: Dict[str, str] = {}
+
+    def _index_path(self, year: str) -> str:
+        return os.path.join(self.archive_dir, f"{year}.json")
+
+    def _bundle_path(self, year: str) -> str:
+        return os.path.join(self.archive_dir, f"{year}.bundle")
+
+    def _load(self) -> Dict[str, Dict[str, List[int]]]:
+        """Load every year's index on first use"""
+        if self._indexes is not None:
+            return self._indexes
+        self._indexes = {}
+        try:
+            names = os.listdir(self.archive_dir)
+        except FileNotFoundError:
+            names = []
+        for name in sorted(names):
+            if not name.endswith(".json"):
+                continue
+            year = name[: -len(".json")]
+            try:
+                with open(self._index_path(year), "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            except ValueError as e:
+                logger.warning(f"Ignoring unreadable archive index {name}: {e}")
+                continue
+            self._indexes[year] = index
+            for rel_path in index:
+                self._members[rel_path] = year
+        return self._indexes
+
+    def _save(self, year: str) -> None:
+        # Synced, with the directory, before callers delete the source notes
+        atomic_write(self._index_path(year), json.dumps(self._load()[year]), sync=True)
+
+    def members(self) -> List[str]:
+        """List the archived vault-relative paths"""
+        self._load()
+        return sorted(self._members)
+
+    def read(self, rel_path: str) -> Optional[str]:
+        """Extract one archived file without touching the rest of its bundle"""
+        indexes = self._load()
+        year = self._members.get(rel_path)
+        if year is None:
+            return None
+        offset, length = indexes[year][rel_path]
+        with open(self._bundle_path(year), "rb") as f:
+            f.seek(offset)
+            data = f.read(length)
+        return zlib.decompress(data).decode("utf-8")
+
+    def add(self, year: str, files: List[Tuple[str, bytes]]) -> None:
+        """Append (relative path, content) pairs to a year's bundle"""
+        indexes = self._load()
+        os.makedirs(self.archive_dir, exist_ok=True)
+        index = indexes.setdefault(year, {})
+        with open(self._bundle_path(year), "ab") as f:
+            offset = f.tell()
+            for rel_path, content in files:
+                data = zlib.compress(content, 9)
+                f.write(data)
+                index[rel_path] = [offset, len(data)]
+                self._members[rel_path] = year
+                offset += len(data)
+            f.flush()
+            # The index must never point at bytes that did not reach the disk
+            os.fsync(f.fileno())
+        self._save(year)
+
+    def remove(self, rel_paths: List[str]) -> None:
+        """Drop files from the archive index"""
+        indexes = self._load()
+        years = set()
+        for rel_path in rel_paths:
+            year = self._members.pop(rel_path, None)
+            if year is not None:
+                del indexes[year][rel_path]
+                years.add(year)
+        for year in sorted(years):
+            self._save(year)
@@ -0,0 +1,38 @@
+"""Content-addressed attachment notes for entries too large to keep inline"""
+
+import hashlib
+from typing import Tuple
+
+DEFAULT_FOLDER = "attachments"
+# Length of the first-line preview kept in the daily note
+SUMMARY_WIDTH = 60
+
+
+def attachment_name(text: str) -> str:
+    """Name an attachment after its content, so repeated text is stored once"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def summary_line(text: str, width: int = SUMMARY_WIDTH) -> str:
+    """Preview an attachment with its first non-blank line, shortened to ``width``"""
+    for line in text.splitlines():
+        words = line.split()
+        if words:
+            summary = " ".join(words)
+            if len(summary) > width:
+                summary = summary[: width - 1].rstrip() + "…"
+            return summary
+    return "Attachment"
+
+
+def spill(text: str, folder: str) -> Tuple[str, str, str]:
+    """Split an oversized entry into (vault-relative path, content, entry text)
+
+    The entry text previews the content and embeds the attachment, e.g.
+    ``make: *** [all] Error 2 (4.2 KB) ![[attachments/3f9a0c1e2b7d4a65]]``.
+    """
+    folder = folder.strip("/") or DEFAULT_FOLDER
+    link = f"{folder}/{attachment_name(text)}"
+    content = text if text.endswith("\n") else f"{text}\n"
+    size = len(text.encode("utf-8")) / 1024
+    return f"{link}.md", content, f"{summary_line(text)} ({size:.1f} KB) ![[{link}]]"
@@ -0,0 +1,149 @@
+"""Batch appends routed to per-vault writer threads"""
+
+import json
+import queue
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from noter import AppendResult, NoteEntry, NoterSession
+
+# Most queued notes a writer hands to one append_many call
+MAX_BATCH = 100
+
+# (line number, entry); None tells a writer to stop
+QueuedNote = Optional[Tuple[int, NoteEntry]]
+
+
+def parse_line(line: str) -> Tuple[Optional[str], NoteEntry]:
+    """Parse a batch line into (vault name, entry)
+
+    Lines are either plain note text or JSON objects with ``text`` and the
+    optional ``vault``, ``tags``, ``date``, ``section``, ``id`` and ``time``
+    (``HH:MM``) keys.
+    """
+    if not line.lstrip().startswith("{"):
+        return None, NoteEntry(line)
+    data = json.loads(line)
+    if not isinstance(data, dict) or not data.get("text"):
+        raise ValueError("A JSON line needs a 'text' value")
+    if data.get("time") is not None:
+        # Raises ValueError like the other malformed lines
+        datetime.strptime(str(data["time"]), "%H:%M")
+    tags = data.get("tags")
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
+    return data.get("vault"), NoteEntry(
+        str(data["text"]),
+        tags,
+        data.get("date"),
+        data.get("id"),
+        data.get("section"),
+        data.get("time"),
+    )
+
+
+class VaultWriter(threading.Thread):
+    """Writes the notes queued for one vault on its own thread
+
+    Each vault gets a writer so a slow (e.g. synced or network) vault only
+    delays its own notes. Notes that queue up while a write is in progress
+    are written together on the next round.
+    """
+
+    def __init__(self, name: Optional[str], session: NoterSession) -> None:
+        super().__init__(name=f"noter-writer-{name or 'default'}", daemon=True)
+        self.vault = name or session.config.get("vault_name")
+        self.session = session
+        self.queue: "queue.Queue[QueuedNote]" = queue.Queue()
+        self.results: List[Tuple[int, AppendResult]] = []
+
+    def run(self) -> None:
+        """Write queued notes in batches until stopped"""
+        stopping = False
+        while not stopping:
+            batch: List[Tuple[int, NoteEntry]] = []
+            item = self.queue.get()
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= MAX_BATCH:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            else:
+                stopping = True
+            if batch:
+                written = self.session.append_many([entry for _, entry in batch])
+                self.results.extend(
+                    (line_no, result) for (line_no, _), result in zip(batch, written)
+                )
+        self.session.close()
+
+    def stop(self) -> None:
+        """Ask the writer to finish the queued notes and exit"""
+        self.queue.put(None)
+
+
+def run_batch(
+    lines: Iterable[str], config_path: Optional[str], vault: Optional[str] = None
+) -> List[Tuple[int, Optional[str], AppendResult]]:
+    """Append every line to its vault, returning (line, vault, result) in order
+
+    ``vault`` is used for lines that do not name one. A line whose vault has
+    no usable configuration fails without affecting the other vaults.
+    """
+    # Writers by the vault they load, and by each name a line used for it
+    writers: Dict[Optional[str], VaultWriter] = {}
+    routes: Dict[Optional[str], VaultWriter] = {}
+    broken: Dict[Optional[str], str] = {}
+    failed: List[Tuple[int, Optional[str], AppendResult]] = []
+    try:
+        for line_no, line in enumerate(lines, 1):
+            line = line.rstrip("\r\n")
+            if not line.strip():
+                continue
+            try:
+                name, entry = parse_line(line)
+            except ValueError as e:
+                failed.append(
+                    (line_no, vault, AppendResult("", None, False, False, str(e)))
+                )
+                continue
+            name = name or vault
+            writer = routes.get(name)
+            if writer is None and name not in broken:
+                try:
+                    session = NoterSession(config_path, vault=name)
+                except ValueError as e:
+                    broken[name] = str(e)
+                else:
+                    # Plain lines and lines naming the default vault must share
+                    # one writer, or two sessions would rewrite the same notes
+                    loaded = session.config.get("vault_name")
+                    writer = writers.get(loaded)
+                    if writer is None:
+                        writer = writers[loaded] = VaultWriter(name, session)
+                        writer.start()
+                    else:
+                        session.close()
+                    routes[name] = writer
+            if writer is None:
+                failed.append(
+                    (line_no, name, AppendResult("", None, False, False, broken[name]))
+                )
+                continue
+            writer.queue.put((line_no, entry))
+    finally:
+        for writer in writers.values():
+            writer.stop()
+        for writer in writers.values():
+            writer.join()
+
+    results = failed + [
+        (line_no, writer.vault, result)
+        for writer in writers.values()
+        for line_no, result in writer.results
+    ]
+    return sorted(results, key=lambda item: item[0])
@@ -0,0 +1,123 @@
+"""Stable block IDs for entries and the index locating them in daily notes"""
+
+import os
+import re
+import secrets
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from noter.jsonlog import JsonLog
+from noter.pool import run_jobs
+
+_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyz"
+ID_LENGTH = 6
+
+# An Obsidian block reference closing a line: "... ^k3x9q2"
+_BLOCK_PATTERN = re.compile(rb" \^([0-9a-z-]+)\r?\n?$")
+
+
+class BlockLocation(NamedTuple):
+    """Where an entry's line was last seen"""
+
+    note_date: str
+    # Vault-relative path of the file holding the line
+    path: str
+    offset: int
+    length: int
+
+
+# (note date, vault path, vault-relative paths of the day)
+BlockJob = Tuple[str, str, List[str]]
+
+
+def new_block_id() -> str:
+    """Make up a random block ID"""
+    return "".join(secrets.choice(_ALPHABET) for _ in range(ID_LENGTH))
+
+
+def normalise_id(block_id: str) -> str:
+    """Accept IDs with or without their leading ``^``"""
+    return block_id.strip().lstrip("^").lower()
+
+
+def line_block_id(line: bytes) -> Optional[str]:
+    """Get the block ID a line ends with, if any"""
+    match = _BLOCK_PATTERN.search(line)
+    return match.group(1).decode("ascii") if match else None
+
+
+def scan_blocks(data: bytes) -> Iterable[Tuple[str, int, int]]:
+    """Yield the (block ID, offset, length) of every line ending in a block ID"""
+    offset = 0
+    for line in data.splitlines(keepends=True):
+        if line.lstrip().startswith(b"- "):
+            block_id = line_block_id(line)
+            if block_id is not None:
+                yield block_id, offset, len(line)
+        offset += len(line)
+
+
+def day_blocks(job: BlockJob) -> List[Tuple[str, BlockLocation]]:
+    """Find the block IDs in one day's files"""
+    note_date, vault_path, rel_paths = job
+    found = []
+    for rel_path in rel_paths:
+        with open(os.path.join(vault_path, *rel_path.split("/")), "rb") as f:
+            data = f.read()
+        for block_id, offset, length in scan_blocks(data):
+            found.append((block_id, BlockLocation(note_date, rel_path, offset, length)))
+    return found
+
+
+class BlockIndex(JsonLog):
+    """Block ID to location index kept in an append-only log
+
+    A record is ``[id, date, path, offset, length]``, or ``[id, null]`` once
+    the entry is removed; the last record of an ID wins. Offsets are hints:
+    edits above an entry move it, so callers check the line at the recorded
+    offset and rescan the file when it no longer holds the ID.
+    """
+
+    record_name = "block record"
+
+    def _reset(self) -> None:
+        self._blocks: Dict[str, BlockLocation] = {}
+
+    def _apply(self, record: Any) -> None:
+        if record[1] is None:
+            self._blocks.pop(record[0], None)
+        else:
+            self._blocks[record[0]] = BlockLocation(*record[1:])
+
+    def __contains__(self, block_id: str) -> bool:
+        self._load()
+        return block_id in self._blocks
+
+    def get(self, block_id: str) -> Optional[BlockLocation]:
+        """Look up where a block was last recorded"""
+        self._load()
+        return self._blocks.get(block_id)
+
+    def add(self, blocks: List[Tuple[str, BlockLocation]]) -> None:
+        """Record the locations of new or moved blocks"""
+        self._append([[block_id, *location] for block_id, location in blocks])
+
+    def remove(self, block_id: str) -> None:
+        """Record that a block was deleted"""
+        self._append([[block_id, None]])
+
+    def rebuild(self, blocks: List[Tuple[str, BlockLocation]]) -> None:
+        """Replace the whole index"""
+        self._replace([[block_id, *location] for block_id, location in blocks])
+
+
+def rebuild_blocks(
+    jobs: List[BlockJob], index: BlockIndex, workers: Optional[int] = None
+) -> int:
+    """Rebuild a block index from daily notes across a process pool
+
+    Returns the number of blocks found.
+    """
+    found = run_jobs(day_blocks, jobs, workers)
+    blocks = [block for day in found for block in day]
+    index.rebuild(blocks)
+    return len(blocks)
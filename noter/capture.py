@@ -0,0 +1,79 @@
+"""Interactive capture loop that appends each entered line through one session"""
+
+import re
+from typing import Callable, List, Match, Optional
+
+from noter import NoteEntry, NoterSession, logger
+
+_TAG_WORD = re.compile(r"#[^\W\d][\w/-]*")
+_TIME_WORD = re.compile(r"(?<!\S)@(\d{1,2}):(\d{2})(?!\S)")
+
+PROMPT = "noter> "
+
+
+def parse_capture(line: str, tags: Optional[List[str]] = None) -> NoteEntry:
+    """Turn a typed line into an entry
+
+    An ``@HH:MM`` word sets the entry's time. ``#tags`` at the end of the line
+    are merged with ``tags`` so they are written once, after the text; tags
+    inside the sentence stay where they were typed.
+    """
+    at: Optional[str] = None
+
+    def take_time(match: Match[str]) -> str:
+        nonlocal at
+        hour, minute = int(match[1]), int(match[2])
+        if hour > 23 or minute > 59:
+            return match[0]
+        at = f"{hour:02d}:{minute:02d}"
+        return ""
+
+    words = _TIME_WORD.sub(take_time, line).split()
+    found: List[str] = []
+    while words and _TAG_WORD.fullmatch(words[-1]):
+        found.insert(0, words.pop()[1:])
+    merged = list(dict.fromkeys((tags or []) + found))
+    return NoteEntry(" ".join(words), merged or None, at=at)
+
+
+def capture_loop(
+    session: NoterSession,
+    tags: Optional[List[str]] = None,
+    section: Optional[str] = None,
+    read: Optional[Callable[[str], str]] = None,
+) -> int:
+    """Append lines read from ``read`` until end of input, returning notes added
+
+    The date is taken when each line is entered, so a session left open past
+    midnight writes to the new day's note. Ctrl-C ends the loop like Ctrl-D.
+    """
+    prompt = read or input
+    added = 0
+    current: Optional[str] = None
+    while True:
+        try:
+            line = prompt(PROMPT)
+        except (EOFError, KeyboardInterrupt):
+            break
+        if not line.strip():
+            continue
+
+        today = session.today()
+        if today != current:
+            if current is not None:
+                logger.info(f"Date changed; adding notes to {today}")
+            current = today
+        entry = parse_capture(line, tags)._replace(note_date=today, section=section)
+        if not entry.text:
+            logger.error("✗ Note cannot be empty")
+            continue
+
+        result = session.append_many([entry])[0]
+        if result.error is not None:
+            logger.error(f"✗ {result.error}")
+        elif result.duplicate:
+            logger.info("Skipping duplicate note")
+        else:
+            added += 1
+            logger.info(f"✓ Added to {result.path}")
+    return added
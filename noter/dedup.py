@@ -0,0 +1,71 @@
+"""Per-day idempotency index used to skip duplicate appends"""
+
+import hashlib
+import logging
+import os
+from typing import Dict, Set, Tuple
+
+logger = logging.getLogger("noter")
+
+
+def make_key(*parts: str) -> str:
+    """Hash the given parts into a compact, fixed-width idempotency key"""
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class DedupIndex:
+    """Tracks the idempotency keys already written for each day
+
+    Keys are kept in an append-only sidecar per day (one 16 character hash per
+    line) so recording a key never rewrites the file, and the in-memory set is
+    only topped up with the bytes other processes appended since the last read.
+    """
+
+    def __init__(self, index_dir: str) -> None:
+        self.index_dir = index_dir
+        self._cache: Dict[str, Tuple[int, Set[str]]] = {}
+
+    def _sidecar_path(self, note_date: str) -> str:
+        """Get the sidecar file holding the keys for a day"""
+        return os.path.join(self.index_dir, f"{note_date.replace('/', '-')}.keys")
+
+    def _load(self, note_date: str) -> Set[str]:
+        """Return the key set for a day, reading only unseen sidecar bytes"""
+        offset, keys = self._cache.get(note_date, (0, set()))
+        path = self._sidecar_path(note_date)
+        try:
+            size = os.stat(path).st_size
+        except FileNotFoundError:
+            size = 0
+        if size < offset:
+            # The sidecar was truncated or replaced, so start over
+            offset, keys = 0, set()
+        if size > offset:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read(size - offset)
+            # Only consume complete lines so a concurrent partial write is
+            # picked up on the next call instead of being lost
+            complete = data.rfind(b"\n") + 1
+            keys.update(data[:complete].decode("ascii").split())
+            offset += complete
+        self._cache[note_date] = (offset, keys)
+        return keys
+
+    def contains(self, note_date: str, key: str) -> bool:
+        """Check whether a key has already been recorded for a day"""
+        return key in self._load(note_date)
+
+    def add(self, note_date: str, key: str) -> None:
+        """Record a key for a day"""
+        keys = self._load(note_date)
+        if key in keys:
+            return
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(self._sidecar_path(note_date), "a", encoding="ascii") as f:
+            f.write(f"{key}\n")
+        keys.add(key)
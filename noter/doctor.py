@@ -0,0 +1,258 @@
+"""Vault health check that finds and repairs structural problems in notes"""
+
+import re
+import time
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from noter import NoteManager, config_int
+from noter.document import DailyDocument, Section, section_key
+from noter.migrate import restructure
+from noter.pool import run_jobs, worker_notes, worker_templates
+from noter.snapshots import content_digest
+
+# Notes larger than this are slow to append to unless max_note_bytes is set
+DEFAULT_MAX_BYTES = 256 * 1024
+
+# A line that can still belong to an unterminated frontmatter block
+_YAML_LINE = re.compile(r"([A-Za-z0-9_-]+:|\s|- |$)")
+
+
+class Problem(NamedTuple):
+    """One structural problem in a note"""
+
+    code: str
+    message: str
+    fixable: bool
+
+
+class FileReport(NamedTuple):
+    """What the doctor found in one file, and what is left after fixing"""
+
+    path: str
+    problems: List[Problem]
+    fixed: bool
+    remaining: List[Problem]
+    error: Optional[str]
+
+
+# (config, note date, path, headers of the sections noter writes to, fix)
+DoctorJob = Tuple[Dict[str, Optional[str]], str, str, List[str], bool]
+
+
+def _frontmatter_close(lines: List[str]) -> int:
+    """Find where a missing closing ``---`` belongs, or -1 if it cannot be told"""
+    end = 1
+    while end < len(lines) and _YAML_LINE.match(lines[end]):
+        end += 1
+    while end > 1 and not lines[end - 1].strip():
+        end -= 1
+    return end if end > 1 else -1
+
+
+def _stray_bullets(document: DailyDocument, section: Section) -> List[int]:
+    """Find the empty bullets of a section that are not its placeholder
+
+    A section may end in one empty bullet, which noter leaves after the first
+    note and in empty sections; any other empty bullet is stray. Lines between
+    ``<!-- noter:... -->`` markers belong to noter (e.g. the static activity
+    lists) and are left alone.
+    """
+    lines = document.lines
+    empty = []
+    marked = False
+    for i in range(section.start + 1, section.end):
+        line = lines[i].strip()
+        if line.startswith("<!-- noter:"):
+            marked = True
+        elif line.startswith("<!-- /noter:"):
+            marked = False
+        elif line == "-" and not marked:
+            empty.append(i)
+    last = section.end - 1
+    while last > section.start and not lines[last].strip():
+        last -= 1
+    return [i for i in empty if i != last]
+
+
+def check_text(
+    text: str, headers: List[str], max_bytes: int, size: int
+) -> List[Problem]:
+    """List the problems of a note's text"""
+    problems = []
+    crlf = text.count("\r\n")
+    if crlf and text.count("\n") > crlf:
+        problems.append(Problem("line-endings", "mixes CRLF and LF line endings", True))
+
+    lines = text.splitlines(keepends=True)
+    document = DailyDocument(lines)
+    if lines and lines[0].rstrip() == "---" and document.frontmatter_end == 0:
+        problems.append(
+            Problem(
+                "frontmatter",
+                "frontmatter has no closing ---",
+                _frontmatter_close(lines) != -1,
+            )
+        )
+
+    seen: Dict[str, str] = {}
+    for section in document.sections:
+        key = section_key(section.header)
+        if key in seen:
+            problems.append(
+                Problem("duplicate-section", f"repeats {section.header}", True)
+            )
+        seen.setdefault(key, section.header)
+    for header in headers:
+        if document.find_section(header) is None:
+            problems.append(Problem("missing-section", f"has no {header}", True))
+
+    for section in document.sections:
+        stray = len(_stray_bullets(document, section))
+        if stray:
+            problems.append(
+                Problem(
+                    "empty-bullet",
+                    f"has {stray} stray empty bullet(s) under {section.header}",
+                    True,
+                )
+            )
+
+    if size > max_bytes:
+        problems.append(
+            Problem(
+                "too-large",
+                f"is {size // 1024} KB, which makes every append slow; "
+                "set max_note_bytes to continue busy days in a new file",
+                False,
+            )
+        )
+    return problems
+
+
+def _merge_duplicates(document: DailyDocument) -> DailyDocument:
+    """Move the bodies of repeated sections into the first of each"""
+    lines = document.lines
+    firsts: Dict[str, int] = {}
+    extra: Dict[int, List[str]] = {}
+    dropped = set()
+    for i, section in enumerate(document.sections):
+        key = section_key(section.header)
+        if key in firsts:
+            body = [line for line in document.body(section) if line.strip()]
+            extra.setdefault(firsts[key], []).extend(body)
+            dropped.add(i)
+        else:
+            firsts[key] = i
+    if not dropped:
+        return document
+
+    out = lines[: document.sections[0].start]
+    for i, section in enumerate(document.sections):
+        if i in dropped:
+            continue
+        chunk = lines[section.start : section.end]
+        if i in extra:
+            tail = len(chunk)
+            while tail > 1 and not chunk[tail - 1].strip():
+                tail -= 1
+            if not chunk[tail - 1].endswith("\n"):
+                chunk[tail - 1] += "\n"
+            chunk = chunk[:tail] + extra[i] + chunk[tail:]
+        out.extend(chunk)
+    return DailyDocument(out)
+
+
+def _drop_empty_bullets(document: DailyDocument) -> None:
+    """Delete the stray empty bullets of every section"""
+    for section in reversed(list(document.sections)):
+        for i in reversed(_stray_bullets(document, section)):
+            document.delete(i)
+
+
+def fix_text(text: str, template_text: str, problems: List[Problem]) -> str:
+    """Repair the fixable problems of a note's text"""
+    codes = {problem.code for problem in problems if problem.fixable}
+    if "line-endings" in codes:
+        crlf = text.count("\r\n")
+        text = text.replace("\r\n", "\n")
+        if crlf * 2 > text.count("\n"):
+            text = text.replace("\n", "\r\n")
+    newline = "\r\n" if "\r\n" in text else "\n"
+
+    lines = text.splitlines(keepends=True)
+    if "frontmatter" in codes:
+        close = _frontmatter_close(lines)
+        lines.insert(close, f"---{newline}")
+        if close == len(lines) - 1 and not lines[close - 1].endswith("\n"):
+            lines[close - 1] += newline
+    document = _merge_duplicates(DailyDocument(lines))
+    if "missing-section" in codes:
+        document = DailyDocument.from_text(
+            restructure("".join(document.lines), template_text)
+        )
+    _drop_empty_bullets(document)
+    return "".join(document.lines)
+
+
+def doctor_file(job: DoctorJob) -> FileReport:
+    """Check one note and, if asked, repair it atomically"""
+    config, note_date, path, headers, fix = job
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        text = data.decode("utf-8")
+        max_bytes = config_int(config, "max_note_bytes") or DEFAULT_MAX_BYTES
+        problems = check_text(text, headers, max_bytes, len(data))
+        if not fix or not any(problem.fixable for problem in problems):
+            return FileReport(path, problems, False, problems, None)
+
+        template_text = worker_templates(config).create_basic_template(note_date, "")
+        fixed = fix_text(text, template_text, problems)
+        if fixed == text:
+            return FileReport(path, problems, False, problems, None)
+        with open(path, "rb") as f:
+            # Stop if the note changed while it was being checked
+            if f.read() != data:
+                raise ValueError("the note changed while it was being fixed")
+        worker_notes(config).rewrite_note(path, fixed, content_digest(data))
+        remaining = check_text(fixed, headers, max_bytes, len(fixed.encode("utf-8")))
+        return FileReport(path, problems, True, remaining, None)
+    except (OSError, ValueError) as e:
+        return FileReport(path, [], False, [], str(e))
+
+
+def doctor_vault(
+    note_manager: NoteManager, fix: bool = False, workers: Optional[int] = None
+) -> Tuple[List[FileReport], float]:
+    """Check every daily note in the vault, returning reports and elapsed time
+
+    Files are checked across a process pool unless ``workers`` is 1.
+    """
+    config = note_manager.config
+    date_format = config.get("date_format") or "%Y-%m-%d"
+    # Require the sections noter writes to, where the template has them
+    template = DailyDocument.from_text(
+        note_manager.template_manager.create_basic_template(
+            date.today().strftime(date_format), ""
+        )
+    )
+    headers = [note_manager.section_header(None)] + [
+        header
+        for header in (
+            note_manager.section_header(name) for name in ("tasks", "summary")
+        )
+        if template.find_section(header) is not None
+    ]
+    jobs = []
+    for day, _ in note_manager.list_days():
+        note_date = day.strftime(date_format)
+        for path in note_manager.get_day_paths(note_date):
+            jobs.append((config, note_date, path, headers, fix))
+
+    started = time.perf_counter()
+    if fix:
+        # Prune here rather than racing to do it in every worker
+        note_manager.snapshot_store.prune_if_due()
+    results = run_jobs(doctor_file, jobs, workers)
+    return results, time.perf_counter() - started
@@ -0,0 +1,160 @@
+"""Line-level parsing of the structure of a daily note"""
+
+import re
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+_KEY_PATTERN = re.compile(r"[\W_]+", re.UNICODE)
+
+# Gets the sortable timestamp of a line, or None if it has none
+StampParser = Callable[[str], Optional[Any]]
+
+
+def section_key(header: str) -> str:
+    """Normalise a section header so emoji and punctuation changes still match"""
+    return _KEY_PATTERN.sub("", header.lstrip("#")).lower()
+
+
+class Section(NamedTuple):
+    """A ``## `` section of a daily note as a range of line indexes"""
+
+    header: str
+    start: int
+    end: int
+
+
+class DailyDocument:
+    """A daily note split into frontmatter, preamble and sections in one pass
+
+    ``lines`` keep their line endings so the document can be written back
+    byte for byte with ``"".join(lines)``.
+    """
+
+    def __init__(self, lines: List[str]) -> None:
+        self.lines = lines
+        self.frontmatter_end = 0
+        self.sections: List[Section] = []
+        # Normalised header -> index into sections, for constant-time lookups
+        self.section_map: Dict[str, int] = {}
+        # Section index -> (parser, timestamps, line indexes) of its bullets
+        self._timelines: Dict[int, Tuple[StampParser, List[Any], List[int]]] = {}
+        self._parse()
+
+    @classmethod
+    def from_text(cls, text: str) -> "DailyDocument":
+        """Parse a document from its full text"""
+        return cls(text.splitlines(keepends=True))
+
+    def _parse(self) -> None:
+        """Locate the frontmatter block and every section header"""
+        lines = self.lines
+        if lines and lines[0].rstrip() == "---":
+            for i in range(1, len(lines)):
+                if lines[i].rstrip() == "---":
+                    self.frontmatter_end = i + 1
+                    break
+
+        in_fence = False
+        header_at = -1
+        header = ""
+        for i in range(self.frontmatter_end, len(lines)):
+            line = lines[i]
+            if line.startswith("```"):
+                in_fence = not in_fence
+            elif not in_fence and line.startswith("## "):
+                if header_at != -1:
+                    self.sections.append(Section(header, header_at, i))
+                header_at, header = i, line.rstrip("\r\n")
+        if header_at != -1:
+            self.sections.append(Section(header, header_at, len(lines)))
+        for i, section in enumerate(self.sections):
+            self.section_map.setdefault(section_key(section.header), i)
+
+    @property
+    def frontmatter(self) -> List[str]:
+        """Lines of the frontmatter block including its ``---`` fences"""
+        return self.lines[: self.frontmatter_end]
+
+    @property
+    def preamble(self) -> List[str]:
+        """Lines between the frontmatter and the first section"""
+        end = self.sections[0].start if self.sections else len(self.lines)
+        return self.lines[self.frontmatter_end : end]
+
+    def body(self, section: Section) -> List[str]:
+        """Lines of a section after its header"""
+        return self.lines[section.start + 1 : section.end]
+
+    def find_section(self, header: str) -> Optional[Section]:
+        """Find the first section whose header line contains ``header``"""
+        index = self.section_map.get(section_key(header))
+        if index is not None:
+            return self.sections[index]
+        for section in self.sections:
+            if header in section.header:
+                return section
+        return None
+
+    def timeline(
+        self, section: Section, parse: StampParser
+    ) -> Tuple[List[Any], List[int]]:
+        """Get the timestamps of a section's lines and where those lines are
+
+        Only lines ``parse`` finds a timestamp in are listed, in document
+        order. The lists are built once per parsed document and kept up to
+        date by ``insert`` and ``delete``, so the document cache holds them
+        for as long as the file is unchanged.
+        """
+        index = self.sections.index(section)
+        cached = self._timelines.get(index)
+        if cached is None or cached[0] != parse:
+            stamps, positions = [], []
+            for i in range(section.start + 1, section.end):
+                stamp = parse(self.lines[i])
+                if stamp is not None:
+                    stamps.append(stamp)
+                    positions.append(i)
+            cached = self._timelines[index] = (parse, stamps, positions)
+        return cached[1], cached[2]
+
+    def insert(self, index: int, new_lines: List[str]) -> None:
+        """Insert lines before ``index``, keeping section ranges in step
+
+        Lines inserted at the end of a section belong to that section.
+        """
+        self.lines[index:index] = new_lines
+        count = len(new_lines)
+        for i, (parse, stamps, positions) in self._timelines.items():
+            at = bisect_left(positions, index)
+            positions[at:] = [position + count for position in positions[at:]]
+            section = self.sections[i]
+            if section.start < index <= section.end:
+                for offset, line in enumerate(new_lines):
+                    stamp = parse(line)
+                    if stamp is not None:
+                        stamps.insert(at, stamp)
+                        positions.insert(at, index + offset)
+                        at += 1
+        for i, section in enumerate(self.sections):
+            if section.start >= index:
+                self.sections[i] = section._replace(
+                    start=section.start + count, end=section.end + count
+                )
+            elif section.end >= index:
+                self.sections[i] = section._replace(end=section.end + count)
+
+    def delete(self, index: int) -> None:
+        """Delete the line at ``index``, which must not be a section header"""
+        del self.lines[index]
+        for _, stamps, positions in self._timelines.values():
+            at = bisect_left(positions, index)
+            if at < len(positions) and positions[at] == index:
+                del stamps[at], positions[at]
+            positions[at:] = [position - 1 for position in positions[at:]]
+        for i, section in enumerate(self.sections):
+            if section.start > index:
+                self.sections[i] = section._replace(
+                    start=section.start - 1, end=section.end - 1
+                )
+            elif section.end > index:
+                self.sections[i] = section._replace(end=section.end - 1)
@@ -0,0 +1,201 @@
+"""Frontmatter fields: parsing, querying and in-place updates"""
+
+import operator
+import os
+import re
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+from noter.fsutil import atomic_write
+
+# A scalar field or a list such as ``tags: [daily, work]``
+FieldValue = Union[str, List[str]]
+
+_KEY_PATTERN = re.compile(r"^([A-Za-z0-9_-]+):\s*(.*?)\s*$")
+_CONDITION_PATTERN = re.compile(r"^([A-Za-z0-9_-]+)\s*(<=|>=|!=|=|<|>)\s*(.*)$")
+_FENCE = re.compile(r"^---[ \t]*\r?$", re.M)
+_FENCE_BYTES = re.compile(rb"^---[ \t]*\r?$", re.M)
+
+# Bytes read when looking for the end of the frontmatter block
+_HEAD_SIZE = 4096
+
+
+class Condition(NamedTuple):
+    """A ``key<op>value`` query on a frontmatter field"""
+
+    key: str
+    op: str
+    value: str
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    return value
+
+
+def frontmatter_end(text: str) -> int:
+    """Get the offset just past the closing ``---`` line, or 0 if there is none"""
+    if not text.startswith("---"):
+        return 0
+    first = text.find("\n")
+    if first == -1 or text[:first].rstrip() != "---":
+        return 0
+    match = _FENCE.search(text, first + 1)
+    if match is None:
+        return 0
+    end = text.find("\n", match.end())
+    return len(text) if end == -1 else end + 1
+
+
+def parse_fields(text: str) -> Dict[str, FieldValue]:
+    """Parse the top-level fields of the frontmatter at the start of ``text``
+
+    Only the flat ``key: value`` subset of YAML used by daily notes is
+    understood; inline ``[a, b]`` and block ``- item`` lists become lists.
+    """
+    end = frontmatter_end(text)
+    fields: Dict[str, FieldValue] = {}
+    current: Optional[str] = None
+    for line in text[:end].splitlines()[1:-1]:
+        match = _KEY_PATTERN.match(line)
+        if match:
+            current, value = match.group(1), match.group(2)
+            if value.startswith("[") and value.endswith("]"):
+                items = [_unquote(item.strip()) for item in value[1:-1].split(",")]
+                fields[current] = [item for item in items if item]
+            elif value:
+                fields[current] = _unquote(value)
+            else:
+                fields[current] = []
+        elif current is not None and line.strip().startswith("- "):
+            block_list = fields[current]
+            if isinstance(block_list, list):
+                block_list.append(_unquote(line.strip()[2:].strip()))
+    return fields
+
+
+def parse_condition(text: str) -> Condition:
+    """Parse a query such as ``status=active`` or ``priority<=2``"""
+    match = _CONDITION_PATTERN.match(text.strip())
+    if match is None:
+        raise ValueError(f"Invalid condition: {text}")
+    return Condition(match.group(1), match.group(2), _unquote(match.group(3).strip()))
+
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def _compare(actual: str, op: str, expected: str) -> bool:
+    """Compare numerically when both sides are numbers, otherwise as text"""
+    try:
+        return _OPERATORS[op](float(actual), float(expected))
+    except ValueError:
+        return _OPERATORS[op](actual, expected)
+
+
+def matches(fields: Dict[str, FieldValue], conditions: List[Condition]) -> bool:
+    """Check a note's fields against every condition
+
+    A list field matches when any of its items does, except for ``!=``
+    which requires that none of them equals the value.
+    """
+    for condition in conditions:
+        value = fields.get(condition.key)
+        if value is None:
+            return False
+        if isinstance(value, list):
+            if condition.op == "!=":
+                ok = all(_compare(item, "!=", condition.value) for item in value)
+            else:
+                ok = any(
+                    _compare(item, condition.op, condition.value) for item in value
+                )
+        else:
+            ok = _compare(value, condition.op, condition.value)
+        if not ok:
+            return False
+    return True
+
+
+def update_block(block: str, updates: Dict[str, str]) -> str:
+    """Set fields in a frontmatter block, replacing any continuation lines
+
+    Trailing whitespace is dropped from every field line so padding left by
+    an earlier in-place update becomes room for this one.
+    """
+    lines = block.splitlines(keepends=True)
+    newline = "\r\n" if lines[0].endswith("\r\n") else "\n"
+    body = [line.rstrip(" \t\r\n") + newline for line in lines[1:-1]]
+    for key, value in updates.items():
+        new_line = f"{key}: {value}{newline}"
+        for i, line in enumerate(body):
+            match = _KEY_PATTERN.match(line)
+            if match and match.group(1) == key:
+                end = i + 1
+                while end < len(body) and body[end][:1] in (" ", "\t", "-"):
+                    end += 1
+                body[i:end] = [new_line]
+                break
+        else:
+            body.append(new_line)
+    return "".join(lines[:1] + body + lines[-1:])
+
+
+def _block_end(data: bytes) -> int:
+    """Byte offset just past the frontmatter block, or 0 if it is incomplete"""
+    if not data.startswith(b"---"):
+        return 0
+    first = data.find(b"\n")
+    if first == -1 or data[:first].rstrip() != b"---":
+        return 0
+    match = _FENCE_BYTES.search(data, first + 1)
+    if match is None:
+        return 0
+    end = data.find(b"\n", match.end())
+    return 0 if end == -1 else end + 1
+
+
+def update_file(
+    path: str,
+    updates: Dict[str, str],
+    write: Callable[[str, str], None] = atomic_write,
+) -> bool:
+    """Set frontmatter fields of a note, returning whether it was done in place
+
+    When the updated block is no longer than the old one it is padded with
+    trailing spaces to the same length and written over the old block, so
+    the rest of the file is neither read nor rewritten. Otherwise the whole
+    file is handed to ``write``, which replaces it atomically by default.
+    """
+    with open(path, "rb") as f:
+        head = f.read(_HEAD_SIZE)
+        end = _block_end(head)
+        if end == 0:
+            head += f.read()
+            end = _block_end(head)
+    if end == 0:
+        raise ValueError(f"{os.path.basename(path)} has no frontmatter")
+    old_block = head[:end]
+    new_block = update_block(old_block.decode("utf-8"), updates).encode("utf-8")
+
+    spare = len(old_block) - len(new_block)
+    if spare >= 0:
+        # Pad the last field line; YAML ignores trailing whitespace
+        fence = new_block.rstrip(b"\r\n").rfind(b"\n")
+        if new_block[fence - 1 : fence] == b"\r":
+            fence -= 1
+        with open(path, "r+b") as f:
+            f.write(new_block[:fence] + b" " * spare + new_block[fence:])
+        return True
+
+    with open(path, "rb") as f:
+        content = f.read()
+    write(path, (new_block + content[end:]).decode("utf-8"))
+    return False
@@ -0,0 +1,67 @@
+"""Filesystem helpers shared by the note writers"""
+
+import os
+import shutil
+import tempfile
+
+# Read the umask once; it can only be queried by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# fdatasync skips flushing metadata such as mtime; not every platform has it
+_datasync = getattr(os, "fdatasync", os.fsync)
+
+
+def sync_file(path: str) -> None:
+    """Flush a file's data to disk"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        _datasync(fd)
+    finally:
+        os.close(fd)
+
+
+def sync_dir(directory: str) -> None:
+    """Flush a directory so files created or renamed in it survive a crash
+
+    Windows cannot open directories and makes renames durable by itself.
+    """
+    if os.name == "nt":
+        return
+    fd = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, content: str, sync: bool = False) -> None:
+    """Replace a file's content atomically via a temporary file and rename
+
+    Readers see either the old or the new file, never a partial write. With
+    ``sync`` the new content and the rename are on disk before returning.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            if sync:
+                f.flush()
+                _datasync(f.fileno())
+        # mkstemp creates the file private; keep the replaced file's mode
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        else:
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+        if sync:
+            sync_dir(directory)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,145 @@
+"""Reproducible synthetic vaults for load and scaling tests"""
+
+import os
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from noter.document import DailyDocument
+from noter.pool import run_jobs, worker_templates
+
+_WORDS = (
+    "meeting review deploy design draft call notes idea follow up budget plan "
+    "sync bug fix release customer research read write sketch outline focus "
+    "lunch walk train migrate refactor test benchmark interview hire feedback "
+    "roadmap sprint retro demo invoice contract travel book podcast family"
+).split()
+_TAGS = "work ops health reading family finance project idea todo travel".split()
+_PAGES = [
+    "Project Atlas",
+    "Quarterly Goals",
+    "Reading List",
+    "Team",
+    "Garden",
+    "Recipes",
+    "Home Server",
+    "Alice",
+    "Bob",
+    "Weekly Review",
+]
+
+
+class GeneratorSettings(NamedTuple):
+    """Shape of a synthetic vault"""
+
+    seed: int = 0
+    # Mean number of entries on an ordinary day
+    entries: float = 8.0
+    # Fraction of days with many times the usual number of entries
+    heavy_ratio: float = 0.02
+    heavy_factor: int = 150
+    # Mean length of an entry's text in bytes
+    entry_bytes: int = 80
+    # Fraction of days that look hand-edited (a section or frontmatter missing)
+    broken_ratio: float = 0.05
+
+
+def _entry(rng: random.Random, settings: GeneratorSettings) -> str:
+    """Make up the text of one entry"""
+    target = max(8, int(rng.gauss(settings.entry_bytes, settings.entry_bytes / 4)))
+    words: List[str] = []
+    length = 0
+    while length < target:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    if rng.random() < 0.2:
+        words.insert(rng.randrange(len(words) + 1), f"[[{rng.choice(_PAGES)}]]")
+    text = " ".join(words).capitalize()
+    if rng.random() < 0.3:
+        text += "".join(f" #{tag}" for tag in rng.sample(_TAGS, rng.randint(1, 2)))
+    return text
+
+
+def render_day(
+    config: Dict[str, Optional[str]],
+    note_date: str,
+    index: int,
+    settings: GeneratorSettings,
+) -> Tuple[str, int]:
+    """Render one synthetic daily note, returning its content and entry count
+
+    Each day draws from its own generator seeded with the vault seed and the
+    day's index, so output does not depend on how days are spread over workers.
+    """
+    rng = random.Random(f"{settings.seed}:{index}")
+    count = int(rng.expovariate(1 / settings.entries)) if settings.entries else 0
+    if rng.random() < settings.heavy_ratio:
+        count = int(settings.entries * settings.heavy_factor * rng.uniform(0.5, 1.5))
+
+    minutes = sorted(rng.randrange(6 * 60, 23 * 60) for _ in range(count))
+    bullets = [
+        f"- [{minute // 60:02d}:{minute % 60:02d}] {_entry(rng, settings)}"
+        for minute in minutes
+    ]
+    content = worker_templates(config).create_basic_template(
+        note_date, "\n".join(bullets)
+    )
+
+    if rng.random() < settings.broken_ratio:
+        document = DailyDocument.from_text(content)
+        if rng.random() < 0.3 or not document.sections:
+            content = "".join(document.lines[document.frontmatter_end :]).lstrip()
+        else:
+            victim = rng.choice(document.sections[:-1] or document.sections)
+            content = "".join(
+                document.lines[: victim.start] + document.lines[victim.end :]
+            )
+    return content, count
+
+
+def _generate_job(
+    job: Tuple[Dict[str, Optional[str]], str, str, int, GeneratorSettings]
+) -> Tuple[int, int]:
+    """Write one synthetic day, returning its entry count and size"""
+    config, path, note_date, index, settings = job
+    content, count = render_day(config, note_date, index, settings)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = content.encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+    return count, len(data)
+
+
+def generate_vault(
+    config: Dict[str, Optional[str]],
+    vault_path: str,
+    start: date,
+    days: int,
+    settings: GeneratorSettings,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> Tuple[int, int, float]:
+    """Write ``days`` synthetic daily notes from ``start`` into ``vault_path``
+
+    ``config`` supplies the date format and template. A folder that already
+    holds files is refused unless ``force`` is set, as generated days replace
+    existing notes. Returns the number of entries, bytes written and elapsed
+    seconds.
+    """
+    if not force and os.path.isdir(vault_path) and os.listdir(vault_path):
+        raise ValueError(f"{vault_path} is not empty; pass --force to overwrite")
+    date_format = config.get("date_format") or "%Y-%m-%d"
+    jobs = []
+    for index in range(days):
+        note_date = (start + timedelta(days=index)).strftime(date_format)
+        path = os.path.join(vault_path, *f"{note_date}.md".split("/"))
+        jobs.append((config, path, note_date, index, settings))
+
+    started = time.perf_counter()
+    os.makedirs(vault_path, exist_ok=True)
+    results = run_jobs(_generate_job, jobs, workers)
+    entries = sum(count for count, _ in results)
+    size = sum(size for _, size in results)
+    return entries, size, time.perf_counter() - started
@@ -0,0 +1,86 @@
+"""Append-only JSON lines log that indexes read incrementally"""
+
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Any, List
+
+from noter.fsutil import atomic_write
+
+logger = logging.getLogger("noter")
+
+
+class JsonLog(ABC):
+    """Base of the sidecar indexes kept as one JSON record per line
+
+    Appending records never rewrites the log, and a reader only parses the
+    lines appended since its last read. ``_replace`` swaps in a new log,
+    which readers notice by its inode and re-read from the start. Subclasses
+    hold the in-memory state built from the records in ``_reset`` and
+    ``_apply``.
+    """
+
+    # Names the records in the warning about unreadable lines
+    record_name = "record"
+
+    def __init__(self, log_path: str) -> None:
+        self.log_path = log_path
+        self._inode = 0
+        self._offset = 0
+        self._reset()
+
+    @abstractmethod
+    def _reset(self) -> None:
+        """Clear the in-memory state before the log is read from the start"""
+
+    @abstractmethod
+    def _apply(self, record: Any) -> None:
+        """Fold one record into the in-memory state
+
+        Malformed records raise ValueError, TypeError or IndexError.
+        """
+
+    def _load(self) -> None:
+        """Top up the in-memory state with records appended since the last read"""
+        try:
+            st = os.stat(self.log_path)
+            inode, size = st.st_ino, st.st_size
+        except FileNotFoundError:
+            inode, size = 0, 0
+        if inode != self._inode or size < self._offset:
+            # The log was rebuilt (replaced) since the last read, so start over
+            self._inode, self._offset = inode, 0
+            self._reset()
+        if size > self._offset:
+            with open(self.log_path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read(size - self._offset)
+            complete = data.rfind(b"\n") + 1
+            for line in data[:complete].decode("utf-8").splitlines():
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, TypeError, IndexError):
+                    logger.warning(f"Ignoring unreadable {self.record_name}: {line}")
+            self._offset += complete
+
+    @staticmethod
+    def _lines(records: List[Any]) -> str:
+        return "".join(
+            json.dumps(record, ensure_ascii=False) + "\n" for record in records
+        )
+
+    def _append(self, records: List[Any]) -> None:
+        """Add records to the end of the log"""
+        if not records:
+            return
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(self._lines(records))
+
+    def _replace(self, records: List[Any]) -> None:
+        """Replace the whole log"""
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        atomic_write(self.log_path, self._lines(records))
+        self._inode, self._offset = 0, 0
+        self._reset()
@@ -0,0 +1,156 @@
+"""Backlink index of the wikilinks in captured entries"""
+
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from noter.document import DailyDocument
+from noter.jsonlog import JsonLog
+from noter.pool import run_jobs
+
+# [[Page]], [[Page|alias]] and [[Page#heading]] all link to "Page"
+_LINK_PATTERN = re.compile(r"\[\[([^\]|#\n]+)[^\]\n]*\]\]")
+
+# (page, note date, entry)
+Backlink = Tuple[str, str, str]
+
+# (note date, paths of the day, headers of the sections holding entries)
+LinkJob = Tuple[str, List[str], List[str]]
+
+
+def extract_links(text: str) -> List[str]:
+    """List the distinct pages linked from a piece of text, in order"""
+    pages: List[str] = []
+    for match in _LINK_PATTERN.finditer(text):
+        page = match.group(1).strip()
+        if page and page not in pages:
+            pages.append(page)
+    return pages
+
+
+def page_key(page: str) -> str:
+    """Normalise a page name the way Obsidian resolves links"""
+    return page.strip().lower()
+
+
+def day_links(job: LinkJob) -> List[Backlink]:
+    """Extract the links of every entry in one day's files"""
+    note_date, paths, headers = job
+    links: List[Backlink] = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            document = DailyDocument(f.readlines())
+        for header in headers:
+            section = document.find_section(header)
+            if section is None:
+                continue
+            for line in document.body(section):
+                if not line.startswith("- ") or "[[" not in line:
+                    continue
+                entry = line[2:].rstrip("\r\n")
+                links.extend((page, note_date, entry) for page in extract_links(entry))
+    return links
+
+
+class LinkIndex(JsonLog):
+    """Page to (date, entry) adjacency index kept in an append-only log
+
+    Each link is one JSON line, so recording the links of a new entry never
+    rewrites the log and a reader only parses the lines appended since its
+    last lookup. Removals are logged too: ``[null, date, entry]`` drops the
+    links of one entry and ``[null, date]`` those of a whole day. ``rebuild``
+    replaces the log from the daily notes.
+    """
+
+    record_name = "link record"
+
+    def _reset(self) -> None:
+        self._pages: Dict[str, List[Tuple[str, str]]] = {}
+        # note date -> keys of the pages linked from that day
+        self._days: Dict[str, Set[str]] = {}
+
+    def _apply(self, record: Any) -> None:
+        if record[0] is None:
+            self._forget(record[1], record[2] if len(record) > 2 else None)
+            return
+        page, note_date, entry = record
+        key = page_key(page)
+        self._pages.setdefault(key, []).append((note_date, entry))
+        self._days.setdefault(note_date, set()).add(key)
+
+    def _forget(self, note_date: str, entry: Optional[str]) -> None:
+        """Drop the links of one entry of a day, or of the whole day"""
+        keys = self._days.pop(note_date, set())
+        for key in keys:
+            kept = [
+                (day, text)
+                for day, text in self._pages[key]
+                if day != note_date or (entry is not None and text != entry)
+            ]
+            if kept:
+                self._pages[key] = kept
+            else:
+                del self._pages[key]
+            if any(day == note_date for day, _ in kept):
+                self._days.setdefault(note_date, set()).add(key)
+
+    def backlinks(self, page: str) -> List[Tuple[str, str]]:
+        """List the (note date, entry) pairs linking to a page"""
+        self._load()
+        return list(self._pages.get(page_key(page), []))
+
+    def pages(self) -> List[str]:
+        """List the normalised names of every linked page"""
+        self._load()
+        return sorted(self._pages)
+
+    def add(self, links: List[Backlink]) -> None:
+        """Record links of newly written entries"""
+        self._append([list(link) for link in links])
+
+    def remove(self, note_date: str, entry: str) -> None:
+        """Record that an entry was edited or deleted, dropping its links"""
+        self._append([[None, note_date, entry]])
+
+    def replace_day(self, note_date: str, links: List[Backlink]) -> None:
+        """Record the links of a day that was re-read, as far as they changed
+
+        Only entries whose links differ from the index are logged, as a
+        tombstone followed by their new links, so re-reading an unchanged day
+        appends nothing.
+        """
+        self._load()
+        old: Dict[str, List[str]] = {}
+        for key in sorted(self._days.get(note_date, ())):
+            for day, entry in self._pages[key]:
+                if day == note_date:
+                    old.setdefault(entry, []).append(key)
+        new: Dict[str, List[Backlink]] = {}
+        for link in links:
+            new.setdefault(link[2], []).append(link)
+
+        records: List[Any] = []
+        for entry in list(old) + [entry for entry in new if entry not in old]:
+            added = new.get(entry, [])
+            if sorted(old.get(entry, [])) == sorted(page_key(p) for p, _, _ in added):
+                continue
+            if entry in old:
+                records.append([None, note_date, entry])
+            records.extend(list(link) for link in added)
+        self._append(records)
+
+    def rebuild(self, links: List[Backlink]) -> None:
+        """Replace the whole index"""
+        self._replace([list(link) for link in links])
+
+
+def rebuild_links(
+    jobs: List[LinkJob], index: LinkIndex, workers: Optional[int] = None
+) -> int:
+    """Rebuild a link index from daily notes across a process pool
+
+    Returns the number of links found.
+    """
+    found = run_jobs(day_links, jobs, workers)
+    links = [link for day in found for link in day]
+    index.rebuild(links)
+    return len(links)
@@ -0,0 +1,194 @@
+"""Restructure existing daily notes into the current template"""
+
+import difflib
+import re
+import time
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from noter import NoteManager
+from noter.document import DailyDocument, Section, section_key
+from noter.pool import run_jobs, worker_notes, worker_templates
+
+_FRONTMATTER_KEY = re.compile(r"^([A-Za-z0-9_-]+):")
+
+
+class MigrationResult(NamedTuple):
+    """Outcome of migrating one daily note"""
+
+    path: str
+    changed: bool
+    diff: str
+    error: Optional[str]
+
+
+def _frontmatter_keys(lines: List[str]) -> Dict[str, List[str]]:
+    """Group frontmatter lines by top-level key, continuation lines included"""
+    keys: Dict[str, List[str]] = {}
+    current: Optional[List[str]] = None
+    for line in lines[1:-1]:
+        match = _FRONTMATTER_KEY.match(line)
+        if match:
+            current = keys.setdefault(match.group(1), [])
+        if current is not None:
+            current.append(line)
+    return keys
+
+
+def _merge_frontmatter(old: List[str], new: List[str]) -> List[str]:
+    """Keep the old frontmatter and add any keys only the template defines"""
+    if not new:
+        return list(old)
+    old_keys = _frontmatter_keys(old)
+    missing = [
+        line
+        for key, lines in _frontmatter_keys(new).items()
+        if key not in old_keys
+        for line in lines
+    ]
+    return old[:-1] + missing + old[-1:]
+
+
+def _append(out: List[str], lines: List[str]) -> None:
+    """Append lines, terminating a dangling last line first"""
+    if lines and out and not out[-1].endswith("\n"):
+        out[-1] += "\n"
+    out.extend(lines)
+
+
+def _words(header: str) -> Set[str]:
+    """Split a header into lowercase words, ignoring emoji and punctuation"""
+    return set(re.findall(r"[^\W_]+", header.lstrip("#").lower()))
+
+
+def _match_sections(
+    new_sections: List[Section], old_sections: List[Section]
+) -> Dict[int, Section]:
+    """Map template section indexes to the old sections they correspond to
+
+    Headers are matched exactly (ignoring emoji and punctuation) first; any
+    old section left over goes to the free template section sharing the
+    largest fraction of words with it, e.g. "## Notes" to
+    "## ✍️ Notes & Observations" rather than "## 📓 Notes Created or Touched".
+    """
+    matches: Dict[int, Section] = {}
+    leftovers = []
+    for old in old_sections:
+        key = section_key(old.header)
+        for i, section in enumerate(new_sections):
+            if i not in matches and section_key(section.header) == key:
+                matches[i] = old
+                break
+        else:
+            leftovers.append(old)
+
+    for old in leftovers:
+        old_words = _words(old.header)
+        best, best_score = -1, 0.0
+        for i, section in enumerate(new_sections):
+            if i in matches:
+                continue
+            new_words = _words(section.header)
+            union = old_words | new_words
+            score = len(old_words & new_words) / len(union) if union else 0.0
+            if score > best_score:
+                best, best_score = i, score
+        if best != -1:
+            matches[best] = old
+    return matches
+
+
+def restructure(old_text: str, template_text: str) -> str:
+    """Rebuild a note in the layout of ``template_text`` keeping its content
+
+    Existing frontmatter, the heading block and the body of every section
+    that still exists in the template are kept; sections the template no
+    longer has are kept after the template's sections so no entry is lost.
+    """
+    old = DailyDocument.from_text(old_text)
+    new = DailyDocument.from_text(template_text)
+    out: List[str] = []
+
+    if old.frontmatter:
+        _append(out, _merge_frontmatter(old.frontmatter, new.frontmatter))
+    else:
+        _append(out, new.frontmatter)
+
+    preamble = old.preamble if "".join(old.preamble).strip() else new.preamble
+    if out and preamble and preamble[0].strip():
+        preamble = ["\n"] + preamble
+    _append(out, preamble)
+
+    matches = _match_sections(new.sections, old.sections)
+    chunks: List[Tuple[str, List[str]]] = []
+    for i, section in enumerate(new.sections):
+        match = matches.get(i)
+        if match is not None:
+            chunks.append((section.header, old.body(match)))
+        else:
+            chunks.append((section.header, new.body(section)))
+    used = list(matches.values())
+    for section in old.sections:
+        if section not in used:
+            chunks.append((section.header, old.body(section)))
+
+    for header, body in chunks:
+        if out and out[-1].strip():
+            _append(out, ["\n"])
+        _append(out, [f"{header}\n"] + body)
+    return "".join(out)
+
+
+def migrate_file(
+    config: Dict[str, Optional[str]], note_date: str, path: str, dry_run: bool
+) -> MigrationResult:
+    """Migrate a single daily note, returning a unified diff of the change"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            old_text = f.read()
+        template_text = worker_templates(config).create_basic_template(note_date, "")
+        new_text = restructure(old_text, template_text)
+        if new_text == old_text:
+            return MigrationResult(path, False, "", None)
+        diff = "".join(
+            difflib.unified_diff(
+                old_text.splitlines(keepends=True),
+                new_text.splitlines(keepends=True),
+                fromfile=path,
+                tofile=path,
+            )
+        )
+        if not dry_run:
+            worker_notes(config).rewrite_note(path, new_text)
+        return MigrationResult(path, True, diff, None)
+    except Exception as e:
+        return MigrationResult(path, False, "", str(e))
+
+
+def _migrate_job(
+    job: Tuple[Dict[str, Optional[str]], str, str, bool]
+) -> MigrationResult:
+    """Unpack a pool job for migrate_file"""
+    return migrate_file(*job)
+
+
+def migrate_vault(
+    note_manager: NoteManager, dry_run: bool = False, workers: Optional[int] = None
+) -> Tuple[List[MigrationResult], float]:
+    """Migrate every daily note in the vault, returning results and elapsed time
+
+    Files are processed across a process pool unless ``workers`` is 1.
+    """
+    config = note_manager.config
+    date_format = config.get("date_format") or "%Y-%m-%d"
+    jobs = []
+    for day, _ in note_manager.list_days():
+        note_date = day.strftime(date_format)
+        for path in note_manager.get_day_paths(note_date):
+            jobs.append((config, note_date, path, dry_run))
+
+    started = time.perf_counter()
+    if not dry_run:
+        # Prune here rather than racing to do it in every worker
+        note_manager.snapshot_store.prune_if_due()
+    results = run_jobs(_migrate_job, jobs, workers)
+    return results, time.perf_counter() - started
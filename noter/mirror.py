@@ -0,0 +1,211 @@
+"""Incremental mirror of a vault into a backup directory"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from noter.fsutil import atomic_write
+
+logger = logging.getLogger("noter")
+
+# Files at least this large that only grew are extended instead of recopied
+APPEND_MIN_BYTES = 64 * 1024
+
+# [mtime_ns, size, content hash] of a source file as it was last mirrored
+ManifestEntry = List[Any]
+
+MANIFEST_NAME = os.path.join(".noter", "mirror.json")
+
+
+class MirrorStats(NamedTuple):
+    """What a mirror run did"""
+
+    copied: int
+    appended: int
+    removed: int
+    unchanged: int
+    bytes_written: int
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    """Replace a file with new bytes through a temporary file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class Mirror:
+    """Copies the files of a vault that changed since the last run
+
+    A manifest in the destination remembers the (mtime, size, hash) each file
+    had when it was copied. Files whose mtime and size match are skipped
+    without being read; files that were touched but hash the same are not
+    rewritten; large files that only had data appended get just the new
+    bytes. Hidden files and folders (including ``.noter``) are not mirrored.
+    """
+
+    def __init__(self, source: str, dest: str) -> None:
+        self.source = source
+        self.dest = dest
+        self.manifest_path = os.path.join(dest, MANIFEST_NAME)
+        self._lock = threading.Lock()
+
+    def _load_manifest(self) -> Dict[str, ManifestEntry]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            return manifest if isinstance(manifest, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, ManifestEntry]) -> None:
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        atomic_write(self.manifest_path, json.dumps(manifest, sort_keys=True))
+
+    def source_files(self) -> List[str]:
+        """List the vault-relative paths of every file to mirror"""
+        found = []
+        for root, dirs, files in os.walk(self.source):
+            dirs[:] = [name for name in dirs if not name.startswith(".")]
+            rel_dir = os.path.relpath(root, self.source)
+            for name in files:
+                if not name.startswith("."):
+                    rel_path = os.path.normpath(os.path.join(rel_dir, name))
+                    found.append(rel_path.replace(os.sep, "/"))
+        return found
+
+    def _mirror_file(
+        self, rel_path: str, previous: Optional[ManifestEntry]
+    ) -> Tuple[str, Optional[ManifestEntry], str, int]:
+        """Bring one file up to date, returning (path, entry, action, bytes)"""
+        source = os.path.join(self.source, *rel_path.split("/"))
+        target = os.path.join(self.dest, *rel_path.split("/"))
+        try:
+            st = os.stat(source)
+        except FileNotFoundError:
+            if previous is not None:
+                try:
+                    os.remove(target)
+                except FileNotFoundError:
+                    pass
+            return rel_path, None, "removed", 0
+
+        exists = os.path.exists(target)
+        if exists and previous and previous[:2] == [st.st_mtime_ns, st.st_size]:
+            return rel_path, previous, "unchanged", 0
+
+        with open(source, "rb") as f:
+            data = f.read()
+        digest = hashlib.blake2b(digest_size=16)
+        old_size = previous[1] if previous and exists else 0
+        prefix = ""
+        if 0 < old_size < len(data):
+            digest.update(data[:old_size])
+            prefix = digest.hexdigest()
+            digest.update(data[old_size:])
+        else:
+            digest.update(data)
+        entry = [st.st_mtime_ns, len(data), digest.hexdigest()]
+
+        if exists and previous and previous[2] == entry[2]:
+            action, written = "unchanged", 0
+        elif (
+            old_size >= APPEND_MIN_BYTES
+            and previous
+            and prefix == previous[2]
+            and os.path.getsize(target) == old_size
+        ):
+            with open(target, "ab") as f:
+                f.write(data[old_size:])
+            action, written = "appended", len(data) - old_size
+        else:
+            _write_bytes(target, data)
+            action, written = "copied", len(data)
+        os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns))
+        return rel_path, entry, action, written
+
+    def run(
+        self, rel_paths: Optional[List[str]] = None, workers: Optional[int] = None
+    ) -> MirrorStats:
+        """Mirror the given files, or the whole vault, on a thread pool
+
+        A full run also removes mirrored files that left the vault.
+        """
+        with self._lock:
+            manifest = self._load_manifest()
+            if rel_paths is None:
+                wanted: Set[str] = set(self.source_files()) | set(manifest)
+            else:
+                wanted = set(rel_paths)
+            with ThreadPoolExecutor(workers) as pool:
+                results = list(
+                    pool.map(
+                        lambda rel: self._mirror_file(rel, manifest.get(rel)),
+                        sorted(wanted),
+                    )
+                )
+
+            counts = {"copied": 0, "appended": 0, "removed": 0, "unchanged": 0}
+            written = 0
+            changed = False
+            for rel_path, entry, action, size in results:
+                if entry is None:
+                    if manifest.pop(rel_path, None) is None:
+                        continue
+                    changed = True
+                elif manifest.get(rel_path) != entry:
+                    manifest[rel_path] = entry
+                    changed = True
+                counts[action] += 1
+                written += size
+            if changed:
+                self._save_manifest(manifest)
+            return MirrorStats(bytes_written=written, **counts)
+
+
+class BackgroundMirror(threading.Thread):
+    """Mirrors files handed to it on its own thread
+
+    Used after appends so the capture path only pays for queueing the paths;
+    paths queued while a run is in progress are mirrored together next.
+    """
+
+    def __init__(self, mirror: Mirror) -> None:
+        super().__init__(name="noter-mirror", daemon=True)
+        self.mirror = mirror
+        self.queue: "queue.Queue[Optional[List[str]]]" = queue.Queue()
+
+    def submit(self, rel_paths: List[str]) -> None:
+        """Queue files to be mirrored"""
+        self.queue.put(rel_paths)
+
+    def run(self) -> None:
+        stopping = False
+        while not stopping:
+            pending: Set[str] = set()
+            item = self.queue.get()
+            while True:
+                if item is None:
+                    stopping = True
+                else:
+                    pending.update(item)
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if pending:
+                try:
+                    self.mirror.run(sorted(pending), workers=1)
+                except OSError as e:
+                    logger.warning(f"Could not mirror to {self.mirror.dest}: {e}")
+
+    def stop(self) -> None:
+        """Finish the queued files and exit"""
+        self.queue.put(None)
@@ -0,0 +1,59 @@
+"""Process pool shared by the commands that work through the whole vault"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, TypeVar
+
+if TYPE_CHECKING:
+    from noter import NoteManager, TemplateManager
+
+logger = logging.getLogger("noter")
+
+Job = TypeVar("Job")
+Result = TypeVar("Result")
+
+# Managers of the current process, created on first use and reused by each job
+_templates: Optional["TemplateManager"] = None
+_notes: Optional["NoteManager"] = None
+
+
+def _init_worker() -> None:
+    """Quieten per-file logging in pool workers"""
+    logger.setLevel(logging.WARNING)
+
+
+def run_jobs(
+    fn: Callable[[Job], Result], jobs: List[Job], workers: Optional[int] = None
+) -> List[Result]:
+    """Run ``fn`` over ``jobs`` across a process pool, keeping their order
+
+    ``workers`` defaults to the number of CPUs. With one worker or one job
+    everything runs in this process, which avoids the pool's start-up cost.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) <= 1:
+        return [fn(job) for job in jobs]
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as pool:
+        return list(pool.map(fn, jobs, chunksize=chunksize))
+
+
+def worker_templates(config: Dict[str, Optional[str]]) -> "TemplateManager":
+    """Get this process's template manager for ``config``"""
+    from noter import TemplateManager
+
+    global _templates
+    if _templates is None or _templates.config != config:
+        _templates = TemplateManager(config)
+    return _templates
+
+
+def worker_notes(config: Dict[str, Optional[str]]) -> "NoteManager":
+    """Get this process's note manager for ``config``, for writing notes"""
+    from noter import NoteManager
+
+    global _notes
+    if _notes is None or _notes.config != config:
+        _notes = NoteManager(config, worker_templates(config))
+    return _notes
@@ -0,0 +1,227 @@
+"""Weekly and monthly rollup notes built from per-day digests"""
+
+import json
+import os
+import re
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from noter import NoteManager, logger
+from noter.document import DailyDocument
+from noter.fsutil import atomic_write
+from noter.pool import run_jobs
+
+_TAG_PATTERN = re.compile(r"(?<![\w#])#([^\W\d][\w/-]*)")
+
+# A digest is JSON-friendly: {"notes": [...], "tasks": [...], "tags": {...}}
+Digest = Dict[str, Any]
+
+# (note date, paths of the day, notes header, tasks header)
+DigestJob = Tuple[str, List[str], str, str]
+
+
+def _content_bullets(document: DailyDocument, header: str) -> List[str]:
+    """Get the non-empty bullets of a section, stripped of their line endings"""
+    section = document.find_section(header)
+    if section is None:
+        return []
+    return [
+        line.rstrip("\r\n")
+        for line in document.body(section)
+        if line.startswith("- ") and line.strip() != "-"
+    ]
+
+
+def digest_day(job: DigestJob) -> Digest:
+    """Extract the entries and tag counts of one day from its files"""
+    note_date, paths, notes_header, tasks_header = job
+    notes: List[str] = []
+    tasks: List[str] = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            document = DailyDocument(f.readlines())
+        notes.extend(_content_bullets(document, notes_header))
+        tasks.extend(_content_bullets(document, tasks_header))
+    tags = Counter(tag for line in notes + tasks for tag in _TAG_PATTERN.findall(line))
+    return {"notes": notes, "tasks": tasks, "tags": dict(tags)}
+
+
+def _fingerprint(paths: List[str]) -> List[List[int]]:
+    """Stat fingerprint of all the files of a day"""
+    fingerprint = []
+    for path in paths:
+        st = os.stat(path)
+        fingerprint.append([st.st_mtime_ns, st.st_size])
+    return fingerprint
+
+
+class DigestCache:
+    """Per-day digests persisted with the stat fingerprint they were built from"""
+
+    def __init__(self, cache_path: str) -> None:
+        self.cache_path = cache_path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable digest cache: {e}")
+
+    def get(self, note_date: str, fingerprint: List[List[int]]) -> Optional[Digest]:
+        """Return the cached digest of a day if its files are unchanged"""
+        entry = self.entries.get(note_date)
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            return None
+        digest: Digest = entry["digest"]
+        return digest
+
+    def put(self, note_date: str, fingerprint: List[List[int]], digest: Digest) -> None:
+        """Store the digest of a day"""
+        self.entries[note_date] = {"fingerprint": fingerprint, "digest": digest}
+
+    def save(self) -> None:
+        """Write the cache to disk"""
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        atomic_write(self.cache_path, json.dumps(self.entries))
+
+
+def collect_digests(
+    note_manager: NoteManager, start: date, end: date, workers: Optional[int] = None
+) -> Tuple[List[Tuple[date, str, Digest]], int]:
+    """Digest every day in [start, end], returning them and how many were re-read
+
+    Only days whose files changed since the cached digest are read, spread
+    across a process pool when there are several of them.
+    """
+    date_format = note_manager.config.get("date_format") or "%Y-%m-%d"
+    notes_header = note_manager.section_header(None)
+    tasks_header = note_manager.section_header("tasks")
+    cache = DigestCache(os.path.join(note_manager.get_state_dir(), "digests.json"))
+
+    days: List[Tuple[date, str, List[List[int]]]] = []
+    jobs: List[DigestJob] = []
+    digests: Dict[str, Digest] = {}
+    for day, _ in note_manager.list_days(start, end):
+        note_date = day.strftime(date_format)
+        paths = note_manager.get_day_paths(note_date)
+        fingerprint = _fingerprint(paths)
+        days.append((day, note_date, fingerprint))
+        cached = cache.get(note_date, fingerprint)
+        if cached is not None:
+            digests[note_date] = cached
+        else:
+            jobs.append((note_date, paths, notes_header, tasks_header))
+
+    fresh = run_jobs(digest_day, jobs, workers)
+    for job, digest in zip(jobs, fresh):
+        digests[job[0]] = digest
+
+    if jobs:
+        for day, note_date, fingerprint in days:
+            cache.put(note_date, fingerprint, digests[note_date])
+        cache.save()
+    return [(day, note_date, digests[note_date]) for day, note_date, _ in days], len(
+        jobs
+    )
+
+
+def render_rollup(
+    title: str, heading: str, kind: str, start: date, end: date, days: List[Any]
+) -> str:
+    """Render the markdown of a rollup note"""
+    tags: Counter[str] = Counter()
+    for _, _, digest in days:
+        tags.update(digest["tags"])
+    entry_count = sum(len(digest["notes"]) for _, _, digest in days)
+
+    lines = [
+        "---",
+        f'title: "{title}"',
+        f"period: {start.isoformat()}..{end.isoformat()}",
+        f"created: {date.today().isoformat()}",
+        f"entries: {entry_count}",
+        f"tags: [review, {kind}]",
+        "---",
+        "",
+        f"# 🗓️ {heading}",
+        "",
+        "## 🏷️ Tags",
+        "",
+    ]
+    for tag, count in sorted(tags.items(), key=lambda item: (-item[1], item[0])):
+        lines.append(f"- #{tag} ({count})")
+    if not tags:
+        lines.append("-")
+
+    lines += ["", "## ✅ Tasks", ""]
+    tasks = [(note_date, task) for _, note_date, d in days for task in d["tasks"]]
+    for note_date, task in tasks:
+        lines.append(f"{task} ([[{note_date.split('/')[-1]}]])")
+    if not tasks:
+        lines.append("-")
+
+    lines += ["", "## ✍️ Notes & Observations"]
+    for day, note_date, digest in days:
+        if not digest["notes"]:
+            continue
+        lines += ["", f"### [[{note_date.split('/')[-1]}]] {day.strftime('%A')}", ""]
+        lines += digest["notes"]
+    return "\n".join(lines) + "\n"
+
+
+def period_range(week: Optional[str], month: Optional[str]) -> Tuple[date, date]:
+    """Resolve ``YYYY-Www`` or ``YYYY-MM`` (or "current") to a date range"""
+    today = date.today()
+    if week is not None:
+        if week == "current":
+            start = today - timedelta(days=today.weekday())
+        else:
+            year, _, number = week.upper().partition("-W")
+            start = date.fromisocalendar(int(year), int(number), 1)
+        return start, start + timedelta(days=6)
+    if month is None or month == "current":
+        start = today.replace(day=1)
+    else:
+        start = datetime.strptime(month, "%Y-%m").date()
+    following = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start, following - timedelta(days=1)
+
+
+def write_rollup(
+    note_manager: NoteManager,
+    week: Optional[str] = None,
+    month: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> Tuple[str, int, int]:
+    """Write a weekly or monthly rollup note
+
+    Returns the note's path, the number of days in it and how many of them
+    had to be re-read.
+    """
+    start, end = period_range(week, month)
+    days, reread = collect_digests(note_manager, start, end, workers)
+    if week is not None:
+        iso_year, iso_week, _ = start.isocalendar()
+        name = f"{iso_year}-W{iso_week:02d}"
+        title, heading, kind = (
+            f"Weekly Review - {name}",
+            f"Week {iso_week}, {iso_year}",
+            "weekly",
+        )
+    else:
+        name = start.strftime("%Y-%m")
+        title, heading, kind = (
+            f"Monthly Review - {name}",
+            start.strftime("%B %Y"),
+            "monthly",
+        )
+
+    vault_path = note_manager.config["obsidian_vault_path"] or ""
+    folder = note_manager.config.get("rollup_folder") or "Rollups"
+    path = os.path.join(vault_path, folder, f"{name}.md")
+    note_manager.make_dirs(path)
+    atomic_write(path, render_rollup(title, heading, kind, start, end, days))
+    return path, len(days), reread
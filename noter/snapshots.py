@@ -0,0 +1,133 @@
+"""Store of the versions daily notes had before noter rewrote them"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import List, NamedTuple, Optional, Set
+
+logger = logging.getLogger("noter")
+
+# ioctl request cloning a whole file on Linux (btrfs, XFS, ...)
+_FICLONE = 0x40049409
+
+# How often the retention policy is applied, in seconds
+_PRUNE_INTERVAL = 24 * 60 * 60
+
+
+class Snapshot(NamedTuple):
+    """One recorded pre-write version of a note"""
+
+    path: str
+    digest: str
+    taken: float
+
+
+def content_digest(data: bytes) -> str:
+    """Hash file content into the name of its snapshot object"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _clone(source: str, target: str) -> None:
+    """Copy a file, sharing its blocks through a reflink where supported"""
+    try:
+        import fcntl
+
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        return
+    except (ImportError, OSError):
+        pass
+    shutil.copyfile(source, target)
+
+
+class SnapshotStore:
+    """Content-addressed snapshots of notes with an append-only log
+
+    Objects are named by the hash of their content, so an unchanged version
+    is stored once however often it is recorded. When the note is about to be
+    replaced by a new file (``replacing``) the snapshot is a hardlink to the
+    old one, which costs no copying at all; otherwise it is a reflink or, on
+    filesystems without them, a plain copy.
+    """
+
+    def __init__(self, store_dir: str, retention_days: int = 14) -> None:
+        self.store_dir = store_dir
+        self.objects_dir = os.path.join(store_dir, "objects")
+        self.log_path = os.path.join(store_dir, "log.jsonl")
+        self.retention_days = retention_days
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, f"{digest}.md")
+
+    def save(self, path: str, rel_path: str, digest: str, replacing: bool) -> None:
+        """Record the current version of ``path`` before it is written"""
+        os.makedirs(self.objects_dir, exist_ok=True)
+        target = self.object_path(digest)
+        if not os.path.exists(target):
+            try:
+                if not replacing:
+                    raise OSError("the file is written in place")
+                os.link(path, target)
+            except OSError:
+                tmp_path = f"{target}.tmp"
+                _clone(path, tmp_path)
+                os.replace(tmp_path, target)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps([rel_path, digest, time.time()]) + "\n")
+        self.prune_if_due()
+
+    def snapshots(self) -> List[Snapshot]:
+        """List every recorded snapshot, oldest first"""
+        snapshots = []
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        snapshots.append(Snapshot(*json.loads(line)))
+                    except (ValueError, TypeError):
+                        logger.warning(f"Ignoring unreadable snapshot record: {line}")
+        except FileNotFoundError:
+            pass
+        return snapshots
+
+    def read(self, digest: str) -> str:
+        """Get the content of a snapshot"""
+        with open(self.object_path(digest), "r", encoding="utf-8", newline="") as f:
+            return f.read()
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop snapshots past the retention period, returning objects removed"""
+        cutoff = (now or time.time()) - self.retention_days * 24 * 60 * 60
+        kept = [s for s in self.snapshots() if s.taken >= cutoff]
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = f"{self.log_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(list(s)) + "\n" for s in kept)
+        os.replace(tmp_path, self.log_path)
+
+        referenced: Set[str] = {s.digest for s in kept}
+        removed = 0
+        try:
+            names = os.listdir(self.objects_dir)
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            if name.endswith(".md") and name[:-3] not in referenced:
+                os.remove(os.path.join(self.objects_dir, name))
+                removed += 1
+        return removed
+
+    def prune_if_due(self) -> None:
+        """Apply the retention policy at most once per interval"""
+        marker = os.path.join(self.store_dir, "pruned")
+        try:
+            if time.time() - os.stat(marker).st_mtime < _PRUNE_INTERVAL:
+                return
+        except FileNotFoundError:
+            pass
+        self.prune()
+        with open(marker, "w", encoding="utf-8"):
+            pass
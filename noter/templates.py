@@ -0,0 +1,230 @@
+"""Custom templates parsed once into a render tree and cached per process"""
+
+import os
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+# Values every template can use as ``{{name}}``
+VARIABLES = ("note_date", "weekday", "month", "day", "year", "note_content")
+# Names ``{{#if}}`` can test: the variables plus flags that are never printed
+CONDITIONS = VARIABLES + ("weekend",)
+
+WEEKDAYS = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
+
+_TAG = re.compile(r"({{.*?}})", re.DOTALL)
+_INCLUDE = re.compile(r">\s*(\S.*?)")
+_IF = re.compile(r"#if\s+(\w+)(?:\s*(==|!=)\s*(\"[^\"]*\"|'[^']*'|\S+))?")
+# Control tags alone on a line take the line with them
+_CONTROL = re.compile(r"#if\s.*|else|/if")
+
+
+class Variable(NamedTuple):
+    """A ``{{name}}`` placeholder"""
+
+    name: str
+
+
+class Branch(NamedTuple):
+    """An ``{{#if}}`` block choosing between two lists of nodes"""
+
+    name: str
+    # None tests that the value is non-empty; "==" and "!=" compare it
+    op: Optional[str]
+    value: str
+    then: List["Node"]
+    otherwise: List["Node"]
+
+
+Node = Union[str, Variable, Branch]
+
+# (path, mtime_ns, size) of each file a compiled template was built from
+Fingerprint = List[Tuple[str, int, int]]
+
+
+def is_known_tag(tag: str) -> bool:
+    """Tell whether the text between ``{{`` and ``}}`` is valid template syntax"""
+    tag = tag.strip()
+    if tag in VARIABLES or tag in ("else", "/if") or _INCLUDE.fullmatch(tag):
+        return True
+    match = _IF.fullmatch(tag)
+    return bool(match and match.group(1) in CONDITIONS)
+
+
+def _tokens(source: str) -> List[str]:
+    """Split a template into text and tags, dropping standalone control lines
+
+    A control tag (``{{#if}}``, ``{{else}}``, ``{{/if}}``) with nothing but
+    blanks around it on its line removes that line, so blocks can be written
+    on lines of their own without leaving blank lines behind.
+    """
+    parts = _TAG.split(source)
+    # Text parts that begin at the start of a line
+    line_starts = {0}
+    for i in range(1, len(parts), 2):
+        if not _CONTROL.fullmatch(parts[i][2:-2].strip()):
+            continue
+        before, after = parts[i - 1], parts[i + 1]
+        line_start = before.rfind("\n") + 1
+        if before[line_start:].strip(" \t"):
+            continue
+        if line_start == 0 and i - 1 not in line_starts:
+            continue
+        line_end = after.find("\n")
+        rest = after if line_end == -1 else after[:line_end]
+        if rest.strip(" \t") or (line_end == -1 and i + 2 < len(parts)):
+            continue
+        parts[i - 1] = before[:line_start]
+        parts[i + 1] = "" if line_end == -1 else after[line_end + 1 :]
+        line_starts.add(i + 1)
+    return parts
+
+
+def _append_text(nodes: List[Node], text: str) -> None:
+    """Add text to a node list, merging it into a preceding text node"""
+    if not text:
+        return
+    if nodes and isinstance(nodes[-1], str):
+        nodes[-1] += text
+    else:
+        nodes.append(text)
+
+
+class _Compiler:
+    """Builds the node tree of a template file and the files it includes"""
+
+    def __init__(self, validate: Callable[[str], None]) -> None:
+        self.validate = validate
+        self.fingerprint: Fingerprint = []
+
+    def read(self, path: str) -> str:
+        st = os.stat(path)
+        with open(path, "r", encoding="utf-8") as f:
+            source = f.read()
+        self.validate(source)
+        self.fingerprint.append((path, st.st_mtime_ns, st.st_size))
+        return source
+
+    def compile_file(self, path: str, stack: Tuple[str, ...]) -> List[Node]:
+        if path in stack:
+            chain = " -> ".join(os.path.basename(p) for p in stack + (path,))
+            raise ValueError(f"Template includes itself: {chain}")
+        source = self.read(path)
+        if stack and source.endswith("\n"):
+            # The include tag's own line ending follows the fragment
+            source = source[:-1]
+        return self.compile_source(source, path, stack + (path,))
+
+    def compile_source(
+        self, source: str, path: str, stack: Tuple[str, ...]
+    ) -> List[Node]:
+        root: List[Node] = []
+        # Open {{#if}} blocks as (branch, node list currently being filled)
+        blocks: List[Tuple[Branch, List[Node]]] = []
+        nodes = root
+        for i, part in enumerate(_tokens(source)):
+            if i % 2 == 0:
+                _append_text(nodes, part)
+                continue
+            tag = part[2:-2].strip()
+            include = _INCLUDE.fullmatch(tag)
+            condition = _IF.fullmatch(tag)
+            if tag in VARIABLES:
+                nodes.append(Variable(tag))
+            elif include:
+                target = os.path.join(os.path.dirname(path), include.group(1))
+                if not os.path.isfile(target):
+                    raise ValueError(f"Included template not found: {target}")
+                for node in self.compile_file(os.path.normpath(target), stack):
+                    if isinstance(node, str):
+                        _append_text(nodes, node)
+                    else:
+                        nodes.append(node)
+            elif condition:
+                name, op, value = condition.groups()
+                branch = Branch(name, op, (value or "").strip("\"'"), [], [])
+                nodes.append(branch)
+                blocks.append((branch, nodes))
+                nodes = branch.then
+            elif tag == "else":
+                if not blocks or nodes is not blocks[-1][0].then:
+                    raise ValueError("{{else}} without a matching {{#if}}")
+                nodes = blocks[-1][0].otherwise
+            elif tag == "/if":
+                if not blocks:
+                    raise ValueError("{{/if}} without a matching {{#if}}")
+                nodes = blocks.pop()[1]
+            else:
+                raise ValueError(f"Unknown template tag: {part}")
+        if blocks:
+            raise ValueError(f"{{{{#if {blocks[-1][0].name}}}}} is never closed")
+        return root
+
+
+def _render(nodes: List[Node], values: Dict[str, str], out: List[str]) -> None:
+    for node in nodes:
+        if isinstance(node, str):
+            out.append(node)
+        elif isinstance(node, Variable):
+            out.append(values[node.name])
+        else:
+            value = values[node.name]
+            if node.op is None:
+                chosen = bool(value)
+            else:
+                chosen = (value.lower() == node.value.lower()) == (node.op == "==")
+            _render(node.then if chosen else node.otherwise, values, out)
+
+
+class CompiledTemplate:
+    """A parsed template that renders without touching the source again"""
+
+    def __init__(self, nodes: List[Node], fingerprint: Fingerprint) -> None:
+        self.nodes = nodes
+        self.fingerprint = fingerprint
+
+    def render(self, values: Dict[str, str]) -> str:
+        """Fill the template with ``values``, which covers every condition name"""
+        out: List[str] = []
+        _render(self.nodes, values, out)
+        return "".join(out)
+
+    def is_current(self) -> bool:
+        """Tell whether none of the template's files changed since compiling"""
+        try:
+            for path, mtime_ns, size in self.fingerprint:
+                st = os.stat(path)
+                if (st.st_mtime_ns, st.st_size) != (mtime_ns, size):
+                    return False
+        except OSError:
+            return False
+        return True
+
+
+# Compiled templates of this process by absolute path of the template file
+_compiled: Dict[str, CompiledTemplate] = {}
+
+
+def load_template(path: str, validate: Callable[[str], None]) -> CompiledTemplate:
+    """Get the compiled template of a file, compiling it on first use or change
+
+    ``validate`` checks the source of the template and of each included file
+    and raises ValueError when one is unusable. Compiled templates are shared
+    by every TemplateManager of the process, so bulk jobs parse each template
+    once; a template is recompiled when it or a file it includes changes.
+    """
+    key = os.path.abspath(path)
+    template = _compiled.get(key)
+    if template is None or not template.is_current():
+        compiler = _Compiler(validate)
+        nodes = compiler.compile_file(key, ())
+        template = CompiledTemplate(nodes, compiler.fingerprint)
+        _compiled[key] = template
+    return template
@@ -0,0 +1,237 @@
+"""Date to path index over the daily notes in a vault"""
+
+import calendar
+import os
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional, Pattern, Tuple
+
+# Regex fragments for the strftime directives that can be matched without
+# calling strptime; anything else falls back to strptime on the full path
+_DIRECTIVES = {
+    "Y": r"(?P<Y>\d{4})",
+    "y": r"(?P<y>\d{2})",
+    "m": r"(?P<m>\d{2})",
+    "d": r"(?P<d>\d{2})",
+    "j": r"(?P<j>\d{3})",
+    "B": r"(?P<B>[^\W\d_]+)",
+    "b": r"(?P<b>[^\W\d_]+)",
+    "A": r"[^\W\d_]+",
+    "a": r"[^\W\d_]+",
+    "%": "%",
+}
+
+_MONTHS = {
+    name.lower(): number
+    for names in (calendar.month_name, calendar.month_abbr)
+    for number, name in enumerate(names)
+    if name
+}
+
+# Matches an optional continuation suffix (".2") and the markdown extension
+_NOTE_SUFFIX = r"(?:\.(?P<part>\d+))?\.md"
+
+
+def _compile_level(level_format: str, suffix: str = "") -> Optional[Pattern[str]]:
+    """Compile one path component of a date format into a regex"""
+    parts = []
+    seen = set()
+    i = 0
+    while i < len(level_format):
+        char = level_format[i]
+        if char == "%" and i + 1 < len(level_format):
+            directive = level_format[i + 1]
+            if directive not in _DIRECTIVES or directive in seen:
+                return None
+            if directive not in "Aa%":
+                seen.add(directive)
+            parts.append(_DIRECTIVES[directive])
+            i += 2
+        else:
+            parts.append(re.escape(char))
+            i += 1
+    return re.compile("".join(parts) + suffix + "$")
+
+
+def _fields(match: "re.Match[str]") -> Dict[str, int]:
+    """Convert the named groups of a level match into numeric date fields"""
+    fields: Dict[str, int] = {}
+    groups = match.groupdict()
+    if groups.get("Y"):
+        fields["year"] = int(groups["Y"])
+    elif groups.get("y"):
+        short_year = int(groups["y"])
+        fields["year"] = short_year + (2000 if short_year < 69 else 1900)
+    for key in ("B", "b"):
+        if groups.get(key):
+            month = _MONTHS.get(groups[key].lower())
+            if month is None:
+                raise ValueError(f"Unknown month name: {groups[key]}")
+            fields["month"] = month
+    if groups.get("m"):
+        fields["month"] = int(groups["m"])
+    if groups.get("d"):
+        fields["day"] = int(groups["d"])
+    if groups.get("j"):
+        fields["yday"] = int(groups["j"])
+    return fields
+
+
+def parse_note_date(note_date: str, date_format: str) -> Optional[datetime]:
+    """Parse a formatted note date, or return None if it does not match
+
+    Nested formats such as ``%Y/%m/%Y-%m-%d`` repeat directives, which
+    strptime rejects, so the last path component is tried on its own too.
+    """
+    candidates = [(note_date, date_format)]
+    if "/" in date_format:
+        candidates.append((note_date.split("/")[-1], date_format.split("/")[-1]))
+    for value, fmt in candidates:
+        try:
+            return datetime.strptime(value, fmt)
+        except (ValueError, re.error):
+            continue
+    return None
+
+
+class VaultIndex:
+    """Enumerates daily notes by date using cached ``os.scandir`` listings
+
+    ``date_format`` may contain ``/`` to spread notes over nested directories
+    such as ``%Y/%m/%Y-%m-%d``. Every path component is matched with a regex
+    compiled once from the format, and directories whose partial date falls
+    outside a requested range are never listed. Listings are cached by the
+    directory's mtime, so repeated queries only re-read directories that
+    gained or lost files.
+    """
+
+    def __init__(self, vault_path: str, date_format: str) -> None:
+        self.vault_path = vault_path
+        self.date_format = date_format
+        self.levels = date_format.split("/")
+        compiled = [_compile_level(level) for level in self.levels[:-1]]
+        compiled.append(_compile_level(self.levels[-1], _NOTE_SUFFIX))
+        patterns = [pattern for pattern in compiled if pattern is not None]
+        self._patterns: Optional[List[Pattern[str]]] = (
+            patterns if len(patterns) == len(compiled) else None
+        )
+        self._listings: Dict[str, Tuple[int, List[Tuple[str, bool]]]] = {}
+
+    def path_for(self, note_date: str) -> str:
+        """Get the path of the main note for a formatted date string"""
+        return os.path.join(self.vault_path, *f"{note_date}.md".split("/"))
+
+    def _list(self, directory: str) -> List[Tuple[str, bool]]:
+        """List a directory as (name, is_dir) pairs, cached by its mtime"""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        cached = self._listings.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with os.scandir(directory) as it:
+            entries = [
+                (entry.name, entry.is_dir())
+                for entry in it
+                if not entry.name.startswith(".")
+            ]
+        self._listings[directory] = (mtime, entries)
+        return entries
+
+    def _bounds(self, fields: Dict[str, int]) -> Optional[Tuple[date, date]]:
+        """Get the span of dates a partial set of fields can still refer to"""
+        year = fields.get("year")
+        if year is None:
+            return None
+        month = fields.get("month")
+        if month is None:
+            return date(year, 1, 1), date(year, 12, 31)
+        last_day = calendar.monthrange(year, month)[1]
+        day = fields.get("day")
+        if day is None:
+            return date(year, month, 1), date(year, month, last_day)
+        return date(year, month, day), date(year, month, day)
+
+    def _to_date(self, fields: Dict[str, int]) -> date:
+        """Build a date from the fields collected along a path"""
+        if "yday" in fields:
+            return date.fromordinal(
+                date(fields["year"], 1, 1).toordinal() + fields["yday"] - 1
+            )
+        return date(fields["year"], fields.get("month", 1), fields.get("day", 1))
+
+    def days(
+        self, start: Optional[date] = None, end: Optional[date] = None
+    ) -> List[Tuple[date, str]]:
+        """List (date, main note path) pairs in date order, optionally in a range"""
+        found: Dict[date, str] = {}
+        if self._patterns is None:
+            self._walk_with_strptime(self.vault_path, 0, "", found)
+        else:
+            self._walk(self.vault_path, 0, {}, start, end, found)
+        return sorted(
+            (day, path)
+            for day, path in found.items()
+            if (start is None or day >= start) and (end is None or day <= end)
+        )
+
+    def _walk(
+        self,
+        directory: str,
+        level: int,
+        fields: Dict[str, int],
+        start: Optional[date],
+        end: Optional[date],
+        found: Dict[date, str],
+    ) -> None:
+        """Descend one level of the layout, pruning by partial dates"""
+        assert self._patterns is not None
+        pattern = self._patterns[level]
+        is_last = level == len(self._patterns) - 1
+        for name, is_dir in self._list(directory):
+            if is_dir == is_last:
+                continue
+            match = pattern.match(name)
+            # Continuation shards are reached through their main note
+            if match is None or (is_last and match.group("part")):
+                continue
+            try:
+                level_fields = {**fields, **_fields(match)}
+                if is_last:
+                    found[self._to_date(level_fields)] = os.path.join(directory, name)
+                    continue
+                bounds = self._bounds(level_fields)
+            except (KeyError, ValueError):
+                continue
+            if bounds is not None and (
+                (start is not None and bounds[1] < start)
+                or (end is not None and bounds[0] > end)
+            ):
+                continue
+            self._walk(
+                os.path.join(directory, name),
+                level + 1,
+                level_fields,
+                start,
+                end,
+                found,
+            )
+
+    def _walk_with_strptime(
+        self, directory: str, level: int, prefix: str, found: Dict[date, str]
+    ) -> None:
+        """Walk the layout for formats the regex compiler does not understand"""
+        is_last = level == len(self.levels) - 1
+        for name, is_dir in self._list(directory):
+            if is_dir == is_last:
+                continue
+            path = os.path.join(directory, name)
+            if not is_last:
+                self._walk_with_strptime(path, level + 1, f"{prefix}{name}/", found)
+                continue
+            if not name.endswith(".md"):
+                continue
+            parsed = parse_note_date(prefix + name[:-3], self.date_format)
+            if parsed is not None:
+                found[parsed.date()] = path
@@ -0,0 +1,181 @@
+"""Polling watcher that reports changed markdown files in a vault"""
+
+import os
+from typing import Callable, Dict, List, Set, Tuple
+
+# Receives the vault-relative paths that changed during a tick
+Consumer = Callable[[List[str]], None]
+
+
+class VaultWatcher:
+    """Detects changed, added and removed notes by polling, without inotify
+
+    Each tick stats every directory and only lists those whose mtime moved,
+    which catches files being added, removed or renamed. Edits made in place
+    do not touch the directory, so files are stat'ed from two sets instead:
+    the hot set of files that changed in the last ``hot_ticks`` ticks, every
+    tick, and a rolling sweep of ``sweep_size`` other files, so the cost of
+    a tick grows with what changed rather than with the size of the vault.
+    """
+
+    def __init__(
+        self, vault_path: str, sweep_size: int = 256, hot_ticks: int = 60
+    ) -> None:
+        self.vault_path = vault_path
+        self.sweep_size = sweep_size
+        self.hot_ticks = hot_ticks
+        self.consumers: List[Consumer] = []
+        # relative dir -> (mtime_ns, [note names], [subdir names])
+        self.dirs: Dict[str, Tuple[int, List[str], List[str]]] = {}
+        # relative path -> (mtime_ns, size)
+        self.files: Dict[str, Tuple[int, int]] = {}
+        # relative path -> tick it last changed in
+        self.hot: Dict[str, int] = {}
+        self.ticks = 0
+        self._sweep: List[str] = []
+        self._sweep_at = 0
+        self._sweep_stale = True
+        self._started = False
+
+    def subscribe(self, consumer: Consumer) -> None:
+        """Register a callable to receive the paths changed in each tick"""
+        self.consumers.append(consumer)
+
+    def tick(self) -> List[str]:
+        """Poll the vault once and push what changed to the consumers
+
+        The first tick only takes the initial snapshot and reports nothing.
+        """
+        self.ticks += 1
+        changed: Set[str] = set()
+        if not self._started:
+            self._scan_dir("", set())
+            self._started = True
+            return []
+
+        for rel_dir in list(self.dirs):
+            if rel_dir in self.dirs:
+                self._check_dir(rel_dir, changed)
+        for rel_path in list(self.hot):
+            if self.ticks - self.hot[rel_path] > self.hot_ticks:
+                del self.hot[rel_path]
+            elif rel_path not in changed:
+                self._check_file(rel_path, changed)
+        for rel_path in self._next_sweep():
+            if rel_path not in changed and rel_path not in self.hot:
+                self._check_file(rel_path, changed)
+
+        result = sorted(changed)
+        if result:
+            for consumer in self.consumers:
+                consumer(result)
+        return result
+
+    def _stat(self, rel_path: str) -> Tuple[int, int]:
+        """Get the (mtime, size) fingerprint of a file"""
+        st = os.stat(os.path.join(self.vault_path, rel_path))
+        return st.st_mtime_ns, st.st_size
+
+    def _changed(self, rel_path: str, changed: Set[str]) -> None:
+        """Report a file and keep it in the hot set"""
+        changed.add(rel_path)
+        self.hot[rel_path] = self.ticks
+
+    def _check_file(self, rel_path: str, changed: Set[str]) -> None:
+        """Stat a known file, reporting it if its fingerprint moved"""
+        try:
+            fingerprint = self._stat(rel_path)
+        except FileNotFoundError:
+            # Its directory listing will notice the removal
+            return
+        if self.files.get(rel_path) != fingerprint:
+            self.files[rel_path] = fingerprint
+            self._changed(rel_path, changed)
+
+    def _check_dir(self, rel_dir: str, changed: Set[str]) -> None:
+        """Re-list a directory if its mtime moved"""
+        try:
+            mtime = os.stat(os.path.join(self.vault_path, rel_dir)).st_mtime_ns
+        except FileNotFoundError:
+            self._forget_dir(rel_dir, changed)
+            return
+        if self.dirs[rel_dir][0] != mtime:
+            self._scan_dir(rel_dir, changed)
+
+    def _scan_dir(self, rel_dir: str, changed: Set[str]) -> None:
+        """List a directory, reporting added and removed files"""
+        abs_dir = os.path.join(self.vault_path, rel_dir)
+        try:
+            mtime = os.stat(abs_dir).st_mtime_ns
+            with os.scandir(abs_dir) as it:
+                entries = [
+                    (entry.name, entry.is_dir())
+                    for entry in it
+                    if not entry.name.startswith(".")
+                ]
+        except FileNotFoundError:
+            self._forget_dir(rel_dir, changed)
+            return
+
+        names = [
+            name for name, is_dir in entries if not is_dir and name.endswith(".md")
+        ]
+        subdirs = [name for name, is_dir in entries if is_dir]
+        previous = self.dirs.get(rel_dir)
+        known = set(previous[1]) if previous is not None else set()
+        self.dirs[rel_dir] = (mtime, names, subdirs)
+
+        for name in known - set(names):
+            self._drop_file(os.path.join(rel_dir, name), changed)
+        for name in names:
+            rel_path = os.path.join(rel_dir, name)
+            if name in known:
+                # A rename over an existing name also moves the directory
+                self._check_file(rel_path, changed)
+                continue
+            try:
+                self.files[rel_path] = self._stat(rel_path)
+            except FileNotFoundError:
+                continue
+            self._sweep_stale = True
+            if self._started:
+                self._changed(rel_path, changed)
+
+        for name in subdirs:
+            sub = os.path.join(rel_dir, name)
+            if sub not in self.dirs:
+                self._scan_dir(sub, changed)
+        if previous is not None:
+            for name in set(previous[2]) - set(subdirs):
+                self._forget_dir(os.path.join(rel_dir, name), changed)
+
+    def _drop_file(self, rel_path: str, changed: Set[str]) -> None:
+        """Forget a removed file and report it"""
+        if self.files.pop(rel_path, None) is not None:
+            self.hot.pop(rel_path, None)
+            self._sweep_stale = True
+            changed.add(rel_path)
+
+    def _forget_dir(self, rel_dir: str, changed: Set[str]) -> None:
+        """Drop a vanished directory and everything below it"""
+        cached = self.dirs.pop(rel_dir, None)
+        if cached is None:
+            return
+        for name in cached[1]:
+            self._drop_file(os.path.join(rel_dir, name), changed)
+        for name in cached[2]:
+            self._forget_dir(os.path.join(rel_dir, name), changed)
+
+    def _next_sweep(self) -> List[str]:
+        """Get the next slice of files for the rolling sweep"""
+        if self._sweep_stale:
+            # Keep the cursor so frequent additions do not restart the sweep
+            self._sweep = sorted(self.files)
+            self._sweep_stale = False
+        if not self._sweep:
+            return []
+        if self._sweep_at >= len(self._sweep):
+            self._sweep_at = 0
+        batch = self._sweep[self._sweep_at : self._sweep_at + self.sweep_size]
+        self._sweep_at += len(batch)
+        return batch
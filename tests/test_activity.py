@@ -0,0 +1,97 @@
+import json
+import os
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from noter import NoteManager, NoterCLI, TemplateManager
+from noter.activity import StatCache
+
+
+@pytest.fixture
+def static_setup(tmp_path):
+    """Setup a vault with static activity lists enabled"""
+    vault = tmp_path / "vault"
+    (vault / "Projects").mkdir(parents=True)
+    (vault / "Projects" / "Launch.md").write_text("# Launch\n", encoding="utf-8")
+    (vault / "Old idea.md").write_text(
+        "---\nstatus: active\nreviewed: 2020-01-05\n---\n\n# Old idea\n",
+        encoding="utf-8",
+    )
+    config = {
+        "obsidian_vault_path": str(vault),
+        "date_format": "%Y-%m-%d",
+        "time_format": "%H:%M",
+        "static_queries": True,
+    }
+    note_manager = NoteManager(config, TemplateManager(config))
+    return note_manager, config, vault
+
+
+def test_static_template_has_no_dataview(static_setup):
+    """Test that static mode replaces the vault-wide dataview queries"""
+    note_manager, _, _ = static_setup
+    result = note_manager.template_manager.create_basic_template("2025-05-21", "-")
+
+    assert "```dataview" not in result
+    assert "<!-- noter:touched -->" in result
+    assert "<!-- noter:reviews -->" in result
+
+
+def test_refresh_activity_writes_lists(static_setup):
+    """Test that refreshing fills in touched and due-for-review notes"""
+    note_manager, config, _ = static_setup
+    note_date = datetime.now().strftime(config["date_format"])
+    assert note_manager.append_to_note("Kickoff", note_date)
+
+    assert note_manager.refresh_activity(note_date)
+
+    with open(note_manager.get_note_path(note_date), "r", encoding="utf-8") as f:
+        content = f.read()
+    touched = content.split("<!-- noter:touched -->")[1].split("<!-- /noter")[0]
+    reviews = content.split("<!-- noter:reviews -->")[1].split("<!-- /noter")[0]
+    assert "[[Projects/Launch]]" in touched
+    assert note_date not in touched
+    assert "- [[Old idea]] (reviewed 2020-01-05)" in reviews
+    assert "Kickoff" in content
+
+
+def test_stat_cache_only_rereads_changed_files(static_setup, tmp_path):
+    """Test that unchanged files are not reopened on refresh"""
+    _, _, vault = static_setup
+    cache_path = str(tmp_path / "statcache.json")
+    cache = StatCache(str(vault), cache_path)
+    assert sorted(cache.refresh()) == [
+        "Old idea.md",
+        os.path.join("Projects", "Launch.md"),
+    ]
+    cache.save()
+
+    reloaded = StatCache(str(vault), cache_path)
+    with patch("noter.activity._read_frontmatter") as read_frontmatter:
+        assert reloaded.refresh() == []
+        read_frontmatter.assert_not_called()
+
+    (vault / "Projects" / "Launch.md").write_text("# Launch v2\n", encoding="utf-8")
+    os.remove(vault / "Old idea.md")
+    changed = reloaded.refresh()
+    assert sorted(changed) == ["Old idea.md", os.path.join("Projects", "Launch.md")]
+    assert "Old idea.md" not in reloaded.files
+
+
+def test_cli_refresh_command(static_setup, tmp_path):
+    """Test the refresh command end-to-end"""
+    note_manager, config, _ = static_setup
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(config), encoding="utf-8")
+    note_date = datetime.now().strftime(config["date_format"])
+    note_manager.append_to_note("Kickoff", note_date)
+
+    with patch("sys.argv", ["noter", "refresh", "--config", str(config_file)]):
+        assert NoterCLI().run() == 0
+    with patch(
+        "sys.argv",
+        ["noter", "refresh", "--date", "1999-01-01", "--config", str(config_file)],
+    ):
+        assert NoterCLI().run() == 1
@@ -0,0 +1,98 @@
+import os
+from contextlib import ExitStack
+from datetime import date
+from unittest.mock import patch
+
+from noter import NoterCLI, fsutil
+from noter.archive import NoteArchive
+
+
+def test_archive_reads_single_member(tmp_path):
+    """Test that members are read back individually across appends"""
+    archive = NoteArchive(str(tmp_path / "archive"))
+    archive.add("2024", [("a.md", b"first"), ("b.md", "second ✓".encode())])
+    archive.add("2024", [("c.md", b"third")])
+
+    reopened = NoteArchive(str(tmp_path / "archive"))
+    assert reopened.read("b.md") == "second ✓"
+    assert reopened.read("c.md") == "third"
+    assert reopened.read("missing.md") is None
+
+    reopened.remove(["a.md"])
+    assert NoteArchive(str(tmp_path / "archive")).members() == ["b.md", "c.md"]
+
+
+def test_archive_days(test_managers, test_vault):
+    """Test that old days leave the vault but can still be read"""
+    _, note_manager = test_managers
+    note_manager.append_to_note("Old entry", "2024-12-31")
+    note_manager.append_to_note("Older entry", "2023-06-01")
+    note_manager.append_to_note("Recent entry", "2025-01-01")
+
+    archived = note_manager.archive_days(date(2025, 1, 1))
+
+    assert archived == ["2023-06-01", "2024-12-31"]
+    assert sorted(os.listdir(test_vault / ".noter" / "archive")) == [
+        "2023.bundle",
+        "2023.json",
+        "2024.bundle",
+        "2024.json",
+    ]
+    assert not (test_vault / "2024-12-31.md").exists()
+    assert (test_vault / "2025-01-01.md").exists()
+    assert "Old entry" in note_manager.read_day("2024-12-31")
+    assert [day for day, _ in note_manager.list_days()] == [date(2025, 1, 1)]
+
+
+def test_archive_index_synced_before_notes_removed(test_managers, test_vault):
+    """Test that archived notes are only deleted once the index is on disk"""
+    _, note_manager = test_managers
+    note_manager.append_to_note("Old entry", "2024-12-31")
+    events = []
+    remove = os.remove
+
+    def record_remove(path):
+        events.append(("remove", os.path.basename(path)))
+        remove(path)
+
+    with ExitStack() as stack:
+        stack.enter_context(
+            patch.object(fsutil, "_datasync", lambda fd: events.append(("sync", fd)))
+        )
+        stack.enter_context(
+            patch.object(fsutil, "sync_dir", lambda d: events.append(("dir", d)))
+        )
+        stack.enter_context(patch("noter.os.remove", record_remove))
+        note_manager.archive_days(date(2025, 1, 1))
+
+    kinds = [kind for kind, _ in events]
+    assert kinds == ["sync", "dir", "remove"]
+    assert events[1][1] == str(test_vault / ".noter" / "archive")
+
+
+def test_append_restores_archived_day(test_managers, test_vault):
+    """Test that back-dating a note into an archived day restores it"""
+    _, note_manager = test_managers
+    note_manager.append_to_note("Old entry", "2024-12-31")
+    note_manager.archive_days(date(2025, 1, 1))
+
+    assert note_manager.append_to_note("Back-dated entry", "2024-12-31")
+
+    content = (test_vault / "2024-12-31.md").read_text(encoding="utf-8")
+    assert "Old entry" in content
+    assert "Back-dated entry" in content
+    assert content.count("title: ") == 1
+    assert note_manager.archive.members() == []
+
+
+def test_cli_archive(test_managers, test_config_file, test_vault):
+    """Test the archive command"""
+    _, note_manager = test_managers
+    note_manager.append_to_note("Old entry", "2024-12-31")
+
+    argv = ["noter", "archive", "--before", "2025-01-01", "--config"]
+    with patch("sys.argv", argv + [str(test_config_file)]):
+        assert NoterCLI().run() == 0
+
+    assert not (test_vault / "2024-12-31.md").exists()
+    assert (test_vault / ".noter" / "archive" / "2024.json").exists()
@@ -0,0 +1,49 @@
+from noter import NoteManager, TemplateManager
+from noter.attachments import spill, summary_line
+
+OUTPUT = "\n  $ make test\n" + "ok tests/test_cli.py\n" * 200
+
+
+def test_spill():
+    """Test attachment naming, content and the entry left in the note"""
+    rel_path, content, entry = spill(OUTPUT, "logs/")
+    assert rel_path.startswith("logs/") and rel_path.endswith(".md")
+    assert content == OUTPUT
+    assert entry.startswith("$ make test (4.1 KB) ![[logs/")
+    assert entry.endswith(f"{rel_path[:-3]}]]")
+    assert spill(OUTPUT, "logs")[0] == rel_path
+    assert spill(OUTPUT + "x", "logs")[0] != rel_path
+    assert summary_line("x" * 100, 10) == "xxxxxxxxx…"
+    assert summary_line("\n \n") == "Attachment"
+
+
+def test_large_entries_become_attachments(test_config, test_vault):
+    """Test that oversized notes are stored once and embedded in the daily note"""
+    test_config["attachment_bytes"] = "1024"
+    note_manager = NoteManager(test_config, TemplateManager(test_config))
+    assert note_manager.append_to_note(OUTPUT, "2025-05-21", tags=["ci"])
+    assert note_manager.append_to_note("Short note", "2025-05-21")
+    assert note_manager.append_to_note(OUTPUT, "2025-05-22")
+
+    attachments = list((test_vault / "attachments").iterdir())
+    assert len(attachments) == 1
+    assert attachments[0].read_text(encoding="utf-8") == OUTPUT
+
+    note = (test_vault / "2025-05-21.md").read_text(encoding="utf-8")
+    link = f"![[attachments/{attachments[0].stem}]]"
+    assert f"$ make test (4.1 KB) {link} #ci\n" in note
+    assert "Short note" in note
+    assert "ok tests/test_cli.py" not in note
+    assert link in (test_vault / "2025-05-22.md").read_text(encoding="utf-8")
+
+
+def test_attachment_embed_not_a_backlink(test_config, test_vault):
+    """Test that spilled entries index their own links, not the embed"""
+    test_config["attachment_bytes"] = "1024"
+    note_manager = NoteManager(test_config, TemplateManager(test_config))
+    assert note_manager.append_to_note("[[Build]] failed" + OUTPUT, "2025-05-21")
+
+    links = note_manager.link_index
+    assert links.pages() == ["build"]
+    ((note_date, entry),) = links.backlinks("Build")
+    assert note_date == "2025-05-21" and "![[attachments/" in entry
@@ -0,0 +1,114 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from noter import NoterCLI
+from noter.batch import parse_line, run_batch
+
+
+@pytest.fixture
+def vaults_config(tmp_path):
+    """Create a config declaring a work and a personal vault"""
+    work, personal = tmp_path / "work", tmp_path / "personal"
+    work.mkdir()
+    personal.mkdir()
+    config = {
+        "time_format": "%H:%M",
+        "default_vault": "work",
+        "vaults": {
+            "work": {"obsidian_vault_path": str(work), "date_format": "%Y-%m-%d"},
+            "personal": {
+                "obsidian_vault_path": str(personal),
+                "date_format": "%d.%m.%Y",
+            },
+        },
+    }
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(config), encoding="utf-8")
+    return config_file, work, personal
+
+
+def test_parse_line():
+    """Test plain and JSON batch lines"""
+    vault, entry = parse_line("Plain note")
+    assert vault is None
+    assert entry.text == "Plain note"
+    vault, entry = parse_line(
+        '{"text": "Dentist", "vault": "personal", "tags": "health, admin"}'
+    )
+    assert vault == "personal"
+    assert entry.text == "Dentist"
+    assert entry.tags == ["health", "admin"]
+    with pytest.raises(ValueError):
+        parse_line('{"vault": "personal"}')
+
+
+def test_run_batch_routes_lines(vaults_config):
+    """Test that lines reach their own vault in order"""
+    config_file, work, personal = vaults_config
+    lines = [
+        "Standup\n",
+        '{"text": "Dentist", "vault": "personal", "date": "21.05.2025"}\n',
+        '{"text": "Review", "date": "2025-05-21"}\n',
+        '{"text": "Lost", "vault": "missing"}\n',
+        "\n",
+        '{"text": "Gym", "vault": "personal", "date": "21.05.2025"}\n',
+    ]
+
+    results = run_batch(lines, str(config_file))
+
+    assert [line_no for line_no, _, _ in results] == [1, 2, 3, 4, 6]
+    assert [vault for _, vault, _ in results] == [
+        "work",
+        "personal",
+        "work",
+        "missing",
+        "personal",
+    ]
+    assert [result.ok for _, _, result in results] == [True, True, True, False, True]
+    personal_note = (personal / "21.05.2025.md").read_text(encoding="utf-8")
+    assert personal_note.index("Dentist") < personal_note.index("Gym")
+    assert "Review" in (work / "2025-05-21.md").read_text(encoding="utf-8")
+
+
+def test_run_batch_default_vault_by_name(vaults_config):
+    """Test that plain lines and lines naming the default vault share a writer"""
+    config_file, work, _ = vaults_config
+    lines = []
+    for i in range(400):
+        if i % 2:
+            lines.append(json.dumps({"text": f"Note {i}", "vault": "work"}))
+        else:
+            lines.append(f"Note {i}")
+
+    results = run_batch(lines, str(config_file))
+
+    assert all(result.ok for _, _, result in results)
+    assert {vault for _, vault, _ in results} == {"work"}
+    (note,) = work.iterdir()
+    text = note.read_text(encoding="utf-8")
+    assert all(f"] Note {i}\n" in text for i in range(400))
+
+
+def test_cli_vault_selection(vaults_config):
+    """Test that --vault picks the vault a note is written to"""
+    config_file, work, personal = vaults_config
+    argv = ["noter", "Evening walk", "--vault", "personal", "--config"]
+    with patch("sys.argv", argv + [str(config_file)]):
+        assert NoterCLI().run() == 0
+
+    assert len(list(personal.glob("*.md"))) == 1
+    assert list(work.glob("*.md")) == []
+
+
+def test_cli_batch_from_file(vaults_config, tmp_path):
+    """Test the batch command reports failed lines"""
+    config_file, work, _ = vaults_config
+    notes = tmp_path / "notes.txt"
+    notes.write_text('First\n{"text": "Broken", "vault": "nope"}\n', encoding="utf-8")
+
+    argv = ["noter", "batch", "--file", str(notes), "--config", str(config_file)]
+    with patch("sys.argv", argv):
+        assert NoterCLI().run() == 1
+    assert len(list(work.glob("*.md"))) == 1
@@ -0,0 +1,143 @@
+import json
+import os
+import re
+from unittest.mock import patch
+
+import pytest
+
+from noter import NoteEntry, NoteManager, NoterCLI, TemplateManager
+from noter.blocks import BlockIndex, BlockLocation, scan_blocks
+
+
+@pytest.fixture
+def note_manager(test_config):
+    """Create a note manager that gives entries block IDs"""
+    test_config["block_ids"] = "true"
+    return NoteManager(test_config, TemplateManager(test_config))
+
+
+def read_note(note_manager, note_date):
+    with open(note_manager.get_note_path(note_date), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_entries_get_block_ids(note_manager):
+    """Test that appended entries end in an indexed block ID"""
+    first, second = note_manager.append_entries(
+        "2025-05-21", [NoteEntry("First", ["work"]), NoteEntry("Second")]
+    )
+    assert first.block_id and second.block_id and first.block_id != second.block_id
+
+    content = read_note(note_manager, "2025-05-21")
+    assert re.search(rf"\] First #work \^{first.block_id}\n", content)
+    location = note_manager.block_index.get(second.block_id)
+    assert location is not None and location.path == "2025-05-21.md"
+    data = content.encode("utf-8")
+    line = data[location.offset : location.offset + location.length]
+    assert line.decode("utf-8").endswith(f"Second ^{second.block_id}\n")
+
+
+def test_amend_and_remove(note_manager):
+    """Test editing entries in place, including after they moved"""
+    note_date = "2025-05-21"
+    kept, amended, removed = note_manager.append_entries(
+        note_date, [NoteEntry("Keep"), NoteEntry("Tpyo"), NoteEntry("Drop")]
+    )
+    # A task above the notes moves every entry below it
+    assert note_manager.append_to_note("A task", note_date, section="tasks")
+
+    location = note_manager.amend_block(f"^{amended.block_id}", "Typo #fixed")
+    assert location is not None
+    assert note_manager.remove_block(removed.block_id) is not None
+    assert note_manager.remove_block(removed.block_id) is None
+    assert note_manager.amend_block("nosuch", "Text") is None
+
+    content = read_note(note_manager, note_date)
+    assert re.search(rf"- \[\d\d:\d\d\] Typo #fixed \^{amended.block_id}\n", content)
+    assert "Tpyo" not in content and "Drop" not in content
+    assert f"Keep ^{kept.block_id}\n" in content
+    data = content.encode("utf-8")
+    assert data[location.offset :].startswith(b"- [")
+
+
+def test_amend_and_remove_update_backlinks(note_manager):
+    """Test that backlinks follow an amended entry and go with a removed one"""
+    first, second = note_manager.append_entries(
+        "2025-05-21", [NoteEntry("Met [[Alice]]"), NoteEntry("Called [[Alice]]")]
+    )
+    links = note_manager.link_index
+
+    note_manager.amend_block(first.block_id, "Met [[Bob]]")
+    (alice,) = links.backlinks("Alice")
+    assert "Called [[Alice]]" in alice[1]
+    assert "Met [[Bob]]" in links.backlinks("Bob")[0][1]
+
+    note_manager.remove_block(second.block_id)
+    assert links.backlinks("Alice") == []
+    assert "alice" not in links.pages()
+    assert len(links.backlinks("Bob")) == 1
+
+
+def test_undo_reindexes_blocks_and_links(note_manager):
+    """Test that an entry brought back by undo can be amended and is linked"""
+    note_manager.config["snapshots"] = "true"
+    (entry,) = note_manager.append_entries("2025-05-21", [NoteEntry("Met [[Alice]]")])
+    assert note_manager.remove_block(entry.block_id) is not None
+    assert note_manager.undo("2025-05-21") is not None
+
+    links = note_manager.link_index
+    assert [note_date for note_date, _ in links.backlinks("Alice")] == ["2025-05-21"]
+    assert note_manager.amend_block(entry.block_id, "Met [[Bob]]") is not None
+    assert f"Met [[Bob]] ^{entry.block_id}\n" in read_note(note_manager, "2025-05-21")
+    assert links.backlinks("Alice") == []
+    assert len(links.backlinks("Bob")) == 1
+
+
+def test_rebuild_block_index(note_manager, test_vault):
+    """Test rebuilding the index from the notes"""
+    results = note_manager.append_entries("2025-05-21", [NoteEntry("One")])
+    results += note_manager.append_entries("2025-05-22", [NoteEntry("Two")])
+    os.remove(note_manager.block_index.log_path)
+
+    note_manager._block_index = None
+    assert note_manager.block_index.get(results[0].block_id) is None
+    assert note_manager.rebuild_block_index(workers=1) == 2
+    location = note_manager.block_index.get(results[1].block_id)
+    assert location is not None and location.note_date == "2025-05-22"
+
+
+def test_block_index_log(tmp_path):
+    """Test that the last record of an ID wins and removals stick"""
+    index = BlockIndex(str(tmp_path / "blocks.jsonl"))
+    index.add([("abc123", BlockLocation("2025-05-21", "2025-05-21.md", 10, 20))])
+    index.add([("abc123", BlockLocation("2025-05-21", "2025-05-21.md", 30, 20))])
+    assert BlockIndex(index.log_path).get("abc123").offset == 30
+    index.remove("abc123")
+    assert "abc123" not in index
+    assert list(scan_blocks(b"# x\n- [1] a ^abc123\n  - b ^def-45\n")) == [
+        ("abc123", 4, 16),
+        ("def-45", 20, 14),
+    ]
+
+
+def test_cli_amend_rm_reindex(test_config, test_config_file):
+    """Test the amend, rm and reindex commands"""
+    test_config["block_ids"] = "true"
+    test_config_file.write_text(json.dumps(test_config), encoding="utf-8")
+    note_manager = NoteManager(test_config, TemplateManager(test_config))
+    first, second = note_manager.append_entries(
+        "2025-05-21", [NoteEntry("Old"), NoteEntry("Gone")]
+    )
+
+    config = ["--config", str(test_config_file)]
+    for argv, code in [
+        (["amend", first.block_id, "New"], 0),
+        (["rm", f"^{second.block_id}"], 0),
+        (["rm", second.block_id], 1),
+        (["reindex", "--workers", "1"], 0),
+    ]:
+        with patch("sys.argv", ["noter"] + argv + config):
+            assert NoterCLI().run() == code
+
+    content = read_note(note_manager, "2025-05-21")
+    assert f"New ^{first.block_id}" in content and "Gone" not in content
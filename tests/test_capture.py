@@ -0,0 +1,73 @@
+from unittest.mock import patch
+
+from noter import NoteEntry, NoterCLI, NoterSession
+from noter.capture import capture_loop, parse_capture
+
+
+def lines(*typed):
+    """Fake input() returning each line in turn, then end of input"""
+    queue = list(typed)
+
+    def read(prompt):
+        if not queue:
+            raise EOFError
+        return queue.pop(0)
+
+    return read
+
+
+def test_parse_capture():
+    """Test trailing tags and time overrides"""
+    assert parse_capture("Plain note") == NoteEntry("Plain note")
+    assert parse_capture("Call #bob re budget #work #ops", ["log"]) == NoteEntry(
+        "Call #bob re budget", ["log", "work", "ops"]
+    )
+    assert parse_capture("@9:05 Standup #team") == NoteEntry(
+        "Standup", ["team"], at="09:05"
+    )
+    assert parse_capture("Meet at @25:00 #1") == NoteEntry("Meet at @25:00 #1")
+
+
+def test_capture_loop(test_config):
+    """Test that every line is added to today's note with its own time"""
+    with NoterSession(config=test_config) as session:
+        added = capture_loop(
+            session, ["log"], read=lines("First", "", "@07:30 Early #gym", "#only")
+        )
+        content = session.note_manager.read_day(session.today())
+
+    assert added == 2
+    assert content is not None
+    assert "] First #log\n" in content
+    assert "- [07:30] Early #log #gym\n" in content
+
+
+def test_capture_loop_follows_midnight(test_config):
+    """Test that a session left open writes to the new day after midnight"""
+    typed = lines("Late", "Early")
+    prompts = []
+
+    def read(prompt):
+        prompts.append(prompt)
+        return typed(prompt)
+
+    def today(self):
+        return "2025-05-21" if len(prompts) < 2 else "2025-05-22"
+
+    with NoterSession(config=test_config) as session:
+        with patch.object(NoterSession, "today", today):
+            capture_loop(session, read=read)
+        late = session.note_manager.read_day("2025-05-21")
+        early = session.note_manager.read_day("2025-05-22")
+
+    assert late is not None and "Late" in late and "Early" not in late
+    assert early is not None and "Early" in early
+
+
+def test_cli_interactive(test_config_file, test_vault):
+    """Test noter -i until end of input"""
+    argv = ["noter", "-i", "--config", str(test_config_file)]
+    with patch("sys.argv", argv), patch("builtins.input", lines("One", "Two")):
+        assert NoterCLI().run() == 0
+    content = "".join(p.read_text(encoding="utf-8") for p in test_vault.glob("*.md"))
+    assert "] One\n" in content and "] Two\n" in content
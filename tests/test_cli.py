@@ -27,6 +27,53 @@ def test_cli_with_direct_note(cli, tmp_path):
         assert result == 0
 
 
+def test_cli_note_named_like_command(cli, tmp_path):
+    """Test that a leading -- adds a command name as a note"""
+    config_file = tmp_path / "config.json"
+    config_file.write_text(
+        json.dumps({"obsidian_vault_path": str(tmp_path)}), encoding="utf-8"
+    )
+
+    with patch("sys.argv", ["noter", "--", "undo", "--config", str(config_file)]):
+        assert cli.run() == 0
+    with patch("sys.argv", ["noter", "--config", str(config_file), "--", "batch"]):
+        assert cli.run() == 0
+
+    note_path = tmp_path / datetime.now().strftime("%Y-%m-%d.md")
+    content = note_path.read_text(encoding="utf-8")
+    assert "] undo\n" in content and "] batch\n" in content
+
+
+def test_cli_command_after_config(cli, tmp_path):
+    """Test that a command still runs when --config comes first"""
+    config_file = tmp_path / "config.json"
+    config_file.write_text(
+        json.dumps({"obsidian_vault_path": str(tmp_path)}), encoding="utf-8"
+    )
+
+    with patch("sys.argv", ["noter", "--config", str(config_file), "doctor"]):
+        assert cli.run() == 0
+    with patch("sys.argv", ["noter", f"--config={config_file}", "doctor"]):
+        assert cli.run() == 0
+    assert not (tmp_path / datetime.now().strftime("%Y-%m-%d.md")).exists()
+
+
+def test_cli_reports_continuation_file(cli, tmp_path, caplog):
+    """Test that the success message names the file the note went to"""
+    config_file = tmp_path / "config.json"
+    config_file.write_text(
+        json.dumps({"obsidian_vault_path": str(tmp_path), "max_note_entries": "1"}),
+        encoding="utf-8",
+    )
+    for note in ("First", "Second"):
+        with patch("sys.argv", ["noter", note, "--config", str(config_file)]):
+            assert cli.run() == 0
+
+    continuation = tmp_path / datetime.now().strftime("%Y-%m-%d.2.md")
+    assert "Second" in continuation.read_text(encoding="utf-8")
+    assert f"added to {continuation}" in caplog.text
+
+
 def test_cli_with_tags(cli, tmp_path):
     """Test CLI with tags argument"""
     test_config = {
@@ -97,3 +144,68 @@ def test_cli_interactive_mode(cli, tmp_path):
         assert note_path.exists()
         content = note_path.read_text(encoding="utf-8")
         assert "Interactive note" in content
+
+
+def test_cli_pregen(cli, tmp_path):
+    """Test pre-generating a range of daily notes"""
+    test_config = {
+        "obsidian_vault_path": str(tmp_path),
+        "date_format": "%Y-%m-%d",
+        "time_format": "%H:%M",
+    }
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(test_config), encoding="utf-8")
+
+    argv = ["noter", "pregen", "--from", "2025-05-30", "--days", "3"]
+    with patch("sys.argv", argv + ["--config", str(config_file)]):
+        assert cli.run() == 0
+
+    assert sorted(p.name for p in tmp_path.glob("*.md")) == [
+        "2025-05-30.md",
+        "2025-05-31.md",
+        "2025-06-01.md",
+    ]
+    content = (tmp_path / "2025-06-01.md").read_text(encoding="utf-8")
+    assert "# 📅️ Sunday, June 01th 2025" in content
+
+
+def test_cli_with_section(cli, tmp_path):
+    """Test adding a note to another section from the command line"""
+    test_config = {
+        "obsidian_vault_path": str(tmp_path),
+        "date_format": "%Y-%m-%d",
+        "time_format": "%H:%M",
+    }
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(test_config), encoding="utf-8")
+
+    argv = ["noter", "Call the bank", "--section", "tasks"]
+    with patch("sys.argv", argv + ["--config", str(config_file)]):
+        assert cli.run() == 0
+
+    note_path = tmp_path / datetime.now().strftime("%Y-%m-%d.md")
+    content = note_path.read_text(encoding="utf-8")
+    assert "Call the bank" in content.split("## ✅ Tasks")[1].split("## ")[0]
+
+
+def test_cli_with_at(cli, tmp_path):
+    """Test back-dating a note with --at"""
+    test_config = {
+        "obsidian_vault_path": str(tmp_path),
+        "date_format": "%Y-%m-%d",
+        "time_format": "%H:%M",
+    }
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(test_config), encoding="utf-8")
+
+    for note, at in [("Later", "23:59"), ("Earlier", "00:01")]:
+        argv = ["noter", note, "--at", at, "--config", str(config_file)]
+        with patch("sys.argv", argv):
+            assert cli.run() == 0
+    with patch("sys.argv", ["noter", "Bad", "--at", "25:00"]):
+        with pytest.raises(SystemExit):
+            cli.run()
+
+    note_path = tmp_path / datetime.now().strftime("%Y-%m-%d.md")
+    content = note_path.read_text(encoding="utf-8")
+    assert content.index("- [00:01] Earlier") < content.index("- [23:59] Later")
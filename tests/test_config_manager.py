@@ -1,9 +1,11 @@
 import json
 import os
+import shutil
+from unittest.mock import patch
 
 import pytest
 
-from noter import ConfigManager
+from noter import ConfigManager, NoteManager, TemplateManager
 
 
 @pytest.fixture
@@ -107,3 +109,95 @@ def test_custom_date_format(test_config_file):
     config = config_manager.load_config()
     assert config is not None
     assert config["date_format"] == "%d-%m-%Y"
+
+
+def test_snapshot_skips_vault_check(test_config_file):
+    """Test that an unchanged config is served from its snapshot"""
+    assert ConfigManager(str(test_config_file)).load_config() is not None
+    assert ConfigManager(str(test_config_file)).snapshot_path.endswith(
+        ".test_config.json.snapshot"
+    )
+
+    with patch("noter.os.path.exists") as exists:
+        config = ConfigManager(str(test_config_file)).load_config()
+        exists.assert_not_called()
+    assert config is not None
+    assert config["date_format"] == "%Y-%m-%d"
+
+
+def test_snapshot_never_recreates_missing_vault(test_config_file, tmp_path):
+    """Test that a vault removed after its config was snapshot is not recreated"""
+    assert ConfigManager(str(test_config_file)).load_config() is not None
+    vault_path = tmp_path / "test_vault"
+    shutil.rmtree(vault_path)
+
+    config = ConfigManager(str(test_config_file)).load_config()
+    assert config is not None
+    note_manager = NoteManager(config, TemplateManager(config))
+    assert not note_manager.append_to_note("Lost note", "2025-05-21")
+    assert not vault_path.exists()
+
+
+def test_snapshot_invalidated_by_edit(test_config_file, tmp_path):
+    """Test that editing the config revalidates it"""
+    assert ConfigManager(str(test_config_file)).load_config() is not None
+
+    config_data = json.loads(test_config_file.read_text(encoding="utf-8"))
+    config_data["obsidian_vault_path"] = str(tmp_path / "moved_vault")
+    test_config_file.write_text(json.dumps(config_data), encoding="utf-8")
+
+    assert ConfigManager(str(test_config_file)).load_config() is None
+
+
+def test_poll_reloads_changed_config(test_config_file):
+    """Test that poll only returns a config after the file changed"""
+    config_manager = ConfigManager(str(test_config_file))
+    assert config_manager.load_config() is not None
+    assert config_manager.poll() is None
+
+    config_data = json.loads(test_config_file.read_text(encoding="utf-8"))
+    config_data["time_format"] = "%H:%M:%S"
+    test_config_file.write_text(json.dumps(config_data, indent=2), encoding="utf-8")
+
+    reloaded = config_manager.poll()
+    assert reloaded is not None
+    assert reloaded["time_format"] == "%H:%M:%S"
+    assert config_manager.poll() is None
+
+
+def test_select_vault(tmp_path):
+    """Test that named vaults override the shared settings"""
+    work, personal = tmp_path / "work", tmp_path / "personal"
+    work.mkdir()
+    personal.mkdir()
+    config_file = tmp_path / "config.json"
+    config_file.write_text(
+        json.dumps(
+            {
+                "time_format": "%H:%M",
+                "date_format": "%Y-%m-%d",
+                "vaults": {
+                    "work": {"obsidian_vault_path": str(work)},
+                    "personal": {
+                        "obsidian_vault_path": str(personal),
+                        "date_format": "%d.%m.%Y",
+                    },
+                },
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    default = ConfigManager(str(config_file)).load_config()
+    assert default is not None
+    assert default["obsidian_vault_path"] == str(work)
+    assert default["vault_name"] == "work"
+    assert "vaults" not in default
+
+    chosen = ConfigManager(str(config_file), "personal").load_config()
+    assert chosen is not None
+    assert chosen["date_format"] == "%d.%m.%Y"
+    assert chosen["time_format"] == "%H:%M"
+
+    assert ConfigManager(str(config_file), "missing").load_config() is None
+    assert ConfigManager(str(config_file)).vault_names() == ["work", "personal"]
@@ -0,0 +1,102 @@
+from unittest.mock import patch
+
+from noter import NoteManager, NoterCLI, TemplateManager
+from noter.doctor import check_text, doctor_vault
+
+HEADERS = ["## ✍️ Notes & Observations"]
+
+BROKEN = (
+    "---\r\n"
+    "date: 2025-05-21\r\n"
+    "# 2025-05-21\n"
+    "\n"
+    "## ✍️ Notes & Observations\n"
+    "- [09:00] First\n"
+    "- \n"
+    "- [10:00] Second\n"
+    "\n"
+    "## ✍️ Notes & Observations\n"
+    "- [11:00] Third\n"
+)
+
+
+def codes(problems):
+    return sorted(problem.code for problem in problems)
+
+
+def test_check_text_finds_problems():
+    """Test each kind of structural problem"""
+    assert codes(check_text(BROKEN, HEADERS, 10**6, len(BROKEN))) == [
+        "duplicate-section",
+        "empty-bullet",
+        "frontmatter",
+        "line-endings",
+    ]
+    problems = check_text("# Day\n", HEADERS, 4, 6)
+    assert codes(problems) == ["missing-section", "too-large"]
+    assert [problem.fixable for problem in problems] == [True, False]
+
+
+def test_check_text_accepts_noter_output(test_managers):
+    """Test that notes written by noter have no problems"""
+    _, note_manager = test_managers
+    note_manager.append_to_note("Only note", "2025-05-21")
+    path = note_manager.get_note_path("2025-05-21")
+    with open(path, encoding="utf-8", newline="") as f:
+        text = f.read()
+    assert check_text(text, HEADERS, 10**6, len(text)) == []
+
+
+def test_check_text_skips_marked_blocks(test_config, test_vault):
+    """Test that the placeholders of static activity lists are not stray"""
+    test_config["static_queries"] = True
+    note_manager = NoteManager(test_config, TemplateManager(test_config))
+    note_manager.append_to_note("Only note", "2025-05-21")
+    text = (test_vault / "2025-05-21.md").read_text(encoding="utf-8")
+    assert "<!-- noter:touched -->\n-\n" in text
+    assert check_text(text, HEADERS, 10**6, len(text)) == []
+
+
+def test_doctor_fix(test_config, test_vault):
+    """Test that --fix repairs notes so appends work again"""
+    (test_vault / "2025-05-21.md").write_bytes(BROKEN.encode("utf-8"))
+    (test_vault / "2025-05-22.md").write_text("# 2025-05-22\n\nJust text\n")
+    note_manager = NoteManager(test_config, TemplateManager(test_config))
+
+    reports, _ = doctor_vault(note_manager, fix=True, workers=1)
+    assert all(report.fixed and not report.remaining for report in reports)
+
+    text = (test_vault / "2025-05-21.md").read_text(encoding="utf-8")
+    assert text.count("Notes & Observations") == 1
+    assert text.index("First") < text.index("Second") < text.index("Third")
+    assert "\n- \n" not in text
+    assert "Just text" in (test_vault / "2025-05-22.md").read_text(encoding="utf-8")
+    assert note_manager.append_to_note("After", "2025-05-22")
+
+    reports, _ = doctor_vault(note_manager, workers=2)
+    assert not any(report.problems for report in reports)
+
+
+def test_doctor_fix_can_be_undone(test_config, test_vault):
+    """Test that --fix snapshots each note it rewrites"""
+    note = test_vault / "2025-05-21.md"
+    note.write_bytes(BROKEN.encode("utf-8"))
+    note_manager = NoteManager(test_config, TemplateManager(test_config))
+    doctor_vault(note_manager, fix=True, workers=1)
+    assert note.read_bytes() != BROKEN.encode("utf-8")
+
+    assert note_manager.undo("2025-05-21") is not None
+    assert note.read_bytes() == BROKEN.encode("utf-8")
+
+
+def test_cli_doctor(test_config_file, test_vault, capsys):
+    """Test the doctor command's output and exit status"""
+    (test_vault / "2025-05-21.md").write_text("# 2025-05-21\n", encoding="utf-8")
+    config = ["--config", str(test_config_file)]
+    with patch("sys.argv", ["noter", "doctor"] + config):
+        assert NoterCLI().run() == 1
+    assert "2025-05-21.md: has no ## ✍️ Notes" in capsys.readouterr().out
+
+    with patch("sys.argv", ["noter", "doctor", "--fix"] + config):
+        assert NoterCLI().run() == 0
+    assert "(fixed)" in capsys.readouterr().out
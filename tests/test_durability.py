@@ -0,0 +1,123 @@
+import json
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from noter import ConfigManager, NoteEntry, NoteManager, NoterSession, TemplateManager
+from noter import fsutil
+
+
+@pytest.fixture
+def syncs():
+    """Count file data syncs and directory syncs"""
+    with patch.object(fsutil, "_datasync") as datasync:
+        with patch.object(fsutil.os, "fsync") as fsync:
+            yield datasync, fsync
+
+
+def test_no_durability_writes_in_place(test_managers, syncs):
+    """Test that the default mode neither syncs nor replaces the file"""
+    _, note_manager = test_managers
+    note_manager.append_to_note("First", "2025-05-21")
+    inode = os.stat(note_manager.get_note_path("2025-05-21")).st_ino
+    note_manager.append_to_note("Second", "2025-05-21")
+
+    assert os.stat(note_manager.get_note_path("2025-05-21")).st_ino == inode
+    assert syncs[0].call_count == 0 and syncs[1].call_count == 0
+
+
+def test_sync_per_write(test_config, syncs):
+    """Test that every write is synced and renamed into place"""
+    test_config["durability"] = "fdatasync-per-write"
+    note_manager = NoteManager(test_config, TemplateManager(test_config))
+    note_manager.append_to_note("First", "2025-05-21")
+    inode = os.stat(note_manager.get_note_path("2025-05-21")).st_ino
+    note_manager.append_to_note("Second", "2025-05-21")
+
+    assert os.stat(note_manager.get_note_path("2025-05-21")).st_ino != inode
+    assert syncs[0].call_count == 2 and syncs[1].call_count == 2
+    content = note_manager.read_day("2025-05-21")
+    assert "First" in content and "Second" in content
+
+
+def test_frontmatter_updates_synced(test_config, syncs):
+    """Test that in-place and rewritten frontmatter updates are both synced"""
+    test_config["durability"] = "fdatasync-per-write"
+    note_manager = NoteManager(test_config, TemplateManager(test_config))
+    note_manager.append_to_note("First", "2025-05-21")
+    syncs[0].reset_mock()
+    syncs[1].reset_mock()
+
+    assert note_manager.update_frontmatter("2025-05-21", {"priority": "1"})
+    assert syncs[0].call_count == 1 and syncs[1].call_count == 0
+    assert not note_manager.update_frontmatter("2025-05-21", {"mood": "x" * 200})
+    assert syncs[0].call_count == 2 and syncs[1].call_count == 1
+
+
+def test_group_sync_per_batch(test_config, syncs):
+    """Test that a batch is synced once, after all of its files are written"""
+    test_config["durability"] = "group"
+    with NoterSession(config=test_config) as session:
+        session.append_many(
+            [
+                NoteEntry("One", note_date="2025-05-21"),
+                NoteEntry("Two", note_date="2025-05-21"),
+                NoteEntry("Three", note_date="2025-05-22"),
+            ]
+        )
+        assert syncs[0].call_count == 2 and syncs[1].call_count == 2
+        assert not session.note_manager._unsynced
+
+
+def test_group_sync_interval(test_config, syncs):
+    """Test that writes are held back until the interval passes or on close"""
+    test_config["durability"] = "group"
+    test_config["durability_interval_ms"] = "60000"
+    session = NoterSession(config=test_config)
+    for text in ("One", "Two", "Three"):
+        session.append(text, note_date="2025-05-21")
+    assert syncs[0].call_count == 0
+    assert session.note_manager._unsynced
+
+    session.close()
+    assert syncs[0].call_count == 1 and syncs[1].call_count == 1
+
+
+def test_group_sync_interval_is_upper_bound(test_config, syncs):
+    """Test that held-back writes are synced when the interval runs out"""
+    test_config["durability"] = "group"
+    test_config["durability_interval_ms"] = "200"
+    session = NoterSession(config=test_config)
+    session.append("Then idle", note_date="2025-05-21")
+    session.append("Again", note_date="2025-05-21")
+    assert session.note_manager._unsynced
+
+    deadline = time.monotonic() + 5
+    while session.note_manager._unsynced and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not session.note_manager._unsynced
+    assert syncs[0].call_count == 1
+    session.close()
+
+
+def test_group_keys_recorded_after_sync(test_config, test_vault, syncs):
+    """Test that an idempotency key is only stored once its note is synced"""
+    test_config["durability"] = "group"
+    test_config["durability_interval_ms"] = "60000"
+    session = NoterSession(config=test_config)
+    session.append("Once", note_date="2025-05-21", entry_id="job-1")
+    session.append("Once", note_date="2025-05-21", entry_id="job-1")
+    assert not (test_vault / ".noter" / "dedup" / "2025-05-21.keys").exists()
+
+    session.close()
+    assert (test_vault / ".noter" / "dedup" / "2025-05-21.keys").exists()
+    assert session.note_manager.read_day("2025-05-21").count("Once") == 1
+
+
+def test_unknown_durability_rejected(test_config, test_config_file):
+    """Test that a misspelt durability mode fails validation"""
+    test_config["durability"] = "fsync"
+    test_config_file.write_text(json.dumps(test_config), encoding="utf-8")
+    assert ConfigManager(str(test_config_file)).load_config() is None
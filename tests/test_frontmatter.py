@@ -0,0 +1,117 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from noter import NoteManager, NoterCLI, TemplateManager
+from noter.frontmatter import matches, parse_condition, parse_fields, update_file
+
+NOTE = """---
+title: "Project"
+status: active
+priority: 2
+tags:
+  - work
+  - planning
+---
+
+# Project
+
+Body text
+"""
+
+
+def test_parse_fields():
+    """Test scalar, quoted, inline list and block list fields"""
+    fields = parse_fields(NOTE)
+    assert fields["title"] == "Project"
+    assert fields["priority"] == "2"
+    assert fields["tags"] == ["work", "planning"]
+    assert parse_fields("---\ntags: [a, 'b']\n---\n")["tags"] == ["a", "b"]
+    assert parse_fields("# No frontmatter\n") == {}
+
+
+def test_matches():
+    """Test numeric, textual and list conditions"""
+    fields = parse_fields(NOTE)
+    assert matches(fields, [parse_condition("status=active")])
+    assert matches(fields, [parse_condition("priority<=2")])
+    assert not matches(fields, [parse_condition("priority<2")])
+    assert matches(fields, [parse_condition("tags=work")])
+    assert not matches(fields, [parse_condition("tags!=work")])
+    assert not matches(fields, [parse_condition("missing=1")])
+    with pytest.raises(ValueError):
+        parse_condition("status")
+
+
+def test_update_file_in_place(tmp_path):
+    """Test that a block that still fits is padded and written over the old one"""
+    path = tmp_path / "note.md"
+    path.write_text(NOTE, encoding="utf-8")
+
+    assert update_file(str(path), {"status": "done"})
+    content = path.read_text(encoding="utf-8")
+    assert len(content) == len(NOTE)
+    assert content.endswith("# Project\n\nBody text\n")
+    assert parse_fields(content)["status"] == "done"
+    assert parse_fields(content)["tags"] == ["work", "planning"]
+
+    # The padding from the first update leaves room for a longer value
+    assert update_file(str(path), {"status": "active"})
+    assert path.read_text(encoding="utf-8") == NOTE
+
+
+def test_update_file_rewrite(tmp_path):
+    """Test that a block that grows is rewritten with the body intact"""
+    path = tmp_path / "note.md"
+    path.write_text(NOTE, encoding="utf-8")
+
+    assert not update_file(str(path), {"reviewed": "2025-05-21", "entries": "3"})
+    content = path.read_text(encoding="utf-8")
+    assert parse_fields(content)["reviewed"] == "2025-05-21"
+    assert parse_fields(content)["entries"] == "3"
+    assert content.endswith("---\n\n# Project\n\nBody text\n")
+
+
+def test_cli_find_and_set(test_managers, test_config_file, test_vault, capsys):
+    """Test that find sees fields changed by set"""
+    _, note_manager = test_managers
+    note_manager.append_to_note("One", "2025-05-20")
+    note_manager.append_to_note("Two", "2025-05-21")
+    (test_vault / "Project.md").write_text(NOTE, encoding="utf-8")
+
+    config = ["--config", str(test_config_file)]
+    with patch("sys.argv", ["noter", "find", "status=active", "priority<=2"] + config):
+        assert NoterCLI().run() == 0
+    assert capsys.readouterr().out.split() == ["Project.md"]
+
+    argv = ["noter", "set", "priority=1", "--date", "2025-05-21"] + config
+    with patch("sys.argv", argv):
+        assert NoterCLI().run() == 0
+    with patch("sys.argv", ["noter", "find", "status=active", "priority<=2"] + config):
+        assert NoterCLI().run() == 0
+    assert capsys.readouterr().out.split() == ["2025-05-21.md", "Project.md"]
+
+
+def test_nested_date_format_fields(test_config, tmp_path, capsys):
+    """Test that nested note paths keep ISO dates in frontmatter and --date"""
+    test_config["date_format"] = "%Y/%m/%Y-%m-%d"
+    config_file = tmp_path / "nested.json"
+    config_file.write_text(json.dumps(test_config), encoding="utf-8")
+    note_manager = NoteManager(test_config, TemplateManager(test_config))
+    assert note_manager.append_to_note("One", "2025/05/2025-05-21")
+
+    content = (tmp_path / "test_vault" / "2025" / "05" / "2025-05-21.md").read_text(
+        encoding="utf-8"
+    )
+    assert 'title: "Daily Note - 2025-05-21"' in content
+    assert "reviewed: 2025-05-21\n" in content and "created: 2025-05-21\n" in content
+
+    config = ["--config", str(config_file)]
+    argv = ["noter", "set", "priority=1", "--date", "2025-05-21"] + config
+    with patch("sys.argv", argv):
+        assert NoterCLI().run() == 0
+    argv = ["noter", "find", "priority=1", "reviewed<=2025-05-21"] + config
+    with patch("sys.argv", argv):
+        assert NoterCLI().run() == 0
+    assert capsys.readouterr().out.split() == ["2025/05/2025-05-21.md"]
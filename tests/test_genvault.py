@@ -0,0 +1,80 @@
+from datetime import date
+from unittest.mock import patch
+
+from noter import NoteManager, NoterCLI, TemplateManager
+from noter.genvault import GeneratorSettings, generate_vault
+
+
+def read_vault(path):
+    """Map each generated file name to its content"""
+    return {p.name: p.read_text(encoding="utf-8") for p in sorted(path.glob("*.md"))}
+
+
+def test_generation_is_reproducible(test_config, tmp_path):
+    """Test that a seed fixes the content regardless of the worker count"""
+    settings = GeneratorSettings(seed=7, broken_ratio=0.3)
+    first, second, other = tmp_path / "a", tmp_path / "b", tmp_path / "c"
+    generate_vault(test_config, str(first), date(2024, 1, 1), 20, settings, 1)
+    generate_vault(test_config, str(second), date(2024, 1, 1), 20, settings, 2)
+    generate_vault(
+        test_config, str(other), date(2024, 1, 1), 20, settings._replace(seed=8), 1
+    )
+
+    assert read_vault(first) == read_vault(second)
+    assert read_vault(first) != read_vault(other)
+    assert len(read_vault(first)) == 20
+
+
+def test_generated_vault_shape(test_config, tmp_path):
+    """Test heavy days, tags, links and hand-edited files"""
+    settings = GeneratorSettings(seed=1, heavy_ratio=0.1, broken_ratio=0.2)
+    vault = tmp_path / "vault"
+    entries, size, _ = generate_vault(
+        test_config, str(vault), date(2024, 1, 1), 60, settings, 1
+    )
+
+    files = read_vault(vault)
+    text = "".join(files.values())
+    assert entries == text.count("\n- [") + sum(
+        1 for content in files.values() if content.startswith("- [")
+    )
+    assert size == sum(len(content.encode("utf-8")) for content in files.values())
+    assert max(content.count("\n- [") for content in files.values()) > 500
+    assert "[[" in text and " #" in text
+    assert any(not content.startswith("---") for content in files.values())
+    assert any("## ✅ Tasks" not in content for content in files.values())
+
+    config = dict(test_config, obsidian_vault_path=str(vault))
+    note_manager = NoteManager(config, TemplateManager(config))
+    assert len(note_manager.list_days()) == 60
+
+
+def test_cli_gen_vault(test_config_file, tmp_path):
+    """Test the gen-vault command"""
+    dest = tmp_path / "generated"
+    argv = ["noter", "gen-vault", str(dest), "--days", "5", "--start", "2024-02-27"]
+    with patch("sys.argv", argv + ["--config", str(test_config_file)]):
+        assert NoterCLI().run() == 0
+    assert sorted(read_vault(dest)) == [
+        "2024-02-27.md",
+        "2024-02-28.md",
+        "2024-02-29.md",
+        "2024-03-01.md",
+        "2024-03-02.md",
+    ]
+
+
+def test_cli_gen_vault_refuses_existing_notes(test_config_file, tmp_path):
+    """Test that gen-vault leaves a non-empty folder alone unless forced"""
+    dest = tmp_path / "vault"
+    dest.mkdir()
+    (dest / "2024-02-27.md").write_text("My own note\n", encoding="utf-8")
+    argv = ["noter", "gen-vault", str(dest), "--days", "1", "--start", "2024-02-27"]
+    argv += ["--config", str(test_config_file)]
+    with patch("sys.argv", argv):
+        assert NoterCLI().run() == 1
+    assert read_vault(dest) == {"2024-02-27.md": "My own note\n"}
+
+    with patch("sys.argv", argv + ["--force"]):
+        assert NoterCLI().run() == 0
+    assert read_vault(dest)["2024-02-27.md"] != "My own note\n"
@@ -0,0 +1,47 @@
+import pytest
+
+from noter.jsonlog import JsonLog
+
+
+class CountingLog(JsonLog):
+    """Keeps the records of the log and how many times it was read from the start"""
+
+    resets = 0
+
+    def _reset(self):
+        self.records = []
+        self.resets += 1
+
+    def _apply(self, record):
+        self.records.append(record[0])
+
+
+def test_reads_only_appended_records(tmp_path):
+    """Test incremental reads, unreadable lines and replacing the log"""
+    path = tmp_path / "state" / "log.jsonl"
+    log = CountingLog(str(path))
+    log._append([[1], [2]])
+    log._load()
+    assert log.records == [1, 2]
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("not json\n[]\n[3]\n[4]")
+    log._load()
+    assert log.records == [1, 2, 3]
+
+    other = CountingLog(str(path))
+    other._replace([["x"]])
+    log._load()
+    assert log.records == ["x"]
+    assert log.resets == 3
+
+
+def test_incomplete_subclass_rejected(tmp_path):
+    """Test that a log without its hooks cannot be created"""
+
+    class NoApply(JsonLog):
+        def _reset(self):
+            pass
+
+    with pytest.raises(TypeError):
+        NoApply(str(tmp_path / "log.jsonl"))
@@ -0,0 +1,89 @@
+import os
+from unittest.mock import patch
+
+from noter import NoterCLI
+from noter.links import LinkIndex, extract_links
+
+
+def test_extract_links():
+    """Test that aliases, headings and repeats resolve to distinct pages"""
+    text = "Met [[Alice]] about [[Project X|the project]], [[Alice#Notes]] [[ ]]"
+    assert extract_links(text) == ["Alice", "Project X"]
+
+
+def test_links_recorded_at_append(test_managers, test_vault):
+    """Test that backlinks are answered from the index alone"""
+    _, note_manager = test_managers
+    note_manager.append_to_note("Call with [[Alice]]", "2025-05-20")
+    note_manager.append_to_note("No links here", "2025-05-21")
+    note_manager.append_to_note("Follow up [[alice]]", "2025-05-21", section="tasks")
+
+    os.remove(test_vault / "2025-05-20.md")
+    backlinks = note_manager.link_index.backlinks("ALICE")
+
+    assert [note_date for note_date, _ in backlinks] == ["2025-05-20", "2025-05-21"]
+    assert backlinks[0][1].endswith("Call with [[Alice]]")
+
+
+def test_rebuild_link_index(test_managers, test_vault):
+    """Test that a rebuild picks up links added by hand and drops stale ones"""
+    _, note_manager = test_managers
+    note_manager.append_to_note("Call with [[Alice]]", "2025-05-20")
+    note_manager.append_to_note("Lunch", "2025-05-21")
+    path = test_vault / "2025-05-21.md"
+    # Type into the empty bullet the template leaves at the end of the note
+    path.write_text(
+        path.read_text(encoding="utf-8") + "[12:00] Typed in [[Bob]]\n",
+        encoding="utf-8",
+    )
+    os.remove(test_vault / "2025-05-20.md")
+
+    assert note_manager.rebuild_link_index(workers=2) == 1
+    assert note_manager.link_index.backlinks("Alice") == []
+    assert note_manager.link_index.backlinks("Bob") == [
+        ("2025-05-21", "[12:00] Typed in [[Bob]]")
+    ]
+
+
+def test_replace_day_logs_only_changes(tmp_path):
+    """Test that re-reading a day appends records for changed entries only"""
+    log_path = tmp_path / "links.jsonl"
+    links = LinkIndex(str(log_path))
+    links.add([("Alice", "2025-05-21", "Met [[Alice]]")])
+    links.add([("Bob", "2025-05-21", "Lunch [[Bob]]")])
+    size = log_path.stat().st_size
+
+    links.replace_day(
+        "2025-05-21",
+        [
+            ("alice", "2025-05-21", "Met [[Alice]]"),
+            ("Bob", "2025-05-21", "Lunch [[Bob]]"),
+        ],
+    )
+    assert log_path.stat().st_size == size
+
+    links.replace_day(
+        "2025-05-21",
+        [
+            ("Alice", "2025-05-21", "Met [[Alice]]"),
+            ("Carol", "2025-05-21", "[[Carol]]"),
+        ],
+    )
+    assert len(log_path.read_text(encoding="utf-8").splitlines()) == 4
+    assert links.pages() == ["alice", "carol"]
+    assert LinkIndex(str(log_path)).pages() == ["alice", "carol"]
+
+
+def test_cli_backlinks(test_managers, test_config_file, capsys):
+    """Test the backlinks command"""
+    _, note_manager = test_managers
+    note_manager.append_to_note("Call with [[Alice]]", "2025-05-20")
+
+    with patch(
+        "sys.argv",
+        ["noter", "backlinks", "Alice", "--rebuild", "--config"]
+        + [str(test_config_file)],
+    ):
+        assert NoterCLI().run() == 0
+
+    assert "2025-05-20: [" in capsys.readouterr().out
@@ -0,0 +1,105 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from noter import NoteManager, NoterCLI, TemplateManager
+from noter.document import DailyDocument
+from noter.migrate import migrate_vault, restructure
+
+OLD_LAYOUT = """---
+title: "Old note"
+status: done
+---
+
+# Monday
+
+## Notes
+
+- [09:00] Old entry
+- [09:30] Second old entry
+
+## Random thoughts
+
+keep me
+"""
+
+
+@pytest.fixture
+def migrate_setup(tmp_path):
+    """Setup a vault holding one current and one old-layout daily note"""
+    config = {
+        "obsidian_vault_path": str(tmp_path),
+        "date_format": "%Y-%m-%d",
+        "time_format": "%H:%M",
+    }
+    note_manager = NoteManager(config, TemplateManager(config))
+    note_manager.append_to_note("Current entry", "2025-05-21")
+    (tmp_path / "2025-05-20.md").write_text(OLD_LAYOUT, encoding="utf-8")
+    return note_manager, config, tmp_path
+
+
+def test_restructure_preserves_entries():
+    """Test that restructuring keeps entries, frontmatter and extra sections"""
+    template = TemplateManager({}).create_basic_template("2025-05-20", "")
+    result = restructure(OLD_LAYOUT, template)
+    document = DailyDocument.from_text(result)
+
+    notes = document.find_section("## ✍️ Notes & Observations")
+    assert notes is not None
+    body = "".join(document.body(notes))
+    assert "- [09:00] Old entry" in body
+    assert "- [09:30] Second old entry" in body
+    assert "status: done" in result
+    assert "priority: 3" in result
+    assert "# Monday" in result
+    assert "## ✅ Tasks" in result
+    assert document.find_section("## Random thoughts") is not None
+    assert "keep me" in result
+
+
+def test_restructure_is_idempotent():
+    """Test that a note already in the current layout is left alone"""
+    template = TemplateManager({}).create_basic_template("2025-05-20", "")
+    once = restructure(OLD_LAYOUT, template)
+    assert restructure(once, template) == once
+
+
+def test_migrate_vault_fixes_appends(migrate_setup):
+    """Test that a migrated old note accepts new entries again"""
+    note_manager, _, tmp_path = migrate_setup
+    assert not note_manager.append_to_note("Too early", "2025-05-20")
+
+    results, elapsed = migrate_vault(note_manager, workers=1)
+
+    changed = {os.path.basename(r.path) for r in results if r.changed}
+    assert changed == {"2025-05-20.md"}
+    assert all(r.error is None for r in results)
+    assert elapsed >= 0
+    assert note_manager.append_to_note("After migration", "2025-05-20")
+
+
+def test_migrate_can_be_undone(migrate_setup):
+    """Test that migration snapshots each note it rewrites"""
+    note_manager, _, tmp_path = migrate_setup
+    migrate_vault(note_manager, workers=2)
+    assert (tmp_path / "2025-05-20.md").read_text(encoding="utf-8") != OLD_LAYOUT
+
+    assert note_manager.undo("2025-05-20") is not None
+    assert (tmp_path / "2025-05-20.md").read_text(encoding="utf-8") == OLD_LAYOUT
+
+
+def test_cli_migrate_dry_run(migrate_setup, capsys):
+    """Test that a dry run prints a diff and writes nothing"""
+    _, config, tmp_path = migrate_setup
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps(config), encoding="utf-8")
+
+    argv = ["noter", "migrate", "--dry-run", "--workers", "2", "--config"]
+    with patch("sys.argv", argv + [str(config_file)]):
+        assert NoterCLI().run() == 0
+
+    out = capsys.readouterr().out
+    assert "+## ✍️ Notes & Observations" in out
+    assert (tmp_path / "2025-05-20.md").read_text(encoding="utf-8") == OLD_LAYOUT
@@ -0,0 +1,67 @@
+import os
+from unittest.mock import patch
+
+from noter import NoteManager, NoterCLI, TemplateManager
+from noter.mirror import APPEND_MIN_BYTES, Mirror
+
+
+def test_mirror_copies_only_changes(tmp_path):
+    """Test full, unchanged, touched, appended and removed files"""
+    vault, dest = tmp_path / "vault", tmp_path / "backup"
+    (vault / "2025" / ".hidden").mkdir(parents=True)
+    (vault / ".noter").mkdir()
+    (vault / "2025-05-21.md").write_text("day one")
+    (vault / "2025" / "2025-05-22.md").write_text("day two")
+    (vault / ".noter" / "state.json").write_text("{}")
+    big = vault / "log.md"
+    big.write_bytes(b"x" * APPEND_MIN_BYTES)
+    mirror = Mirror(str(vault), str(dest))
+
+    stats = mirror.run()
+    assert (stats.copied, stats.unchanged) == (3, 0)
+    assert (dest / "2025" / "2025-05-22.md").read_text() == "day two"
+    assert not (dest / ".noter" / "state.json").exists()
+    assert mirror.run().unchanged == 3
+
+    (vault / "2025-05-21.md").write_text("day 1!!")
+    os.utime(vault / "2025" / "2025-05-22.md", ns=(1, 1))
+    with open(big, "ab") as f:
+        f.write(b"tail")
+    (vault / "extra.md").write_text("new")
+    stats = mirror.run()
+    assert (stats.copied, stats.appended, stats.unchanged) == (2, 1, 1)
+    assert stats.bytes_written == len("day 1!!") + len("tail") + len("new")
+    assert (dest / "log.md").read_bytes().endswith(b"xtail")
+    assert (dest / "2025-05-21.md").read_text() == "day 1!!"
+
+    os.remove(vault / "extra.md")
+    stats = mirror.run()
+    assert (stats.removed, stats.unchanged) == (1, 3)
+    assert not (dest / "extra.md").exists()
+
+
+def test_mirror_after_append(test_config, test_vault, tmp_path):
+    """Test that appended notes are mirrored in the background"""
+    test_config["mirror_path"] = str(tmp_path / "backup")
+    note_manager = NoteManager(test_config, TemplateManager(test_config))
+    assert note_manager.append_to_note("Mirrored", "2025-05-21")
+    assert note_manager.append_to_note("Again", "2025-05-21")
+    note_manager.flush_mirror()
+
+    assert (tmp_path / "backup" / "2025-05-21.md").read_text(encoding="utf-8") == (
+        test_vault / "2025-05-21.md"
+    ).read_text(encoding="utf-8")
+
+
+def test_cli_mirror(test_config_file, test_vault, tmp_path):
+    """Test the mirror command"""
+    (test_vault / "2025-05-21.md").write_text("note", encoding="utf-8")
+    config = ["--config", str(test_config_file)]
+    with patch("sys.argv", ["noter", "mirror", str(tmp_path / "copy")] + config):
+        assert NoterCLI().run() == 0
+    assert (tmp_path / "copy" / "2025-05-21.md").read_text() == "note"
+
+    with patch("sys.argv", ["noter", "mirror", str(test_vault / "copy")] + config):
+        assert NoterCLI().run() == 1
+    with patch("sys.argv", ["noter", "mirror"] + config):
+        assert NoterCLI().run() == 1
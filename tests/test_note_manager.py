@@ -1,9 +1,11 @@
 import os
-from datetime import datetime
+from datetime import date, datetime
+from unittest.mock import patch
 
 import pytest
 
-from noter import NoteManager, TemplateManager
+from noter import NoteEntry, NoteManager, TemplateManager
+from noter.document import DailyDocument
 
 
 @pytest.fixture
@@ -259,3 +261,237 @@ def test_note_insertion_order(test_note_setup):
     # Verify timestamps are in chronological order
     sorted_timestamps = sorted(timestamps)
     assert timestamps == sorted_timestamps, "Notes should be in chronological order"
+
+
+def test_append_with_entry_id_is_idempotent(test_note_setup):
+    """Test that retrying a note with the same id does not duplicate it"""
+    note_manager, config = test_note_setup
+    note_date = datetime.now().strftime(config["date_format"])
+
+    assert note_manager.append_to_note("Retried note", note_date, entry_id="job-1")
+    assert note_manager.append_to_note("Retried note", note_date, entry_id="job-1")
+    assert note_manager.append_to_note("Other note", note_date, entry_id="job-2")
+
+    note_path = note_manager.get_note_path(note_date)
+    with open(note_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    assert content.count("Retried note") == 1
+    assert "Other note" in content
+
+    # A fresh manager reads the sidecar instead of the daily note
+    fresh_manager = NoteManager(config, TemplateManager(config))
+    assert fresh_manager.append_to_note("Retried note", note_date, entry_id="job-1")
+    with open(note_path, "r", encoding="utf-8") as f:
+        assert f.read().count("Retried note") == 1
+
+
+def test_append_with_content_dedup(test_note_setup):
+    """Test content-hash deduplication when enabled in the config"""
+    note_manager, config = test_note_setup
+    config["dedup_notes"] = True
+    note_date = datetime.now().strftime(config["date_format"])
+
+    with patch("noter.datetime") as mock_datetime:
+        mock_datetime.now.return_value = datetime(2025, 5, 21, 9, 30)
+        assert note_manager.append_to_note("Posted twice", note_date)
+        assert note_manager.append_to_note("Posted twice", note_date)
+        mock_datetime.now.return_value = datetime(2025, 5, 21, 9, 31)
+        assert note_manager.append_to_note("Posted twice", note_date)
+
+    with open(note_manager.get_note_path(note_date), "r", encoding="utf-8") as f:
+        assert f.read().count("Posted twice") == 2
+
+
+def test_entry_limit_rolls_into_continuation(test_note_setup):
+    """Test that a full day continues in a linked continuation file"""
+    note_manager, config = test_note_setup
+    config["max_note_entries"] = 2
+    note_date = "2025-05-21"
+
+    for i in range(5):
+        assert note_manager.append_to_note(f"Entry {i}", note_date)
+
+    paths = note_manager.get_day_paths(note_date)
+    assert [os.path.basename(p) for p in paths] == [
+        "2025-05-21.md",
+        "2025-05-21.2.md",
+        "2025-05-21.3.md",
+    ]
+
+    with open(paths[0], "r", encoding="utf-8") as f:
+        main = f.read()
+    assert "Entry 1" in main and "Entry 2" not in main
+    assert "> Continued in [[2025-05-21.2]]" in main
+    assert "> Continued in [[2025-05-21.3]]" in main
+
+    with open(paths[1], "r", encoding="utf-8") as f:
+        shard = f.read()
+    assert "## ✍️ Notes & Observations" in shard
+    assert "> Part 2 of [[2025-05-21]]" in shard
+    assert "Entry 2" in shard and "Entry 3" in shard
+
+    day = note_manager.read_day(note_date)
+    for i in range(5):
+        assert f"Entry {i}" in day
+
+
+def test_size_limit_rolls_into_continuation(test_note_setup):
+    """Test that the byte limit is checked before the day is rewritten"""
+    note_manager, config = test_note_setup
+    config["max_note_bytes"] = "1"
+    note_date = "2025-05-21"
+
+    assert note_manager.append_to_note("First", note_date)
+    assert note_manager.append_to_note("Second", note_date)
+
+    paths = note_manager.get_day_paths(note_date)
+    assert len(paths) == 2
+    with open(paths[1], "r", encoding="utf-8") as f:
+        assert "Second" in f.read()
+    assert note_manager.read_day("1999-01-01") is None
+
+
+def test_pregenerate_range(test_note_setup):
+    """Test creating daily notes ahead of time with their own dates"""
+    note_manager, config = test_note_setup
+    note_manager.append_to_note("Already here", "2025-05-20")
+
+    results = note_manager.pregenerate(date(2025, 5, 19), date(2025, 5, 21))
+
+    assert [(os.path.basename(p), created) for p, created in results] == [
+        ("2025-05-19.md", True),
+        ("2025-05-20.md", False),
+        ("2025-05-21.md", True),
+    ]
+    with open(note_manager.get_note_path("2025-05-19"), "r", encoding="utf-8") as f:
+        assert "# 📅️ Monday, May 19th 2025" in f.read()
+    with open(note_manager.get_note_path("2025-05-20"), "r", encoding="utf-8") as f:
+        assert "Already here" in f.read()
+
+
+def test_append_to_pregenerated_note(test_note_setup):
+    """Test that the first note reuses the placeholder bullet"""
+    note_manager, config = test_note_setup
+    note_manager.pregenerate(date(2025, 5, 21), date(2025, 5, 21))
+
+    assert note_manager.append_to_note("First note", "2025-05-21")
+
+    with open(note_manager.get_note_path("2025-05-21"), "r", encoding="utf-8") as f:
+        content = f.read()
+    notes = content.split("## ✍️ Notes & Observations")[1]
+    assert notes.count("- [") == 1
+    assert [line for line in notes.splitlines() if line.strip() == "-"] == ["- "]
+
+
+def test_append_to_other_sections(test_note_setup):
+    """Test adding notes to the Tasks and Summary sections"""
+    note_manager, config = test_note_setup
+    note_date = "2025-05-21"
+    note_manager.append_to_note("Observation", note_date)
+
+    assert note_manager.append_to_note("Write report", note_date, section="tasks")
+    assert note_manager.append_to_note("Ship it", note_date, section="tasks")
+    assert note_manager.append_to_note("Good day", note_date, section="summary")
+
+    with open(note_manager.get_note_path(note_date), "r", encoding="utf-8") as f:
+        content = f.read()
+    tasks = content.split("## ✅ Tasks")[1].split("## ")[0]
+    summary = content.split("## ☀️ Summary")[1].split("## ")[0]
+    notes = content.split("## ✍️ Notes & Observations")[1]
+    assert tasks.index("Write report") < tasks.index("Ship it")
+    assert "-\n" not in tasks
+    assert "Good day" in summary and "> What happened today?" in summary
+    assert "Observation" in notes and "Write report" not in notes
+
+
+def test_configured_section_headers(test_note_setup):
+    """Test section names resolved through the config"""
+    note_manager, config = test_note_setup
+    config["tasks_section"] = "## Todo"
+    note_path = note_manager.get_note_path("2025-05-21")
+    with open(note_path, "w", encoding="utf-8") as f:
+        f.write("# Day\n\n## Todo\n\n-\n\n## ✍️ Notes & Observations\n\n- ")
+
+    assert note_manager.append_to_note("Configured", "2025-05-21", section="tasks")
+    assert note_manager.append_to_note("Literal", "2025-05-21", section="## Todo")
+    assert not note_manager.append_to_note("Nope", "2025-05-21", section="ideas")
+
+    with open(note_path, "r", encoding="utf-8") as f:
+        todo = f.read().split("## Todo")[1].split("## ")[0]
+    assert "Configured" in todo and "Literal" in todo
+
+
+def test_failed_batch_leaves_no_cached_lines(test_note_setup):
+    """Test that entries of a failed batch are not written by the next append"""
+    note_manager, _ = test_note_setup
+    note_path = note_manager.get_note_path("2025-05-21")
+    with open(note_path, "w", encoding="utf-8") as f:
+        f.write("# Day\n\n## ✍️ Notes & Observations\n\n- ")
+    assert note_manager.append_to_note("First", "2025-05-21")
+
+    entries = [NoteEntry("Lost note"), NoteEntry("Lost task", section="tasks")]
+    results = note_manager.append_entries("2025-05-21", entries)
+    assert not any(result.added for result in results)
+    assert note_manager.append_to_note("Second", "2025-05-21")
+
+    with open(note_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    assert "First" in content and "Second" in content
+    assert "Lost" not in content
+
+
+def test_timed_notes_inserted_in_order(test_note_setup):
+    """Test that back-dated notes land between the notes around their time"""
+    note_manager, config = test_note_setup
+    note_date = "2025-05-21"
+    assert note_manager.append_to_note("Lunch", note_date, at="12:00")
+    assert note_manager.append_to_note("Breakfast", note_date, at="08:00")
+    assert note_manager.append_to_note("Dinner", note_date, at="19:30")
+    entries = [
+        NoteEntry("Coffee", at="08:00"),
+        NoteEntry("Walk", at="16:45"),
+        NoteEntry("Task", at="09:00", section="tasks"),
+    ]
+    assert all(r.added for r in note_manager.append_entries(note_date, entries))
+
+    with open(note_manager.get_note_path(note_date), "r", encoding="utf-8") as f:
+        content = f.read()
+    notes = content.split("## ✍️ Notes & Observations")[1]
+    bullets = [line for line in notes.splitlines() if line.startswith("- [")]
+    assert bullets == [
+        "- [08:00] Breakfast",
+        "- [08:00] Coffee",
+        "- [12:00] Lunch",
+        "- [16:45] Walk",
+        "- [19:30] Dinner",
+    ]
+    assert notes.count("\n-") == len(bullets)
+    assert "- [09:00] Task" in content.split("## ✅ Tasks")[1].split("## ")[0]
+
+
+def test_timeline_follows_document_edits(test_note_setup):
+    """Test that the cached timeline survives inserts and deletes"""
+    note_manager, _ = test_note_setup
+    document = DailyDocument.from_text(
+        "## Notes\n- [09:00] a\n- [11:00] b\n-\n## Other\n- [10:00] x\n"
+    )
+    section = document.sections[0]
+    stamps, positions = document.timeline(section, note_manager._bullet_time)
+    assert positions == [1, 2]
+
+    document.insert(2, ["- [10:00] c\n", "  detail\n"])
+    document.delete(5)
+    document.insert(0, ["# Title\n"])
+    assert [s.strftime("%H:%M") for s in stamps] == ["09:00", "10:00", "11:00"]
+    assert document.timeline(document.sections[0], note_manager._bullet_time) == (
+        stamps,
+        positions,
+    )
+    assert (
+        document.timeline(document.sections[0], note_manager._bullet_time)[0] is stamps
+    )
+    assert [document.lines[i] for i in positions] == [
+        "- [09:00] a\n",
+        "- [10:00] c\n",
+        "- [11:00] b\n",
+    ]
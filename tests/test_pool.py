@@ -0,0 +1,16 @@
+from noter.pool import run_jobs, worker_templates
+
+
+def test_run_jobs_keeps_order():
+    """Test pooled and in-process runs return results in job order"""
+    jobs = [-3, 1, -2, 5, -8]
+    assert run_jobs(abs, jobs, workers=2) == [3, 1, 2, 5, 8]
+    assert run_jobs(abs, jobs, workers=1) == [3, 1, 2, 5, 8]
+    assert run_jobs(abs, [], workers=2) == []
+
+
+def test_worker_templates_reused(test_config):
+    """Test that a process reuses its template manager until the config changes"""
+    templates = worker_templates(test_config)
+    assert worker_templates(test_config) is templates
+    assert worker_templates(dict(test_config, date_format="%d.%m.%Y")) is not templates
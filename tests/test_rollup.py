@@ -0,0 +1,68 @@
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from noter import NoterCLI
+from noter.rollup import collect_digests, period_range, write_rollup
+
+
+@pytest.fixture
+def week_notes(test_managers):
+    """Fill two days of ISO week 2025-W21 and the Monday after it"""
+    _, note_manager = test_managers
+    note_manager.append_to_note("Planning", "2025-05-19", tags=["work"])
+    note_manager.append_to_note("Gym #health", "2025-05-19")
+    note_manager.append_to_note("Review #work", "2025-05-21")
+    note_manager.append_to_note("Ship it", "2025-05-21", section="tasks")
+    note_manager.append_to_note("Outside the week", "2025-05-26")
+    return note_manager
+
+
+def test_period_range():
+    """Test that weeks and months resolve to their first and last day"""
+    assert period_range("2025-W21", None) == (date(2025, 5, 19), date(2025, 5, 25))
+    assert period_range(None, "2024-02") == (date(2024, 2, 1), date(2024, 2, 29))
+    with pytest.raises(ValueError):
+        period_range("2025-21", None)
+
+
+def test_write_weekly_rollup(week_notes, test_vault):
+    """Test that a weekly rollup gathers entries, tasks and tag counts"""
+    path, days, reread = write_rollup(week_notes, week="2025-W21", workers=1)
+
+    assert path == str(test_vault / "Rollups" / "2025-W21.md")
+    assert (days, reread) == (2, 2)
+    content = open(path, encoding="utf-8").read()
+    assert 'title: "Weekly Review - 2025-W21"' in content
+    assert "- #work (2)" in content
+    assert "- #health (1)" in content
+    assert "### [[2025-05-19]] Monday" in content
+    assert "Ship it ([[2025-05-21]])" in content
+    assert "Outside the week" not in content
+
+
+def test_digests_are_cached(week_notes):
+    """Test that only days changed since the last rollup are read again"""
+    start, end = date(2025, 5, 19), date(2025, 5, 25)
+    collect_digests(week_notes, start, end, workers=1)
+
+    days, reread = collect_digests(week_notes, start, end, workers=1)
+    assert reread == 0
+    assert len(days) == 2
+
+    week_notes.append_to_note("Late addition #work", "2025-05-21")
+    days, reread = collect_digests(week_notes, start, end, workers=1)
+    assert reread == 1
+    assert days[1][2]["tags"]["work"] == 2
+
+
+def test_cli_rollup_month(week_notes, test_config_file, test_vault):
+    """Test the rollup command with a process pool"""
+    argv = ["noter", "rollup", "--month", "2025-05", "--workers", "2", "--config"]
+    with patch("sys.argv", argv + [str(test_config_file)]):
+        assert NoterCLI().run() == 0
+
+    content = (test_vault / "Rollups" / "2025-05.md").read_text(encoding="utf-8")
+    assert "# 🗓️ May 2025" in content
+    assert "Outside the week" in content
@@ -0,0 +1,136 @@
+import json
+import re
+from unittest.mock import patch
+
+import pytest
+
+from noter import AppendResult, NoteEntry, NoterSession
+
+
+@pytest.fixture
+def session(test_config):
+    """Create a session from an in-memory configuration"""
+    with NoterSession(config=test_config) as session:
+        yield session
+
+
+def test_session_from_config_file(test_config_file):
+    """Test that a session loads its configuration from a file"""
+    session = NoterSession(str(test_config_file))
+    result = session.append("From file config")
+    assert result.added and result.ok
+    session.close()
+
+
+def test_session_with_invalid_config(tmp_path):
+    """Test that an unusable configuration raises instead of exiting"""
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({"obsidian_vault_path": None}))
+    with pytest.raises(ValueError):
+        NoterSession(str(config_file))
+
+
+def test_session_follows_config_edits(test_config, test_config_file):
+    """Test that a session picks up config edits between appends"""
+    session = NoterSession(str(test_config_file))
+    session.append("Before", note_date="2025-05-21")
+
+    test_config["time_format"] = "%H.%M.%S"
+    test_config_file.write_text(json.dumps(test_config, indent=2), encoding="utf-8")
+
+    result = session.append("After", note_date="2025-05-21")
+    assert session.config["time_format"] == "%H.%M.%S"
+    content = open(result.path, encoding="utf-8").read()
+    assert "Before" in content
+    assert re.search(r"- \[\d\d\.\d\d\.\d\d\] After", content)
+    assert not session.reload_config()
+    session.close()
+
+
+def test_append_returns_structured_result(session, test_vault):
+    """Test that append reports where the note went"""
+    result = session.append("Hello", tags=["api"])
+
+    assert isinstance(result, AppendResult)
+    assert result.added and not result.duplicate and result.error is None
+    assert result.note_date == session.today()
+    assert result.path == str(test_vault / f"{session.today()}.md")
+    with open(result.path, "r", encoding="utf-8") as f:
+        assert "Hello #api" in f.read()
+
+
+def test_append_many_writes_each_file_once(session):
+    """Test that a batch is grouped into one write per daily note"""
+    notes = [
+        "First",
+        NoteEntry("Back-dated", note_date="2025-05-20"),
+        NoteEntry("Second", entry_id="job-1"),
+        NoteEntry("Second again", entry_id="job-1"),
+        "Third",
+    ]
+    with patch.object(
+        session.note_manager,
+        "_write_document",
+        wraps=session.note_manager._write_document,
+    ) as write_document:
+        session.append("Existing note")
+        write_document.reset_mock()
+        results = session.append_many(notes)
+        assert write_document.call_count == 1
+
+    assert [r.added for r in results] == [True, True, True, False, True]
+    assert results[3].duplicate
+    assert results[1].note_date == "2025-05-20"
+
+    with open(results[0].path, "r", encoding="utf-8") as f:
+        lines = [line for line in f if line.startswith("- [")]
+    assert [line.split("] ")[1].strip() for line in lines] == [
+        "Existing note",
+        "First",
+        "Second",
+        "Third",
+    ]
+
+
+def test_parsed_documents_are_reused(session):
+    """Test that unchanged daily notes are not re-read between appends"""
+    session.append("Create the file")
+    session.append("Parse the file")
+
+    with patch("noter.DailyDocument") as document_class:
+        assert session.append("Reuse the parse").added
+        document_class.assert_not_called()
+
+
+def test_append_failure_is_reported(session, test_vault):
+    """Test that a note that cannot be written returns an error result"""
+    path = test_vault / f"{session.today()}.md"
+    path.write_text("# No sections here\n", encoding="utf-8")
+
+    result = session.append("Nowhere to go")
+    assert not result.ok and not result.added
+    assert "Notes & Observations" in result.error
+
+
+def test_append_many_across_sections_single_write(session):
+    """Test that entries for several sections share one rewrite"""
+    session.append("Existing note")
+    with patch.object(
+        session.note_manager,
+        "_write_document",
+        wraps=session.note_manager._write_document,
+    ) as write_document:
+        results = session.append_many(
+            [
+                NoteEntry("A task", section="tasks"),
+                NoteEntry("A note"),
+                NoteEntry("A summary", section="summary"),
+            ]
+        )
+        assert write_document.call_count == 1
+
+    assert all(r.added for r in results)
+    with open(results[0].path, "r", encoding="utf-8") as f:
+        content = f.read()
+    assert content.index("A summary") < content.index("A task")
+    assert content.index("A task") < content.index("A note")
@@ -0,0 +1,106 @@
+import json
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from noter import NoteManager, NoterCLI, TemplateManager
+from noter.snapshots import SnapshotStore, content_digest
+
+
+@pytest.fixture
+def snapshot_manager(test_config):
+    """Create a note manager with snapshots enabled"""
+    config = dict(test_config, snapshots="true")
+    return NoteManager(config, TemplateManager(config))
+
+
+def test_snapshot_hardlinks_replaced_file(tmp_path):
+    """Test that a file about to be replaced is linked, not copied"""
+    note = tmp_path / "note.md"
+    note.write_text("old", encoding="utf-8")
+    store = SnapshotStore(str(tmp_path / "store"))
+    digest = content_digest(b"old")
+
+    store.save(str(note), "note.md", digest, replacing=True)
+    store.save(str(note), "note.md", digest, replacing=True)
+
+    assert os.stat(store.object_path(digest)).st_ino == os.stat(note).st_ino
+    assert len(os.listdir(store.objects_dir)) == 1
+    assert [s.path for s in store.snapshots()] == ["note.md", "note.md"]
+
+
+def test_snapshot_copies_file_written_in_place(tmp_path):
+    """Test that a file written in place gets its own copy"""
+    note = tmp_path / "note.md"
+    note.write_text("old", encoding="utf-8")
+    store = SnapshotStore(str(tmp_path / "store"))
+    digest = content_digest(b"old")
+
+    store.save(str(note), "note.md", digest, replacing=False)
+    note.write_text("new", encoding="utf-8")
+
+    assert store.read(digest) == "old"
+
+
+def test_prune_applies_retention(tmp_path):
+    """Test that expired snapshots and their objects are removed"""
+    note = tmp_path / "note.md"
+    note.write_text("old", encoding="utf-8")
+    store = SnapshotStore(str(tmp_path / "store"), retention_days=1)
+    store.save(str(note), "note.md", content_digest(b"old"), replacing=False)
+
+    assert store.prune(now=time.time() + 2 * 24 * 60 * 60) == 1
+    assert store.snapshots() == []
+
+
+def test_append_then_undo(snapshot_manager, test_vault):
+    """Test that appends are snapshotted and can be undone step by step"""
+    snapshot_manager.append_to_note("First", "2025-05-21")
+    snapshot_manager.append_to_note("Second", "2025-05-21")
+    snapshot_manager.append_to_note("Third", "2025-05-21")
+    path = test_vault / "2025-05-21.md"
+
+    history = snapshot_manager.history("2025-05-21")
+    assert len(history) == 2
+    assert "Second" in snapshot_manager.snapshot_store.read(history[0].digest)
+
+    snapshot_manager.undo("2025-05-21")
+    content = path.read_text(encoding="utf-8")
+    assert "Second" in content and "Third" not in content
+
+    # The undo snapshotted the version it replaced
+    snapshot_manager.undo("2025-05-21")
+    assert "Third" in path.read_text(encoding="utf-8")
+    assert snapshot_manager.undo("2025-05-21", version=10) is None
+
+
+def test_snapshots_disabled_by_default(test_managers, test_vault):
+    """Test that notes are written in place without snapshots by default"""
+    _, note_manager = test_managers
+    note_manager.append_to_note("First", "2025-05-21")
+    inode = os.stat(test_vault / "2025-05-21.md").st_ino
+    note_manager.append_to_note("Second", "2025-05-21")
+
+    assert os.stat(test_vault / "2025-05-21.md").st_ino == inode
+    assert note_manager.history("2025-05-21") == []
+
+
+def test_cli_history_and_undo(test_config, tmp_path, test_vault, capsys):
+    """Test the history and undo commands"""
+    config = dict(test_config, snapshots="true")
+    config_file = tmp_path / "snapshots.json"
+    config_file.write_text(json.dumps(config), encoding="utf-8")
+    note_manager = NoteManager(config, TemplateManager(config))
+    note_manager.append_to_note("First", "2025-05-21")
+    note_manager.append_to_note("Oops", "2025-05-21")
+
+    argv = ["--config", str(config_file)]
+    with patch("sys.argv", ["noter", "history", "2025-05-21"] + argv):
+        assert NoterCLI().run() == 0
+    assert "2025-05-21.md" in capsys.readouterr().out
+
+    with patch("sys.argv", ["noter", "undo", "--date", "2025-05-21"] + argv):
+        assert NoterCLI().run() == 0
+    assert "Oops" not in (test_vault / "2025-05-21.md").read_text(encoding="utf-8")
@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from noter import TemplateManager
+from noter.templates import load_template
+
+DAILY = """{{> parts/head.md}}
+
+{{#if weekend}}
+## Weekend
+{{else}}
+## Tasks
+{{#if weekday == "Friday"}}
+- [ ] Weekly review
+{{/if}}
+{{/if}}
+
+## ✍️ Notes & Observations
+{{note_content}}
+"""
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    (tmp_path / "parts").mkdir()
+    (tmp_path / "parts" / "head.md").write_text(
+        "# {{weekday}} {{note_date}}\n", encoding="utf-8"
+    )
+    (tmp_path / "daily.md").write_text(DAILY, encoding="utf-8")
+    return tmp_path
+
+
+def make_manager(template_dir, **paths):
+    config = {"template_path": str(template_dir / "daily.md")}
+    config.update({key: str(template_dir / name) for key, name in paths.items()})
+    config.update({"date_format": "%Y-%m-%d", "time_format": "%H:%M"})
+    return TemplateManager(config)
+
+
+def test_includes_and_conditionals(template_dir):
+    """Test that blocks pick lines by date and leave no blank control lines"""
+    template_manager = make_manager(template_dir)
+    assert template_manager.create_basic_template("2025-05-23", "- [09:00] Hi") == (
+        "# Friday 2025-05-23\n\n## Tasks\n- [ ] Weekly review\n\n"
+        "## ✍️ Notes & Observations\n- [09:00] Hi\n"
+    )
+    assert template_manager.create_basic_template("2025-05-21", "x") == (
+        "# Wednesday 2025-05-21\n\n## Tasks\n\n## ✍️ Notes & Observations\nx\n"
+    )
+    assert "## Weekend" in template_manager.create_basic_template("2025-05-24", "x")
+
+
+def test_template_chosen_by_weekday(template_dir):
+    """Test the weekday, weekend and default template settings"""
+    (template_dir / "monday.md").write_text("Monday {{note_date}}", encoding="utf-8")
+    (template_dir / "weekend.md").write_text("Rest {{weekday}}", encoding="utf-8")
+    template_manager = make_manager(
+        template_dir,
+        template_path_monday="monday.md",
+        template_path_weekend="weekend.md",
+    )
+    assert template_manager.create_basic_template("2025-05-19", "") == (
+        "Monday 2025-05-19"
+    )
+    assert template_manager.create_basic_template("2025-05-25", "") == "Rest Sunday"
+    assert template_manager.create_basic_template("2025-05-20", "").startswith(
+        "# Tuesday"
+    )
+
+
+def test_compiled_once_until_changed(template_dir):
+    """Test that templates are reused until the template or a fragment changes"""
+    path = str(template_dir / "daily.md")
+    compiled = load_template(path, lambda source: None)
+    assert load_template(path, lambda source: None) is compiled
+
+    head = template_dir / "parts" / "head.md"
+    head.write_text("# Changed {{note_date}}\n", encoding="utf-8")
+    os.utime(head, ns=(1, 1))
+    recompiled = load_template(path, lambda source: None)
+    assert recompiled is not compiled
+    assert (
+        make_manager(template_dir)
+        .create_basic_template("2025-05-21", "x")
+        .startswith("# Changed 2025-05-21")
+    )
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "{{#if weekend}}never closed",
+        "{{/if}}",
+        "{{> missing.md}}",
+        "{{> daily.md}}",
+        "{{#if mood}}x{{/if}}",
+    ],
+)
+def test_invalid_templates_fall_back(template_dir, source):
+    """Test that broken blocks and includes fall back to the default template"""
+    (template_dir / "daily.md").write_text(source, encoding="utf-8")
+    result = make_manager(template_dir).create_basic_template("2025-05-21", "x")
+    assert "Daily Note - 2025-05-21" in result
@@ -0,0 +1,93 @@
+import os
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from noter import NoteManager, TemplateManager
+from noter.vault_index import VaultIndex
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# note\n")
+
+
+@pytest.fixture
+def nested_vault(tmp_path):
+    """Create a vault using a year/month directory layout"""
+    for day in ["2023-12-31", "2024-01-15", "2024-02-01", "2025-05-21"]:
+        year, month, _ = day.split("-")
+        _touch(str(tmp_path / year / month / f"{day}.md"))
+    _touch(str(tmp_path / "2025" / "05" / "2025-05-21.2.md"))
+    _touch(str(tmp_path / "2025" / "05" / "scratch.md"))
+    _touch(str(tmp_path / "Templates" / "daily.md"))
+    return tmp_path
+
+
+def test_nested_layout_days(nested_vault):
+    """Test enumerating a nested layout in date order"""
+    index = VaultIndex(str(nested_vault), "%Y/%m/%Y-%m-%d")
+    days = index.days()
+
+    assert [day for day, _ in days] == [
+        date(2023, 12, 31),
+        date(2024, 1, 15),
+        date(2024, 2, 1),
+        date(2025, 5, 21),
+    ]
+    assert days[-1][1] == str(nested_vault / "2025" / "05" / "2025-05-21.md")
+
+
+def test_range_query_prunes_directories(nested_vault):
+    """Test that directories outside the range are never listed"""
+    index = VaultIndex(str(nested_vault), "%Y/%m/%Y-%m-%d")
+
+    with patch("noter.vault_index.os.scandir", wraps=os.scandir) as scandir:
+        days = index.days(date(2024, 1, 1), date(2024, 1, 31))
+        listed = [call.args[0] for call in scandir.call_args_list]
+
+    assert [day for day, _ in days] == [date(2024, 1, 15)]
+    assert str(nested_vault / "2023") not in listed
+    assert str(nested_vault / "2025") not in listed
+    assert str(nested_vault / "2024" / "02") not in listed
+
+
+def test_listings_cached_by_directory_mtime(nested_vault):
+    """Test that unchanged directories are not rescanned"""
+    index = VaultIndex(str(nested_vault), "%Y/%m/%Y-%m-%d")
+    index.days()
+
+    with patch("noter.vault_index.os.scandir", wraps=os.scandir) as scandir:
+        index.days()
+        assert scandir.call_count == 0
+
+    _touch(str(nested_vault / "2024" / "02" / "2024-02-02.md"))
+    os.utime(nested_vault / "2024" / "02", ns=(1, 1))
+    with patch("noter.vault_index.os.scandir", wraps=os.scandir) as scandir:
+        days = index.days()
+        assert scandir.call_count == 1
+    assert date(2024, 2, 2) in [day for day, _ in days]
+
+
+def test_strptime_fallback_for_unsupported_directives(tmp_path):
+    """Test formats the regex compiler does not handle"""
+    _touch(str(tmp_path / "2025-05-21 (W21).md"))
+    index = VaultIndex(str(tmp_path), "%Y-%m-%d (W%U)")
+    assert [day for day, _ in index.days()] == [date(2025, 5, 21)]
+
+
+def test_note_manager_creates_nested_directories(tmp_path):
+    """Test that appending creates the intermediate directories on demand"""
+    config = {
+        "obsidian_vault_path": str(tmp_path),
+        "date_format": "%Y/%m/%Y-%m-%d",
+        "time_format": "%H:%M",
+    }
+    note_manager = NoteManager(config, TemplateManager(config))
+
+    assert note_manager.append_to_note("Nested note", "2025/05/2025-05-21")
+    expected = tmp_path / "2025" / "05" / "2025-05-21.md"
+    assert expected.exists()
+    assert note_manager.list_days() == [(date(2025, 5, 21), str(expected))]
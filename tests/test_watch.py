@@ -0,0 +1,97 @@
+import os
+from unittest.mock import patch
+
+from noter import NoteManager, NoterCLI, TemplateManager
+from noter.activity import StatCache
+from noter.watch import VaultWatcher
+
+
+def touch(path, text):
+    """Write a file and move its mtime forward so the change is visible"""
+    path.write_text(text, encoding="utf-8")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+
+def test_watcher_reports_changes(tmp_path):
+    """Test additions, in-place edits, removals and new folders"""
+    (tmp_path / "a.md").write_text("a", encoding="utf-8")
+    watcher = VaultWatcher(str(tmp_path))
+    seen = []
+    watcher.subscribe(seen.append)
+    assert watcher.tick() == []
+
+    (tmp_path / "b.md").write_text("b", encoding="utf-8")
+    (tmp_path / "ignored.txt").write_text("x", encoding="utf-8")
+    assert watcher.tick() == ["b.md"]
+
+    touch(tmp_path / "b.md", "bb")
+    assert watcher.tick() == ["b.md"]
+
+    os.makedirs(tmp_path / "2025" / "05")
+    (tmp_path / "2025" / "05" / "c.md").write_text("c", encoding="utf-8")
+    os.remove(tmp_path / "a.md")
+    assert watcher.tick() == ["2025/05/c.md", "a.md"]
+
+    assert watcher.tick() == []
+    assert seen == [["b.md"], ["b.md"], ["2025/05/c.md", "a.md"]]
+
+
+def test_cold_edits_found_by_bounded_sweep(tmp_path):
+    """Test that a tick stats a bounded number of unchanged files"""
+    for i in range(20):
+        (tmp_path / f"{i:02d}.md").write_text("x", encoding="utf-8")
+    watcher = VaultWatcher(str(tmp_path), sweep_size=5)
+    watcher.tick()
+    touch(tmp_path / "17.md", "edited")
+
+    found = []
+    with patch.object(watcher, "_stat", wraps=watcher._stat) as stat:
+        for _ in range(4):
+            found += watcher.tick()
+            assert stat.call_count <= 5
+            stat.reset_mock()
+    assert found == ["17.md"]
+
+
+def test_watcher_feeds_stat_cache(tmp_path):
+    """Test that reported paths update the frontmatter index"""
+    cache = StatCache(str(tmp_path), str(tmp_path / ".noter" / "statcache.json"))
+    watcher = VaultWatcher(str(tmp_path))
+    watcher.subscribe(cache.update)
+    watcher.tick()
+
+    (tmp_path / "idea.md").write_text("---\nstatus: active\n---\n", encoding="utf-8")
+    watcher.tick()
+    assert [path for path, _ in cache.find([])] == ["idea.md"]
+
+    os.remove(tmp_path / "idea.md")
+    watcher.tick()
+    assert cache.find([]) == []
+
+
+def test_cli_watch(test_config_file, test_vault):
+    """Test that the watch command stops after the given number of polls"""
+    argv = ["noter", "watch", "--ticks", "2", "--interval", "0"]
+    with patch("sys.argv", argv + ["--config", str(test_config_file)]):
+        assert NoterCLI().run() == 0
+    assert (test_vault / ".noter" / "statcache.json").exists()
+
+
+def test_watcher_keeps_backlinks_current(test_config, test_vault):
+    """Test that links edited outside noter reach the backlink index"""
+    note_manager = NoteManager(test_config, TemplateManager(test_config))
+    assert note_manager.append_to_note("Met [[Alice]]", "2025-05-21")
+    watcher = VaultWatcher(str(test_vault))
+    watcher.subscribe(note_manager.refresh_links)
+    watcher.tick()
+
+    note = test_vault / "2025-05-21.md"
+    touch(note, note.read_text(encoding="utf-8").replace("[[Alice]]", "[[Bob]]"))
+    (test_vault / "ideas.md").write_text("See [[Carol]]\n", encoding="utf-8")
+    watcher.tick()
+
+    links = note_manager.link_index
+    assert links.backlinks("Alice") == []
+    assert [link[0] for link in links.backlinks("Bob")] == ["2025-05-21"]
+    assert links.backlinks("Carol") == []